@@ -0,0 +1,94 @@
+"""
+Check `capture_json_responses` against a local HTTP server and compare it with DOM extraction.
+
+The served page fetches `/api/profile.json` after a delay and only then renders the values,
+like the API-backed pages we scrape. Needs Chrome and chromedriver.
+
+Usage
+-----
+```
+python benchmarks/cdp_capture.py --delay 0.5
+```
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_PATH)
+
+from quati.navigation.automation import capture_json_responses, extract_page_fields, launch_navigator  # noqa: E402
+
+PROFILE = {"name": "quati", "followers": 10300000, "posts": [{"id": index, "likes": index * 7} for index in range(50)]}
+PAGE = """<html><body><span id="followers"></span><script>
+setTimeout(() => fetch("/api/profile.json").then(r => r.json()).then(p => {
+    document.getElementById("followers").innerText = p.followers;
+}), DELAY_MS);
+</script></body></html>"""
+
+
+def serve(delay):
+    page = PAGE.replace("DELAY_MS", str(int(delay * 1000))).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/api/"):
+                body, content_type = json.dumps(PROFILE).encode("utf-8"), "application/json"
+            else:
+                body, content_type = page, "text/html"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=0.5, help="Seconds before the page calls its API")
+    parser.add_argument("--driver", default="/usr/local/bin/chromedriver")
+    arguments = parser.parse_args()
+
+    server = serve(arguments.delay)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    browser = launch_navigator(driver_binary=arguments.driver, is_headless=True, capture_network=True)
+    try:
+        started = time.perf_counter()
+        captured = capture_json_responses(browser, [r"/api/profile\.json$"], url)
+        capture_seconds = time.perf_counter() - started
+        assert captured and captured[0]["data"] == PROFILE, captured
+        # Without a target_url the events already read stay available
+        again = capture_json_responses(browser, [re.escape("/api/profile.json")], timeout=1)
+        assert again and again[0]["data"] == PROFILE, again
+
+        # DOM route: reload, then poll the rendered field
+        started = time.perf_counter()
+        browser.get(url)
+        fields = {}
+        while not fields.get("followers"):
+            fields = extract_page_fields({"followers": "#followers"}, browser, magnitude_fields=["followers"])
+            time.sleep(0.05)
+        dom_seconds = time.perf_counter() - started
+    finally:
+        browser.quit()
+        server.shutdown()
+
+    print(f"network capture  {capture_seconds * 1000:8.1f} ms  ({len(PROFILE['posts'])} posts in the payload)")
+    print(f"DOM polling      {dom_seconds * 1000:8.1f} ms  (followers only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Run `AdaptiveLimiter` against `FakeQuotaBackend` and compare it with fixed thread counts.
+
+A fixed count below the backend capacity wastes throughput, one above it collects 429s;
+the adaptive limiter should settle near the capacity with few throttled calls.
+
+Usage
+-----
+```
+python benchmarks/concurrency_simulation.py --capacity 8 --calls 2000
+```
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_PATH)
+
+from fakes import FakeQuotaBackend, FakeThrottled  # noqa: E402
+
+from quati.system.concurrency import AdaptiveLimiter  # noqa: E402
+
+
+def retrying(call, payload, attempts=10, wait=0.01):
+    """Call with a fixed wait between attempts, like the Sheets helpers; False once the attempts run out."""
+    for _ in range(attempts):
+        try:
+            call(payload)
+            return True
+        except FakeThrottled:
+            time.sleep(wait)
+    return False
+
+
+def run_fixed(capacity, calls, workers):
+    backend = FakeQuotaBackend(capacity)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        succeeded = sum(pool.map(lambda payload: retrying(backend.call, payload), range(calls)))
+    return time.perf_counter() - started, backend.throttled, calls - succeeded
+
+
+def run_adaptive(capacity, calls, maximum):
+    backend = FakeQuotaBackend(capacity)
+    limiter = AdaptiveLimiter(initial=1, maximum=maximum, cooldown=0.05)
+    started = time.perf_counter()
+    # Same retry loop, but every attempt holds a limiter slot and reports its outcome
+    with ThreadPoolExecutor(max_workers=maximum) as pool:
+        succeeded = sum(pool.map(lambda payload: retrying(lambda item: limiter.call(backend.call, item), payload), range(calls)))
+    return time.perf_counter() - started, backend.throttled, calls - succeeded, limiter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--maximum", type=int, default=64)
+    arguments = parser.parse_args()
+
+    for workers in (2, arguments.capacity, arguments.capacity * 4):
+        seconds, throttled, failed = run_fixed(arguments.capacity, arguments.calls, workers)
+        print(f"fixed {workers:<4}  {arguments.calls / seconds:10.1f} calls/s  {throttled:6d} throttled  {failed:5d} failed")
+    seconds, throttled, failed, limiter = run_adaptive(arguments.capacity, arguments.calls, arguments.maximum)
+    print(
+        f"adaptive    {arguments.calls / seconds:10.1f} calls/s  {throttled:6d} throttled  {failed:5d} failed"
+        f"  final limit {limiter.limit}"
+    )
+    print("limit changes:", " ".join(f"{limit}({reason[0]})" for _, limit, reason in list(limiter.history)[:40]))
+
+
+if __name__ == "__main__":
+    main()
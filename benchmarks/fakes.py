@@ -0,0 +1,293 @@
+"""
+In-memory stand-ins for the external services used by quati, so the hot paths
+can be measured without credentials or network access.
+"""
+
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+from unittest import mock
+
+
+class FakeSpreadsheet:
+    """gspread spreadsheet (and its client) answering the Drive metadata request with `revision`."""
+
+    def __init__(self, revision="1"):
+        self.id = "fake-spreadsheet"
+        self.client = self
+        self.revision = revision
+        self.metadata_requests = 0
+
+    def request(self, method, endpoint, params=None, **kwargs):
+        self.metadata_requests += 1
+        metadata = {"version": self.revision, "modifiedTime": "2024-01-01T00:00:00.000Z"}
+        return types.SimpleNamespace(json=lambda: metadata)
+
+
+class FakeWorksheet:
+    """gspread worksheet backed by a value matrix; `update` calls are recorded, not sent."""
+
+    def __init__(self, values, spreadsheet=None):
+        self.values = values
+        self.updates = []
+        self.id = 0
+        self.title = "Sheet1"
+        self.spreadsheet = spreadsheet or FakeSpreadsheet()
+
+    def get_all_values(self):
+        return self.values
+
+    def get_all_records(self, head=1):
+        header = self.values[head - 1]
+        return [dict(zip(header, row)) for row in self.values[head:]]
+
+    def col_values(self, col_index):
+        return [row[col_index - 1] for row in self.values]
+
+    def update(self, target_cell, values, value_input_option="RAW"):
+        self.updates.append((target_cell, len(values)))
+
+    def batch_clear(self, ranges):
+        self.updates.append((tuple(ranges), 0))
+
+
+class FakeSchemaField:
+    def __init__(self, name, field_type, mode="NULLABLE", fields=()):
+        self.name = name
+        self.field_type = field_type
+        self.mode = mode
+        self.fields = list(fields)
+
+
+class FakeTable:
+    def __init__(self, schema):
+        self.schema = schema
+
+
+class FakeQueryJobConfig:
+    def __init__(self, **properties):
+        self.__dict__.update(properties)
+
+
+class FakeQueryParameter:
+    def __init__(self, *args):
+        self.args = args
+
+    def to_api_repr(self):
+        return {"args": self.args}
+
+
+class FakeQueryJob:
+    def __init__(self, result_df, job_config=None):
+        self.result_df = result_df
+        self.job_config = job_config
+        self.job_id = "fake-job"
+        self.location = "US"
+        self.total_bytes_processed = 0 if result_df is None else int(result_df.memory_usage(deep=False).sum())
+        self.total_bytes_billed = self.total_bytes_processed
+        self.slot_millis = 0
+        self.cache_hit = False
+        self.created = self.started = self.ended = None
+        self.num_dml_affected_rows = None
+        self.dml_stats = None
+
+    def result(self, page_size=None, start_index=None, **kwargs):
+        self.page_size = page_size or 100000
+        self.start_index = start_index or 0
+        return self
+
+    @property
+    def schema(self):
+        return [FakeSchemaField(name, "STRING") for name in self.result_df.columns]
+
+    def to_arrow(self, *args, **kwargs):
+        return self.result_df
+
+    def to_dataframe_iterable(self, *args, **kwargs):
+        for start in range(self.start_index, len(self.result_df.index), self.page_size):
+            yield self.result_df.iloc[start : start + self.page_size]
+
+    def to_dataframe(self, *args, **kwargs):
+        # Same shape as the real RowIterator: download through to_arrow(), then convert
+        return self.to_arrow().copy()
+
+
+class FakeBigQueryClient:
+    """Returns the configured schema from `get_table` and the configured frame from every query."""
+
+    schema = []
+    result_df = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_table(self, table_id):
+        return FakeTable(self.schema)
+
+    def query(self, sql_command, job_config=None, **kwargs):
+        return FakeQueryJob(self.result_df, job_config)
+
+    def get_job(self, job_id, location=None):
+        return FakeQueryJob(self.result_df)
+
+
+class FakeSMTP:
+    """smtplib.SMTP replacement counting the bytes it would have sent."""
+
+    sent = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def sendmail(self, sender, recipients, message):
+        FakeSMTP.sent.append((sender, tuple(recipients), len(message)))
+        return {}
+
+    def send_message(self, message, from_addr=None, to_addrs=None):
+        FakeSMTP.sent.append((from_addr, tuple(to_addrs or ()), len(message.as_bytes())))
+        return {}
+
+    # Low-level transaction used when the message is streamed
+    def ehlo_or_helo_if_needed(self):
+        pass
+
+    def mail(self, sender, options=()):
+        self._envelope = [sender, [], 0]
+        return 250, b"OK"
+
+    def rcpt(self, recipient, options=()):
+        self._envelope[1].append(recipient)
+        return 250, b"OK"
+
+    def docmd(self, command, args=""):
+        return (354, b"Go ahead") if command.lower() == "data" else (250, b"OK")
+
+    def send(self, data):
+        self._envelope[2] += len(data)
+
+    def getreply(self):
+        sender, recipients, size = self._envelope
+        FakeSMTP.sent.append((sender, tuple(recipients), size))
+        return 250, b"Queued"
+
+    def rset(self):
+        return 250, b"OK"
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeWebDriver:
+    """WebDriver answering `execute_script` with canned field values."""
+
+    def __init__(self, page_fields):
+        self.page_fields = page_fields
+        self.round_trips = 0
+
+    def execute_script(self, script, *args):
+        self.round_trips += 1
+        selectors = args[0] if args else {}
+        return {field: self.page_fields.get(field) for field in selectors}
+
+
+class FakeThrottled(Exception):
+    """What a quota-limited API raises, e.g. gspread's `APIError: [429]`."""
+
+
+class FakeQuotaBackend:
+    """Service answering at most `capacity` concurrent calls; latency grows with load and extra calls get a 429."""
+
+    def __init__(self, capacity=8, base_latency=0.005, latency_per_call=0.0005):
+        self.capacity = capacity
+        self.base_latency = base_latency
+        self.latency_per_call = latency_per_call
+        self.active = 0
+        self.calls = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def call(self, payload=None):
+        with self._lock:
+            self.calls += 1
+            if self.active >= self.capacity:
+                self.throttled += 1
+                raise FakeThrottled("APIError: [429]: Quota exceeded")
+            self.active += 1
+            latency = self.base_latency + self.latency_per_call * self.active
+        try:
+            time.sleep(latency)
+            return payload
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class _FakeResponse:
+    content = b"\x89PNG\r\n\x1a\n" + b"\x00" * 2048
+
+    def raise_for_status(self):
+        pass
+
+
+@contextmanager
+def installed_fakes(schema=(), result_df=None):
+    """Route the Google clients, requests and SMTP used inside quati to the fakes above."""
+    FakeBigQueryClient.schema = list(schema)
+    FakeBigQueryClient.result_df = result_df
+
+    bigquery = types.ModuleType("google.cloud.bigquery")
+    bigquery.Client = FakeBigQueryClient
+    bigquery.SchemaField = FakeSchemaField
+    bigquery.QueryJobConfig = FakeQueryJobConfig
+    bigquery.ScalarQueryParameter = bigquery.ArrayQueryParameter = FakeQueryParameter
+    service_account = types.ModuleType("google.oauth2.service_account")
+    service_account.Credentials = types.SimpleNamespace(from_service_account_file=lambda path: object())
+    google = types.ModuleType("google")
+    google_cloud = types.ModuleType("google.cloud")
+    google_oauth2 = types.ModuleType("google.oauth2")
+    google.cloud, google.oauth2 = google_cloud, google_oauth2
+    google_cloud.bigquery, google_oauth2.service_account = bigquery, service_account
+
+    pandas_gbq = types.ModuleType("pandas_gbq")
+    pandas_gbq.context = types.SimpleNamespace(project=None)
+    requests = types.ModuleType("requests")
+    requests.get = lambda *args, **kwargs: _FakeResponse()
+
+    fake_modules = {
+        "google": google,
+        "google.cloud": google_cloud,
+        "google.cloud.bigquery": bigquery,
+        "google.oauth2": google_oauth2,
+        "google.oauth2.service_account": service_account,
+        "pandas_gbq": pandas_gbq,
+        "requests": requests,
+    }
+    # Only the faked entries are restored: modules imported meanwhile (e.g. pandas' Parquet engine) stay loaded
+    saved = {name: sys.modules.get(name) for name in fake_modules}
+    sys.modules.update(fake_modules)
+    try:
+        with mock.patch("smtplib.SMTP", FakeSMTP):
+            yield
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
@@ -0,0 +1,383 @@
+"""
+Benchmark suite covering the quati hot paths, run against the fake backends in `fakes.py`.
+
+Results are written as JSON so two runs can be compared, e.g. before and after an optimization.
+Besides the timings, every benchmark except the `*_latency` ones reports its peak traced memory
+(`peak_mb`, Python objects and NumPy buffers, measured in a separate untimed run) and, when
+it returns a DataFrame or Series, its deep memory size (`result_mb`).
+
+Usage
+-----
+```
+python benchmarks/hot_paths.py --save baseline
+python benchmarks/hot_paths.py --rows 10000000 --compare benchmarks/results/baseline.json
+python benchmarks/hot_paths.py --only magnitude schema_sync
+QUATI_BENCH_WORKERS=8 python benchmarks/hot_paths.py --only transform_serial transform_parallel
+```
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(ROOT_PATH, "benchmarks", "results")
+sys.path.insert(0, ROOT_PATH)
+
+from fakes import FakeSchemaField, FakeWebDriver, FakeWorksheet, installed_fakes  # noqa: E402
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register `function(rows) -> (setup, run)`; only `run(*setup())` is timed."""
+
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+
+    return register
+
+
+@benchmark("magnitude")
+def bench_magnitude(rows):
+    import pandas as pd
+
+    from quati.data.processing import convert_magnitude_series
+
+    samples = pd.Series(["1K", "550.1K", "10.3M", "2B", "987", ""] * (rows // 6))
+    return (lambda: (samples,)), convert_magnitude_series
+
+
+@benchmark("magnitude_scalar")
+def bench_magnitude_scalar(rows):
+    from quati.data.processing import convert_magnitude_string
+
+    samples = ["1K", "550.1K", "10.3M", "2B", "987"] * (min(rows, 1000000) // 5)
+    return (lambda: (samples,)), lambda values: [convert_magnitude_string(value) for value in values]
+
+
+@benchmark("header_normalization")
+def bench_header_normalization(rows):
+    from quati.data.processing import format_column_header
+
+    labels = [f"Col {index} - Valor (R$)/Média" for index in range(min(rows, 100000))]
+    return (lambda: (labels,)), lambda values: [format_column_header(value) for value in values]
+
+
+def _schema_frame(rows):
+    import numpy as np
+    import pandas as pd
+
+    generator = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "user_id": generator.integers(0, 10**9, rows).astype(str),
+            "amount": generator.random(rows).astype(str),
+            "quantity": generator.integers(0, 1000, rows).astype(str),
+            "active": generator.integers(0, 2, rows).astype(bool),
+            "label": np.array(["alpha", "beta", "gamma", "delta"])[generator.integers(0, 4, rows)],
+            "day": pd.Timestamp("2024-01-01") + pd.to_timedelta(generator.integers(0, 365, rows), unit="D"),
+            "created_at": (pd.Timestamp("2024-01-01") + pd.to_timedelta(generator.integers(0, 10**7, rows), unit="s")).astype(str),
+        }
+    )
+
+
+SCHEMA = [
+    FakeSchemaField("user_id", "INTEGER"),
+    FakeSchemaField("amount", "FLOAT"),
+    FakeSchemaField("quantity", "INTEGER"),
+    FakeSchemaField("active", "BOOLEAN"),
+    FakeSchemaField("label", "STRING"),
+    FakeSchemaField("day", "DATE"),
+    FakeSchemaField("created_at", "TIMESTAMP"),
+]
+
+
+def _transform_case(rows):
+    import pandas as pd
+
+    from quati.data.processing import convert_magnitude_series, parse_timestamp_series
+
+    frame = pd.DataFrame(
+        {
+            "followers": pd.Series(["1K", "550.1K", "10.3M", "2B", "987"] * (rows // 5)),
+            "created_at": _schema_frame(rows // 5 * 5)["created_at"],
+        }
+    )
+    return frame, [("followers", convert_magnitude_series), ("created_at", parse_timestamp_series)]
+
+
+@benchmark("transform_serial")
+def bench_transform_serial(rows):
+    from quati.data.processing import transform_in_parallel
+
+    frame, steps = _transform_case(rows)
+    return (lambda: (frame,)), lambda data_frame: transform_in_parallel(data_frame, steps, max_workers=1)
+
+
+@benchmark("transform_parallel")
+def bench_transform_parallel(rows):
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+
+    from quati.data.processing import transform_in_parallel
+
+    frame, steps = _transform_case(rows)
+    workers = int(os.environ.get("QUATI_BENCH_WORKERS", os.cpu_count()))
+    # Started once, like a long-running pipeline would; the worker start-up is not measured
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+    transform_in_parallel(frame.head(1000), steps, max_workers=workers, chunk_rows=100, executor=pool)
+    return (lambda: (frame,)), lambda data_frame: transform_in_parallel(data_frame, steps, max_workers=workers, executor=pool)
+
+
+@benchmark("schema_sync")
+def bench_schema_sync(rows):
+    frame = _schema_frame(rows)
+
+    def run(data_frame):
+        from quati.gooogle.warehouse import sync_dataframe_to_bq_schema
+
+        with installed_fakes(SCHEMA):
+            return sync_dataframe_to_bq_schema(data_frame, "project", "dataset.table", "key.json")
+
+    return (lambda: (frame.copy(),)), run
+
+
+@benchmark("sheets_dataframe")
+def bench_sheets_dataframe(rows):
+    from quati.gooogle.spreadsheets import fetch_records_with_resilience
+
+    row_count = min(rows, 200000)
+    header = [f"column_{index}" for index in range(10)]
+    values = [header] + [[f"{row}", "1.234,56", "abc", "2024-01-01", "", "x", "10", "y", "z", "0"] for row in range(row_count)]
+    worksheet = FakeWorksheet(values)
+    return (lambda: (worksheet,)), fetch_records_with_resilience
+
+
+@benchmark("sheets_cached_read")
+def bench_sheets_cached_read(rows):
+    from quati.gooogle.spreadsheets import SheetReadCache, fetch_records_with_resilience
+
+    row_count = min(rows, 200000)
+    header = [f"column_{index}" for index in range(10)]
+    values = [header] + [[f"{row}", "1.234,56", "abc", "2024-01-01", "", "x", "10", "y", "z", "0"] for row in range(row_count)]
+    worksheet = FakeWorksheet(values)
+    cache = SheetReadCache(tempfile.mkdtemp())
+    fetch_records_with_resilience(worksheet, cache=cache)
+    # Unchanged spreadsheet: one metadata request, then the values come from the cache
+    return (lambda: (worksheet,)), lambda tab: fetch_records_with_resilience(tab, cache=cache)
+
+
+@benchmark("sheets_dataframe_optimized")
+def bench_sheets_dataframe_optimized(rows):
+    from quati.gooogle.spreadsheets import build_dataframe_from_values
+
+    row_count = min(rows, 200000)
+    header = [f"column_{index}" for index in range(10)]
+    values = [header] + [[f"{row}", "1.234,56", "abc", "2024-01-01", "", "x", "10", "y", "z", "0"] for row in range(row_count)]
+    return (lambda: (values,)), lambda matrix: build_dataframe_from_values(matrix, decimal=",", thousands=".")
+
+
+@benchmark("sheets_upload")
+def bench_sheets_upload(rows):
+    from quati.gooogle.spreadsheets import push_df_to_gsheet
+
+    frame = _schema_frame(min(rows, 200000))
+    return (lambda: (FakeWorksheet([]), frame, "A1")), push_df_to_gsheet
+
+
+@benchmark("bq_export")
+def bench_bq_export(rows):
+    from quati.gooogle.warehouse import _bq_client, export_bq_to_gsheet
+
+    frame = _schema_frame(min(rows, 200000))
+
+    def run(worksheet):
+        with installed_fakes([], frame):
+            _bq_client.cache_clear()
+            return export_bq_to_gsheet("SELECT * FROM orders", "project", "key.json", worksheet, "A1")
+
+    return (lambda: (FakeWorksheet([]),)), run
+
+
+@benchmark("email_render")
+def bench_email_render(rows):
+    from quati.msger.mailing import Dispatcher
+
+    attachment = tempfile.NamedTemporaryFile(suffix=".csv", delete=False)
+    attachment.write(b"id,value\n" + b"1,2\n" * 500000)
+    attachment.close()
+    notifier = Dispatcher("bench@quati.dev", "key", ["team@quati.dev"])
+
+    def run(files):
+        with installed_fakes():
+            notifier.push_emsg(title="Benchmark", message="Body", extra_data={"rows": rows}, files=files, type="note")
+
+    return (lambda: ([attachment.name],)), run
+
+
+@benchmark("email_bulk")
+def bench_email_bulk(rows):
+    from quati.msger.mailing import Dispatcher
+
+    notifier = Dispatcher("bench@quati.dev", "key", [])
+    deliveries = [([f"team{index}@quati.dev"], {"message": f"Report {index}", "extra_data": {"team": index}}) for index in range(200)]
+
+    def run(items):
+        with installed_fakes():
+            notifier.push_emsg_bulk(items, max_connections=4, title="Benchmark", type="note")
+
+    return (lambda: (deliveries,)), run
+
+
+@benchmark("dom_extraction")
+def bench_dom_extraction(rows):
+    from quati.navigation.automation import extract_page_fields
+
+    fields = {f"field_{index}": f"{index}.5K" for index in range(50)}
+    driver = FakeWebDriver(fields)
+    selectors = {field: f"//span[@id='{field}']" for field in fields}
+    return (lambda: (selectors, driver, list(fields))), extract_page_fields
+
+
+@benchmark("file_wait_latency")
+def bench_file_wait_latency(rows):
+    from quati.system.unix import wait_for_files
+
+    folder = tempfile.mkdtemp()
+    delay = 0.2
+
+    def setup():
+        for name in os.listdir(folder):
+            os.remove(os.path.join(folder, name))
+
+        def writer():
+            time.sleep(delay)
+            with open(os.path.join(folder, "report.csv"), "wb") as output_file:
+                output_file.write(b"x" * 1024)
+
+        threading.Thread(target=writer, daemon=True).start()
+        return (folder, "report", 1, 5, 0)
+
+    def run(*arguments):
+        started = time.perf_counter()
+        wait_for_files(*arguments)
+        # Only the detection latency after the file was written is interesting
+        return time.perf_counter() - started - delay
+
+    return setup, run
+
+
+@benchmark("download_latency")
+def bench_download_latency(rows):
+    from quati.system.unix import DownloadTracker
+
+    folder = tempfile.mkdtemp()
+    delay = 0.2
+
+    def setup():
+        tracker = DownloadTracker(folder)
+
+        def browser():
+            # What Chrome does: reserve the final name, write the .crdownload, rename it when done
+            final_path = os.path.join(folder, f"report_{time.monotonic_ns()}.csv")
+            open(final_path, "wb").close()
+            with open(f"{final_path}.crdownload", "wb") as output_file:
+                for _ in range(4):
+                    output_file.write(b"x" * 256 * 1024)
+                    output_file.flush()
+                    time.sleep(delay / 4)
+            os.replace(f"{final_path}.crdownload", final_path)
+
+        threading.Thread(target=browser, daemon=True).start()
+        return (tracker,)
+
+    def run(tracker):
+        started = time.perf_counter()
+        assert tracker.wait(max_wait=5) is not None
+        # Only the detection latency after the rename is interesting
+        return time.perf_counter() - started - delay
+
+    return setup, run
+
+
+def measure(name, rows, repeat):
+    setup, run = BENCHMARKS[name](rows)
+    samples = []
+    for _ in range(repeat):
+        arguments = setup()
+        started = time.perf_counter()
+        result = run(*arguments)
+        elapsed = time.perf_counter() - started
+        samples.append(result if name.endswith("_latency") else elapsed)
+    measurement = {"min": min(samples), "median": statistics.median(samples), "repeat": repeat}
+
+    # One extra, untimed run under tracemalloc (it slows allocations down): peak memory allocated
+    # by Python objects and NumPy buffers while `run` executes, on top of what setup() built
+    if not name.endswith("_latency"):
+        arguments = setup()
+        tracemalloc.start()
+        try:
+            output = run(*arguments)
+            measurement["peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+        if hasattr(output, "memory_usage"):
+            usage = output.memory_usage(deep=True)  # per column for a DataFrame, an int for a Series
+            measurement["result_mb"] = int(usage.sum() if hasattr(usage, "sum") else usage) / (1024 * 1024)
+    return measurement
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="Rows used by the DataFrame benchmarks")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), metavar="NAME", help="Run only these benchmarks")
+    parser.add_argument("--save", help="Store the results as benchmarks/results/<name>.json")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    arguments = parser.parse_args()
+
+    previous = {}
+    if arguments.compare:
+        with open(arguments.compare, encoding="utf-8") as input_file:
+            previous = json.load(input_file)["results"]
+
+    results = {}
+    for name in arguments.only or BENCHMARKS:
+        try:
+            results[name] = measure(name, arguments.rows, arguments.repeat)
+        except Exception as error:
+            print(f"{name.ljust(28)} failed: {error!r}")
+            continue
+        line = f"{name.ljust(28)} min {results[name]['min'] * 1000:10.2f} ms  median {results[name]['median'] * 1000:10.2f} ms"
+        if "peak_mb" in results[name]:
+            line += f"  peak {results[name]['peak_mb']:8.1f} MB"
+        if "result_mb" in results[name]:
+            line += f"  result {results[name]['result_mb']:8.1f} MB"
+        if name in previous and previous[name]["min"] > 0:
+            line += f"  ({results[name]['min'] / previous[name]['min']:.2f}x of previous)"
+        print(line)
+
+    if arguments.save:
+        os.makedirs(RESULTS_PATH, exist_ok=True)
+        payload = {
+            "rows": arguments.rows,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+        }
+        with open(os.path.join(RESULTS_PATH, f"{arguments.save}.json"), "w", encoding="utf-8") as output_file:
+            json.dump(payload, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
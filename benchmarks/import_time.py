@@ -0,0 +1,92 @@
+"""
+Import-time regression check for the quati modules.
+
+Every module is imported in a fresh interpreter with `python -X importtime`; the run fails
+when a module exceeds its budget or pulls a heavy dependency in at import time.
+
+Usage
+-----
+```
+python benchmarks/import_time.py
+python benchmarks/import_time.py --budget-ms 150 --repeat 5
+```
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "quati.data.processing",
+    "quati.gooogle.spreadsheets",
+    "quati.gooogle.warehouse",
+    "quati.logger",
+    "quati.logger.instrumentation",
+    "quati.logger.pipeline",
+    "quati.msger.mailing",
+    "quati.navigation.automation",
+    "quati.system.concurrency",
+    "quati.system.unix",
+]
+
+# Dependencies that must only be imported on first use
+HEAVY_DEPENDENCIES = ["gspread", "google.cloud", "numpy", "pandas", "pandas_gbq", "pyarrow", "requests", "selenium", "tqdm"]
+
+
+def measure_import(module_name):
+    """Return the cumulative import time (microseconds) of `module_name` and the top-level packages it loaded."""
+    execution = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT_PATH,
+        env={**os.environ, "PYTHONPATH": ROOT_PATH},
+    )
+
+    cumulative_us, loaded = 0, set()
+    for line in execution.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:") :].split("|")]
+        if not cumulative.isdigit():
+            continue
+        loaded.add(name)
+        if name == module_name:
+            cumulative_us = int(cumulative)
+    return cumulative_us, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Maximum import time per module")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module; the fastest one is kept")
+    arguments = parser.parse_args()
+
+    failures = []
+    for module_name in MODULES:
+        samples = [measure_import(module_name) for _ in range(arguments.repeat)]
+        best_us = min(cumulative for cumulative, _ in samples)
+        leaked = sorted(
+            dependency
+            for dependency in HEAVY_DEPENDENCIES
+            if any(name == dependency or name.startswith(f"{dependency}.") for name in samples[0][1])
+        )
+
+        status = "ok"
+        if leaked:
+            status = f"FAIL eager import of {', '.join(leaked)}"
+        elif best_us / 1000 > arguments.budget_ms:
+            status = f"FAIL over {arguments.budget_ms:.0f} ms budget"
+        if status != "ok":
+            failures.append(module_name)
+        print(f"{module_name.ljust(32)} {best_us / 1000:8.1f} ms  {status}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,9 @@
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+MAGNITUDE_FACTORS = {"k": 1000, "m": 1000000, "b": 1000000000}
 
 
 def convert_magnitude_string(raw_input: str) -> int:
@@ -17,9 +22,8 @@ def convert_magnitude_string(raw_input: str) -> int:
     ```
     """
     clean_text = raw_input.lower()
-    scaling_factors = {"k": 1000, "m": 1000000, "b": 1000000000}
 
-    for suffix, multiplier in scaling_factors.items():
+    for suffix, multiplier in MAGNITUDE_FACTORS.items():
         if suffix in clean_text:
             numeric_value = float(clean_text.replace(suffix, ""))
             return int(numeric_value * multiplier)
@@ -27,6 +31,173 @@ def convert_magnitude_string(raw_input: str) -> int:
     return int(float(clean_text))
 
 
+def convert_magnitude_series(raw_values) -> "pd.Series":
+    """
+    Vectorized version of `convert_magnitude_string` for a whole column of values.
+
+    Values that cannot be parsed (empty strings, `None`, free text) become `<NA>`
+    instead of raising, so a single bad cell does not abort the conversion.
+
+    Args
+    ----
+        - `raw_values` (pd.Series | list): Values such as "1K", "550.1K", "10.3M" or "1,234".
+
+    Returns
+    -------
+        - `pd.Series`: Nullable integer (`Int64`) series, index preserved.
+
+    Example
+    -------
+    ```
+    convert_magnitude_series(["1K", "10.3M", "", "42"])
+    0         1000
+    1     10300000
+    2         <NA>
+    3           42
+    dtype: Int64
+    ```
+    """
+    import numpy as np
+    import pandas as pd
+
+    source = raw_values if isinstance(raw_values, pd.Series) else pd.Series(list(raw_values), dtype="object")
+
+    # Count columns repeat a lot ("1K", "1.2M"...): parse each distinct value once
+    codes, uniques = pd.factorize(source)
+    clean_text = pd.Series(uniques, dtype="object").astype(str).str.strip().str.lower().str.replace(",", "", regex=False)
+
+    multiplier = clean_text.str[-1:].map(MAGNITUDE_FACTORS)
+    numeric_text = clean_text.where(multiplier.isna(), clean_text.str[:-1])
+    numeric_value = pd.to_numeric(numeric_text, errors="coerce")
+    numeric_value = numeric_value.mask(numeric_value.abs() == float("inf"))
+
+    # Truncated like `int()` in `convert_magnitude_string`, so both give the same number
+    parsed = np.trunc(numeric_value * multiplier.fillna(1)).astype("Int64")
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=source.index)
+
+
+# Candidate layouts tried on a sample of the values, most common first. The last
+# ISO variant keeps the colon before the fraction accepted by older releases.
+TIMESTAMP_FORMATS = (
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f%z",
+    "%Y-%m-%d %H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%d %H:%M:%S.%f UTC",
+    "%Y-%m-%d %H:%M:%S UTC",
+    "%Y-%m-%d",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y",
+    "%Y-%m-%d %H:%M:%S:%f",
+)
+
+
+def _parse_with_format(text_values, timestamp_format):
+    import pandas as pd
+
+    # Parsed as UTC so offsets ("+03:00", "Z") and naive values end up on the same clock
+    return pd.to_datetime(text_values, format=timestamp_format, errors="coerce", utc=True)
+
+
+def parse_timestamp_series(
+    raw_values,
+    formats: tuple = TIMESTAMP_FORMATS,
+    sample_size: int = 1000,
+    utc: bool = False,
+    return_failures: bool = False,
+):
+    """
+    Parse a column of timestamp strings on pandas' fast path.
+
+    The format is inferred from an evenly spaced sample of the distinct values,
+    every distinct string is parsed only once, and the few values that do not
+    follow the inferred format get a second, per-value attempt. Whatever still
+    fails becomes `NaT` and is counted instead of leaving the column as `object`.
+
+    Args
+    ----
+        - `raw_values` (pd.Series | list): Strings (or datetime objects) to parse; empty strings count as missing.
+        - `formats` (tuple, optional): Candidate `strftime` formats (default is `TIMESTAMP_FORMATS`).
+        - `sample_size` (int, optional): Distinct values used to pick the format (default is 1000).
+        - `utc` (bool, optional): Return timezone-aware UTC values instead of naive UTC (default is False).
+        - `return_failures` (bool, optional): Also return the number of non-empty values that could not be parsed.
+
+    Returns
+    -------
+        - `pd.Series`: `datetime64` series, index preserved (and the failure count when `return_failures` is True).
+
+    Example
+    -------
+    ```
+    parse_timestamp_series(["2024-01-01 10:00:00", "2024-01-01 10:00:00.5", "", "soon"], return_failures=True)
+    (0   2024-01-01 10:00:00.000
+     1   2024-01-01 10:00:00.500
+     2                       NaT
+     3                       NaT
+     dtype: datetime64[ns], 1)
+    ```
+    """
+    import numpy as np
+    import pandas as pd
+
+    source = raw_values if isinstance(raw_values, pd.Series) else pd.Series(list(raw_values), dtype="object")
+    if pd.api.types.is_datetime64_any_dtype(source.dtype):
+        return (source, 0) if return_failures else source
+
+    # Timestamps often repeat (daily snapshots, batch loads): parse each distinct value once,
+    # unless a sample shows they are mostly unique and deduplicating would cost more than it saves
+    probe = source.iloc[:: max(1, len(source) // sample_size)]
+    deduplicate = probe.nunique() < 0.5 * len(probe)
+    if deduplicate:
+        codes, uniques = pd.factorize(source)
+        values = pd.Series(uniques, dtype="object")
+    else:
+        values = source.reset_index(drop=True)
+    # Skip the copies when the values are already clean strings (the usual case)
+    text_values = values if pd.api.types.infer_dtype(values, skipna=True) == "string" else values.astype(str)
+    if (probe.astype(str).str.strip() != probe.astype(str)).any():
+        text_values = text_values.str.strip()
+    pending = ~(values.isna() | (text_values == "")).to_numpy()
+
+    parsed = pd.Series(pd.NaT, index=text_values.index, dtype="datetime64[ns, UTC]")
+    if pending.any():
+        candidates = np.flatnonzero(pending)
+        sample = text_values.iloc[candidates[:: max(1, len(candidates) // sample_size)][:sample_size]]
+
+        # Keep the format that parses the largest share of the sample
+        best_format, best_hits = None, 0
+        for timestamp_format in formats:
+            hits = _parse_with_format(sample, timestamp_format).notna().sum()
+            if hits > best_hits:
+                best_format, best_hits = timestamp_format, hits
+                if hits == len(sample):
+                    break
+
+        if best_format is not None:
+            parsed = _parse_with_format(text_values.where(pending), best_format)
+            pending &= parsed.isna().to_numpy()
+
+        # Stragglers in another layout: per-value parsing, but only for them
+        if pending.any():
+            mixed = {"format": "mixed"} if int(pd.__version__.split(".")[0]) >= 2 else {}
+            parsed[pending] = pd.to_datetime(text_values[pending], errors="coerce", utc=True, **mixed)
+            pending &= parsed.isna().to_numpy()
+
+    if not utc:
+        parsed = parsed.dt.tz_localize(None)
+    if deduplicate:
+        result = pd.Series(parsed.array.take(codes, allow_fill=True), index=source.index, name=source.name)
+        failures = int(np.isin(codes, np.flatnonzero(pending)).sum())
+    else:
+        result = pd.Series(parsed.array, index=source.index, name=source.name)
+        failures = int(pending.sum())
+    return (result, failures) if return_failures else result
+
+
 import re
 
 
@@ -62,3 +233,135 @@ def format_column_header(label: str, lowercase: bool = True) -> str:
         return sanitized.lower()
     else:
         return sanitized.upper()
+
+
+def _encode_frame(frame):
+    """Arrow IPC stream of `frame` (one buffer, no per-object pickling); pickled as is when Arrow cannot hold it."""
+    import pyarrow as pa
+
+    try:
+        table = pa.Table.from_pandas(frame)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return "pickle", frame  # e.g. object columns mixing types
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return "arrow", sink.getvalue().to_pybytes()
+
+
+def _decode_frame(encoded):
+    import pyarrow as pa
+
+    kind, payload = encoded
+    if kind == "pickle":
+        return payload
+    return pa.ipc.open_stream(payload).read_all().to_pandas()
+
+
+def _apply_transform_steps(frame, steps):
+    for step in steps:
+        if callable(step):
+            frame = step(frame)
+        else:
+            column, function, *options = step
+            frame[column] = function(frame[column], **(options[0] if options else {}))
+    return frame
+
+
+def _run_transform_chunk(encoded, steps):
+    """Worker side of `transform_in_parallel`: decode, apply the steps, encode the result."""
+    return _encode_frame(_apply_transform_steps(_decode_frame(encoded), steps))
+
+
+def transform_in_parallel(
+    df_input,
+    steps: list,
+    max_workers: int = None,
+    chunk_rows: int = None,
+    mp_context: str = "spawn",
+    executor=None,
+):
+    """
+    Apply a pipeline of transformations to row chunks of a DataFrame on a process pool.
+
+    Chunks travel to and from the workers as Arrow IPC streams, a single buffer per chunk,
+    instead of pickling every Python object of the frame; frames Arrow cannot represent
+    fall back to pickling. At most two chunks per worker are in flight, and the results
+    are concatenated in the original row order with the original index.
+
+    Args
+    ----
+        - `df_input` (pd.DataFrame): The frame to transform.
+        - `steps` (list): Applied in order to every chunk. Each step is either a function taking and
+          returning a DataFrame, or a `(column, function)` / `(column, function, kwargs)` tuple replacing
+          `column` with `function(chunk[column], **kwargs)`, e.g. `("followers", convert_magnitude_series)`.
+          Functions must be importable by the workers (defined at module level, not lambdas).
+        - `max_workers` (int, optional): Worker processes (default is the number of usable CPUs); with one
+          worker and no `executor` the steps run in this process.
+        - `chunk_rows` (int, optional): Rows per chunk (default splits the frame in 4 chunks per worker).
+        - `mp_context` (str, optional): Start method of the workers; "spawn" avoids forking the logging threads.
+        - `executor` (ProcessPoolExecutor, optional): Reuse a running pool instead of starting one per call;
+          `max_workers` is then required and should be the size of that pool.
+
+    Returns
+    -------
+        - `pd.DataFrame`: The transformed frame.
+
+    Example
+    -------
+    ```
+    clean_df = transform_in_parallel(
+        raw_df,
+        [("followers", convert_magnitude_series), ("created_at", parse_timestamp_series, {"utc": True}), drop_test_rows],
+        max_workers=8,
+    )
+    ```
+    """
+    import os
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+
+    import pandas as pd
+
+    from quati.logger import PIPE_TRANSFORM
+    from quati.logger.instrumentation import track_stage
+
+    if max_workers is None:
+        if executor is not None:
+            raise ValueError("max_workers is required with executor: pass the size of the pool")
+        max_workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    row_count = len(df_input.index)
+    chunk_rows = chunk_rows or max(1, -(-row_count // (max_workers * 4)))
+
+    with track_stage(PIPE_TRANSFORM, "transform_in_parallel") as metrics:
+        metrics.rows_in = row_count
+        if (executor is None and max_workers <= 1) or row_count <= chunk_rows:
+            result_df = _apply_transform_steps(df_input.copy(), steps)
+            metrics.rows_out = len(result_df.index)
+            return result_df
+
+        pool = executor or ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context(mp_context))
+        try:
+            chunks, in_flight = [], deque()
+
+            def collect():
+                encoded = in_flight.popleft().result()
+                metrics.bytes_transferred += len(encoded[1]) if encoded[0] == "arrow" else 0
+                chunks.append(_decode_frame(encoded))
+
+            for start in range(0, row_count, chunk_rows):
+                if len(in_flight) >= 2 * max_workers:
+                    collect()
+                encoded = _encode_frame(df_input.iloc[start : start + chunk_rows])
+                metrics.bytes_transferred += len(encoded[1]) if encoded[0] == "arrow" else 0
+                in_flight.append(pool.submit(_run_transform_chunk, encoded, steps))
+            while in_flight:
+                collect()
+        finally:
+            if executor is None:
+                pool.shutdown(cancel_futures=True)
+
+        result_df = pd.concat(chunks)
+        metrics.rows_out = len(result_df.index)
+    return result_df
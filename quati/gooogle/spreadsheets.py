@@ -1,7 +1,342 @@
-import gspread
-import pandas as pd
+import hashlib
+import os
+import pickle
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
 
+from quati.logger import (
+    ERROR_API_FAILED,
+    ETL_IN_PROGRESS,
+    PIPE_EXTRACT,
+    PIPE_LOAD,
+    STATUS_API_REQUEST_START,
+    SUCCESS_API_DATA_UPDATED,
+)
+from quati.logger.instrumentation import timed_stage, track_stage
+from quati.logger.pipeline import get_logger
+
+log = get_logger(__name__)
+
+# Columns whose distinct values are at most this share of the rows become categoricals
+CATEGORY_RATIO = 0.5
+# Integers beyond float64 precision (long IDs) stay as text
+MAX_EXACT_INTEGER = 2**53
+# Upload payloads are kept under the recommended 2 MB request size of the Sheets API
+SHEETS_MAX_PAYLOAD_BYTES = 2 * 1024 * 1024
+SERIALIZATION_BLOCK_ROWS = 5000
+# Drive metadata request used to tell whether a spreadsheet changed since the last read
+DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files/{}"
+
+
+def _parse_sheet_numbers(text):
+    """`pd.to_numeric(text, errors="coerce")` for cell strings, with a fast path for clean number columns."""
+    import numpy as np
+    import pandas as pd
+
+    # Casting to float64 runs in C and stops at the first non-number, while to_numeric on
+    # object strings is an order of magnitude slower; Python's float() also accepts "1_000"
+    # and non-ASCII digits, which to_numeric rejects, so those columns take the slow path
+    joined = "".join(text.dropna().tolist())
+    if "_" not in joined and joined.isascii():
+        try:
+            return pd.Series(text.to_numpy(dtype=object).astype(np.float64), index=text.index)
+        except (TypeError, ValueError):
+            pass
+    return pd.to_numeric(text, errors="coerce")
+
+
+def _convert_sheet_column(values, decimal, thousands, category_ratio):
+    """Turn one column of cell strings into the most compact pandas representation."""
+    import pandas as pd
+
+    raw = values if isinstance(values, pd.Series) else pd.Series(values, dtype="object")
+    codes, uniques = pd.factorize(raw)
+    text = pd.Series(uniques, dtype="object").astype(str).str.strip()
+    blank = text == ""
+
+    normalized = text
+    if thousands:
+        has_separator = text.str.contains(thousands, regex=False)
+        if has_separator.any():
+            # Only strictly grouped values lose the separator: "1,234.5" is a number, while
+            # "3,5" or "1,2,3" would silently become 35 and 123, so they fail the parse instead
+            pattern = rf"[-+]?\d{{1,3}}(?:{re.escape(thousands)}\d{{3}})+(?:{re.escape(decimal)}\d+)?"
+            grouped = text[has_separator]
+            grouped = grouped.str.replace(thousands, "", regex=False).where(grouped.str.fullmatch(pattern))
+            normalized = text.where(~has_separator, grouped)
+    if decimal != ".":
+        normalized = normalized.str.replace(decimal, ".", regex=False)
+    numbers = _parse_sheet_numbers(normalized.where(~blank))
+
+    parsed = numbers.notna()
+    is_numeric = (
+        parsed.any()
+        and (parsed | blank).all()
+        and not text.str.match(r"^[-+]?0\d").any()  # zero-padded codes keep their zeros
+        and numbers.abs().max() < MAX_EXACT_INTEGER
+    )
+    if is_numeric:
+        if (numbers.dropna() % 1 == 0).all():
+            typed = numbers.round().astype("Int64")
+        else:
+            typed = numbers.astype("Float64")
+        return pd.Series(typed.array.take(codes, allow_fill=True))
+
+    if len(raw) and len(uniques) <= category_ratio * len(raw):
+        return pd.Series(pd.Categorical.from_codes(codes, categories=uniques))
+
+    return raw
+
+
+def _format_float(value):
+    text = repr(value)
+    if "e" not in text:
+        return text
+
+    # repr switches to scientific notation below 1e-4 and from 1e16
+    from numpy import format_float_positional
+
+    return format_float_positional(value, trim="-")
+
+
+def _format_upload_column(column, numbers_as_text):
+    """Format one column of a row block for the Sheets API: ISO dates, blanks for missing values."""
+    missing = column.isna().to_numpy()
+    kind = column.dtype.kind
+
+    if kind == "M":
+        present = column[~missing]
+        has_time = bool(len(present)) and bool((present.dt.normalize() != present).any())
+        text = column.dt.strftime("%Y-%m-%d %H:%M:%S" if has_time else "%Y-%m-%d")
+        return text.where(~missing, "").tolist()
+
+    if kind == "f":
+        values = column.to_numpy(dtype="float64", na_value=float("nan")).tolist()
+        formatter = _format_float if numbers_as_text else float
+        return ["" if is_missing else formatter(value) for value, is_missing in zip(values, missing)]
+
+    if kind in "iub" and not numbers_as_text:
+        return column.astype(object).where(~missing, "").tolist()
+    if not missing.any():
+        return column.astype(str).tolist()
+    values = column.astype(str).tolist()
+    return ["" if is_missing else value for value, is_missing in zip(values, missing)]
+
+
+def _split_anchor_cell(anchor_cell):
+    """Column letters and row number of the first cell of "B5", "A12:C20" or "'Sheet 1'!$A$1"."""
+    match = re.fullmatch(r"(?:.*!)?\$?([A-Za-z]+)\$?(\d+)(?::\$?[A-Za-z]*\$?\d*)?", str(anchor_cell).strip())
+    if match is None:
+        raise ValueError(f"anchor cell must be a cell such as 'A1' or a range starting with one, got {anchor_cell!r}")
+    return match.group(1).upper(), int(match.group(2))
+
+
+def iter_sheet_payloads(source_df, anchor_cell="A1", numbers_as_text=True, max_payload_bytes=SHEETS_MAX_PAYLOAD_BYTES):
+    """
+    Serialize a DataFrame into `(cell, rows)` payloads for the Sheets API, without copying the whole frame.
+
+    Rows are formatted column-wise in blocks of `SERIALIZATION_BLOCK_ROWS`: datetimes as ISO
+    (`YYYY-MM-DD`, plus ` HH:MM:SS` when a column carries times), missing values as "" and floats
+    without scientific notation. Consecutive rows are packed into payloads whose JSON size stays
+    under `max_payload_bytes`; `cell` is where each payload starts.
+
+    Args:
+        source_df (pd.DataFrame): The data to upload (the header is not included).
+        anchor_cell (str, optional): Cell of the first row, e.g. "B5"; for a range ("B5:D20", "Sheet1!B5")
+            its first cell is used. Defaults to "A1".
+        numbers_as_text (bool, optional): Send numbers and booleans as text, like `astype(str)` did.
+            Use False with `value_input_option="RAW"` to keep them numeric. Defaults to True.
+        max_payload_bytes (int, optional): Size budget per payload. Defaults to 2 MB.
+
+    Yields:
+        tuple[str, list[list]]: The payload anchor cell and its rows.
+
+    Example:
+        for cell, rows in iter_sheet_payloads(dataframe, "A2"):
+            worksheet.update(cell, rows, value_input_option="USER_ENTERED")
+    """
+    for cell, rows, _ in _sized_sheet_payloads(source_df, anchor_cell, numbers_as_text, max_payload_bytes):
+        yield cell, rows
+
+
+def _sized_sheet_payloads(source_df, anchor_cell, numbers_as_text, max_payload_bytes):
+    """`iter_sheet_payloads` that also yields the estimated JSON size of each payload."""
+    import numpy as np
+
+    column_letters, next_row = _split_anchor_cell(anchor_cell)
+    pending_rows, pending_bytes = [], 0
+
+    for block_start in range(0, len(source_df.index), SERIALIZATION_BLOCK_ROWS):
+        block = source_df.iloc[block_start : block_start + SERIALIZATION_BLOCK_ROWS]
+        columns = [_format_upload_column(block.iloc[:, position], numbers_as_text) for position in range(block.shape[1])]
+
+        # JSON size per row: quotes and separators (4 bytes per cell) plus the cell text;
+        # native numbers are counted as 24 characters, the longest repr of a float
+        row_bytes = np.full(len(block.index), 2 + 4 * len(columns))
+        for position, values in enumerate(columns):
+            if numbers_as_text or block.dtypes.iloc[position].kind not in "iubf":
+                row_bytes += np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+            else:
+                row_bytes += 24
+
+        rows = list(map(list, zip(*columns)))
+        cumulative_bytes = np.cumsum(row_bytes)
+        offset = 0
+        while offset < len(rows):
+            consumed = int(cumulative_bytes[offset - 1]) if offset else 0
+            end = int(np.searchsorted(cumulative_bytes, consumed + max_payload_bytes - pending_bytes, side="right"))
+            if end == offset and not pending_rows:
+                end = offset + 1  # a single row larger than the budget still has to go
+            pending_rows.extend(rows[offset:end])
+            pending_bytes += int(cumulative_bytes[end - 1]) - consumed if end > offset else 0
+            offset = end
+            if offset < len(rows):
+                yield f"{column_letters}{next_row}", pending_rows, pending_bytes
+                next_row += len(pending_rows)
+                pending_rows, pending_bytes = [], 0
+
+    if pending_rows:
+        yield f"{column_letters}{next_row}", pending_rows, pending_bytes
+
+
+def upload_df_in_chunks(
+    tab_obj,
+    source_df,
+    anchor_cell,
+    value_input_option="USER_ENTERED",
+    numbers_as_text=True,
+    max_payload_bytes=SHEETS_MAX_PAYLOAD_BYTES,
+    max_workers=1,
+    limiter=None,
+    stage_metrics=None,
+    throttle_retries=5,
+    throttle_wait=1.0,
+):
+    """
+    Upload a DataFrame in payloads under the API size limit, in sequence or concurrently.
+
+    Args:
+        tab_obj (gspread.models.Worksheet): The worksheet object to update.
+        source_df (pd.DataFrame): The data to upload (the header is not included).
+        anchor_cell (str): Cell of the first row, e.g. "A3".
+        value_input_option (str, optional): "USER_ENTERED" or "RAW". Defaults to "USER_ENTERED".
+        numbers_as_text (bool, optional): See `iter_sheet_payloads`. Defaults to True.
+        max_payload_bytes (int, optional): Size budget per request. Defaults to 2 MB.
+        max_workers (int, optional): Concurrent requests; 1 sends the payloads in order. Defaults to 1.
+        limiter (AdaptiveLimiter, optional): Adjust the concurrency to the API quota instead of using
+            `max_workers`; 429 responses lower the limit, saturated successful rounds raise it.
+        throttle_retries (int, optional): With a `limiter`, times a throttled payload is sent again
+            (after the limit went down) before the upload fails. Defaults to 5.
+        throttle_wait (float, optional): Seconds before the first resend, doubled on each attempt. Defaults to 1.
+        stage_metrics (StageMetrics, optional): Stage of the caller; the payload bytes are added to its
+            `bytes_transferred`.
+
+    Returns:
+        int: The number of requests sent.
+
+    Example:
+        upload_df_in_chunks(worksheet, big_dataframe, "A2", max_workers=4)
+        upload_df_in_chunks(worksheet, big_dataframe, "A2", limiter=AdaptiveLimiter(initial=2, maximum=16))
+    """
+    payloads = _sized_sheet_payloads(source_df, anchor_cell, numbers_as_text, max_payload_bytes)
+
+    def send(payload):
+        cell, rows, payload_bytes = payload
+        tab_obj.update(cell, rows, value_input_option=value_input_option)
+        if stage_metrics is not None:
+            stage_metrics.bytes_transferred += payload_bytes
+
+    if limiter is not None:
+        return len(limiter.map(send, payloads, retries=throttle_retries, retry_wait=throttle_wait))
+
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return len(list(pool.map(send, payloads)))
+
+    sent = 0
+    for payload in payloads:
+        send(payload)
+        sent += 1
+    return sent
+
+
+def build_dataframe_from_values(
+    value_matrix,
+    header_row=0,
+    use_header=True,
+    decimal=".",
+    thousands=",",
+    category_ratio=CATEGORY_RATIO,
+    report_memory=False,
+):
+    """
+    Build a compact DataFrame straight from the value matrix returned by the Sheets API.
+
+    The matrix is converted to columns in a single pass (no per-row dicts); numeric columns are
+    parsed with the given separators into nullable `Int64`/`Float64` (blank cells become
+    `<NA>`), low-cardinality text becomes `category` and everything else stays as text.
+
+    Args:
+        value_matrix (list[list[str]]): Rows as returned by `get_all_values()`.
+        header_row (int, optional): Row holding the column names; data starts right after it. Defaults to 0.
+        use_header (bool, optional): Whether the matrix has a header row. Defaults to True.
+        decimal (str, optional): Decimal separator, e.g. "," for "1.234,56". Defaults to ".".
+        thousands (str, optional): Thousands separator, or "" to disable. Defaults to ",".
+        category_ratio (float, optional): Maximum distinct/rows ratio for categorical columns. Defaults to 0.5.
+        report_memory (bool, optional): Also return a dict comparing the memory of a plain object
+            DataFrame (estimated) with the returned one. Defaults to False.
+
+    Returns:
+        pd.DataFrame, or (pd.DataFrame, dict) when `report_memory` is True.
+
+    Example:
+        Build a dataframe from a Brazilian-formatted sheet.
+
+        dataframe = build_dataframe_from_values(worksheet.get_all_values(), decimal=",", thousands=".")
+    """
+    import pandas as pd
+
+    if use_header:
+        header = list(value_matrix[header_row]) if value_matrix else []
+        body = value_matrix[header_row + 1 :]
+    else:
+        body = value_matrix
+        header = list(range(max((len(row) for row in body), default=0)))
+
+    # One C-level pass builds the object matrix; the API trims trailing empty cells, so
+    # short rows come back padded with None and are filled as the empty strings they were
+    cells = pd.DataFrame(body, dtype="object") if body else pd.DataFrame(index=range(0))
+    ragged = len({len(row) for row in body}) > 1
+    columns = []
+    for position in range(len(header)):
+        if position >= cells.shape[1]:
+            columns.append(pd.Series([""] * len(body), dtype="object"))
+        else:
+            column = cells.iloc[:, position]
+            columns.append(column.where(column.notna(), "") if ragged else column)
+
+    result_df = pd.DataFrame(
+        {
+            position: _convert_sheet_column(column, decimal, thousands, category_ratio)
+            for position, column in enumerate(columns)
+        }
+    )
+    result_df.columns = header
+    if not report_memory:
+        return result_df
+
+    # Estimated footprint of pd.DataFrame(rows): one pointer plus one str object (49 bytes + text) per cell
+    object_bytes = sum(len(column) * (8 + 49) + int(column.str.len().sum()) for column in columns)
+    optimized_bytes = int(result_df.memory_usage(deep=True, index=False).sum())
+    report = {
+        "object_frame_bytes": object_bytes,
+        "optimized_frame_bytes": optimized_bytes,
+        "saved_bytes": object_bytes - optimized_bytes,
+    }
+    return result_df, report
+
 
 def acquire_gsheet_access(auth_credentials, workbook_title, tab_title):
     """
@@ -22,12 +357,15 @@ def acquire_gsheet_access(auth_credentials, workbook_title, tab_title):
     Get the Google Sheets worksheet object
     >>> worksheet = acquire_gsheet_access(GSHEETS_CREDENTIAL, "worksheet name", "data page name", 6)
     """
+    import gspread
+
     session = gspread.authorize(auth_credentials)
     target_tab = session.open(workbook_title).worksheet(tab_title)
     return target_tab
 
 
-def retrieve_gsheet_as_df(auth_credentials, workbook_title, tab_title, header_index=1):
+@timed_stage(PIPE_EXTRACT)
+def retrieve_gsheet_as_df(auth_credentials, workbook_title, tab_title, header_index=1, optimize_dtypes=False, cache=None):
     """
     Import a worksheet object from gsheets as a pandas dataframe
 
@@ -37,6 +375,9 @@ def retrieve_gsheet_as_df(auth_credentials, workbook_title, tab_title, header_in
     `workbook_title` : name of the worksheet you want to get information about
     `tab_title` : sheet page name you want to get data from
     `header_index` : row where data header starts
+    `optimize_dtypes` : build the dataframe with `build_dataframe_from_values` (nullable numbers,
+    categoricals) instead of one dict per row from `get_all_records`; off by default
+    `cache` : a `SheetReadCache`; the values are only downloaded when the spreadsheet changed
 
     By default: the function consider row 1 as header
 
@@ -49,8 +390,19 @@ def retrieve_gsheet_as_df(auth_credentials, workbook_title, tab_title, header_in
     ```
     """
     tab_obj = acquire_gsheet_access(auth_credentials, workbook_title, tab_title)
-    extracted_data = pd.DataFrame(tab_obj.get_all_records(head=header_index))
-    return extracted_data
+
+    def load():
+        if optimize_dtypes:
+            return build_dataframe_from_values(tab_obj.get_all_values(), header_row=header_index - 1)
+
+        import pandas as pd
+
+        extracted_data = pd.DataFrame(tab_obj.get_all_records(head=header_index))
+        return extracted_data
+
+    if cache is not None:
+        return cache.get_or_load(tab_obj, load, variant=f"records:{header_index}:{optimize_dtypes}")
+    return load()
 
 
 def remove_gsheet_duplicates(
@@ -76,6 +428,8 @@ def remove_gsheet_duplicates(
         - `origin_cell` : Cell "A1" as the starting point for dataframe cleaning and reordering
         - `boundary_cell` : The cell "ZZ" as the endpoint for dataframe cleaning and reordering
 
+    Rows are duplicates when their `match_columns` read the same as text; the returned dataframe keeps the original values.
+
     Examples
     --------
     Get the Google Sheets worksheet object
@@ -84,17 +438,17 @@ def remove_gsheet_duplicates(
     dedup_df = remove_gsheet_duplicates(GSHEETS_CREDENTIAL, "post_title", "facebook_posts", "all_posts", "last", "A5")
     ```
     """
+    import gspread
+
     tab_instance = gspread.authorize(auth_credentials).open(workbook_title).worksheet(tab_title)
-    data_frame = retrieve_gsheet_as_df(auth_credentials, workbook_title, tab_title)
+    data_frame = retrieve_gsheet_as_df(auth_credentials, workbook_title, tab_title, optimize_dtypes=False)
 
-    data_frame = data_frame.astype(str).drop_duplicates(subset=match_columns, keep=keep_strategy)
+    # Keys are compared as the text the sheet shows, so a numericised 1 and a text "1" are duplicates
+    match_keys = data_frame[match_columns].astype(str)
+    data_frame = data_frame[~match_keys.duplicated(keep=keep_strategy)]
 
     tab_instance.batch_clear([f"{origin_cell}:{boundary_cell}"])
-    tab_instance.update(
-        f"{origin_cell}",
-        data_frame.values.tolist(),
-        value_input_option="USER_ENTERED",
-    )
+    upload_df_in_chunks(tab_instance, data_frame, origin_cell, value_input_option="USER_ENTERED")
 
     return data_frame
 
@@ -140,12 +494,9 @@ def push_df_to_gsheet(tab_obj, source_df, anchor_cell):
     push_df_to_gsheet(worksheet, facebook_metrics_df, "A3")
     ```
     """
-    formatted_df = source_df.astype(str)
-    tab_obj.update(
-        f"{anchor_cell}",
-        formatted_df.values.tolist(),
-        value_input_option="USER_ENTERED",
-    )
+    with track_stage(PIPE_LOAD, "push_df_to_gsheet") as metrics:
+        metrics.rows_in = len(source_df.index)
+        upload_df_in_chunks(tab_obj, source_df, f"{anchor_cell}", value_input_option="USER_ENTERED", stage_metrics=metrics)
 
 
 def safe_open_tab(client, book_name, tab_name, limit=5, wait=60):
@@ -177,9 +528,9 @@ def safe_open_tab(client, book_name, tab_name, limit=5, wait=60):
             return client.open(book_name).worksheet(tab_name)
         except Exception as error:
             step += 1
-            print(f"Attempt {step} | Book: {book_name} | Tab: {tab_name} failed: \n{error}")
+            log.error(ERROR_API_FAILED, "Attempt %d | Book: %s | Tab: %s failed: %s", step, book_name, tab_name, error)
             if step < limit:
-                print(f"Waiting {wait}s...")
+                log.info(STATUS_API_REQUEST_START, "Waiting %ss...", wait)
                 sleep(wait)
             else:
                 raise
@@ -214,14 +565,135 @@ def safe_open_tab_by_url(client, link, tab_name, limit=5, wait=60):
             return client.open_by_url(link).worksheet(tab_name)
         except Exception as error:
             step += 1
-            print(f"Attempt {step} | URL: {link} | Tab: {tab_name} failed: \n{error}")
+            log.error(ERROR_API_FAILED, "Attempt %d | URL: %s | Tab: %s failed: %s", step, link, tab_name, error)
             if step < limit:
                 sleep(wait)
             else:
                 raise
 
 
-def fetch_records_with_resilience(tab_obj, limit=5, wait=60, header_row=0, use_header=True):
+def fetch_sheet_revision(tab_obj):
+    """
+    Return the Drive revision of the spreadsheet holding `tab_obj`, e.g. "1482:2024-06-01T10:22:31.104Z".
+
+    One metadata request (`version` and `modifiedTime`, a few hundred bytes) instead of the
+    whole value matrix. The revision changes whenever any tab of the file is edited. Needs a
+    Drive scope on the credentials; returns None when the metadata cannot be read.
+
+    Args:
+        tab_obj (gspread.models.Worksheet): Any worksheet of the spreadsheet.
+
+    Returns:
+        str | None: `version:modifiedTime` of the file.
+    """
+    spreadsheet = tab_obj.spreadsheet
+    try:
+        response = spreadsheet.client.request(
+            "get",
+            DRIVE_FILES_URL.format(spreadsheet.id),
+            params={"fields": "version,modifiedTime", "supportsAllDrives": True},
+        )
+        metadata = response.json()
+    except Exception as error:
+        log.error(ERROR_API_FAILED, "Drive metadata of %s: %r", spreadsheet.id, error, stage=PIPE_EXTRACT)
+        return None
+    return f"{metadata.get('version')}:{metadata.get('modifiedTime')}"
+
+
+class SheetReadCache:
+    """
+    Last DataFrame read from each tab, reused until the spreadsheet revision changes.
+
+    Every read first asks Drive for the file revision (`fetch_sheet_revision`); the values are
+    only downloaded again when it differs from the cached one. With `cache_dir`, entries are
+    also pickled to disk, so separate processes (e.g. cron runs) share them.
+
+    Args:
+        cache_dir (str, optional): Folder for the on-disk entries; memory only when None.
+
+    Example:
+        cache = SheetReadCache("/var/cache/quati/sheets")
+        dataframe = fetch_records_with_resilience(worksheet, cache=cache)
+        cache.hits, cache.misses
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.pickle")
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.cache_dir and os.path.exists(self._entry_path(key)):
+            try:
+                with open(self._entry_path(key), "rb") as input_file:
+                    entry = pickle.load(input_file)
+            except Exception:
+                entry = None  # unreadable entry (e.g. another process writing): read the sheet again
+        return entry
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+        if self.cache_dir:
+            # Write then rename, so another process never loads a half-written entry
+            path = self._entry_path(key)
+            temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "wb") as output_file:
+                pickle.dump(entry, output_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+
+    def get_or_load(self, tab_obj, load, variant=""):
+        """
+        Return the cached DataFrame of `tab_obj` if the spreadsheet did not change, else `load()` it.
+
+        Args:
+            tab_obj (gspread.models.Worksheet): The worksheet being read.
+            load (Callable[[], pd.DataFrame]): Downloads and builds the DataFrame.
+            variant (str, optional): Distinguishes reads of the same tab with different options.
+
+        Returns:
+            pd.DataFrame: A copy of the cached frame, or the freshly loaded one.
+        """
+        key = (tab_obj.spreadsheet.id, tab_obj.id, variant)
+        # Read the revision before the values: an edit made during the download shows up next time
+        revision = fetch_sheet_revision(tab_obj)
+        entry = self._lookup(key) if revision is not None else None
+        if entry is not None and entry["revision"] == revision:
+            with self._lock:
+                self.hits += 1
+            log.debug(ETL_IN_PROGRESS, "%s unchanged (%s), using the cached values", tab_obj.title, revision, stage=PIPE_EXTRACT)
+            return entry["data"].copy()
+
+        with self._lock:
+            self.misses += 1
+        result_df = load()
+        if revision is not None:
+            self._store(key, {"revision": revision, "data": result_df.copy()})
+        return result_df
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".pickle"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+
+@timed_stage(PIPE_EXTRACT)
+def fetch_records_with_resilience(
+    tab_obj, limit=5, wait=60, header_row=0, use_header=True, optimize_dtypes=False, limiter=None, cache=None
+):
     """
     Fetches records from a Google Sheets worksheet and converts them into a Pandas DataFrame,
     with retry logic to handle potential errors during the fetch process.
@@ -232,6 +704,12 @@ def fetch_records_with_resilience(tab_obj, limit=5, wait=60, header_row=0, use_h
         wait (int, optional): The time (in seconds) to wait between retry attempts. Defaults to 60.
         header_row (int, optional): Specifies the row to use for column headers. Defaults to 0 (first row).
         use_header (bool, optional): Whether to use the first row as column headers. Defaults to True.
+        optimize_dtypes (bool, optional): Convert the values with `build_dataframe_from_values` (nullable
+            numbers, categoricals; data starts after `header_row`) instead of keeping every cell as a string.
+            Defaults to False.
+        limiter (AdaptiveLimiter, optional): Shared limit on the concurrent reads; each attempt holds a slot.
+        cache (SheetReadCache, optional): Skip the download when the spreadsheet did not change since the
+            last read of this tab with the same options.
 
     Returns:
         pd.DataFrame: A Pandas DataFrame containing the fetched records.
@@ -245,21 +723,30 @@ def fetch_records_with_resilience(tab_obj, limit=5, wait=60, header_row=0, use_h
         dataframe = fetch_records_with_resilience(worksheet, header_row=0, use_header=True)
 
     """
-    count = 0
-    while count < limit:
-        try:
-            all_rows = tab_obj.get_all_values()
-            if use_header:
-                result_df = pd.DataFrame(all_rows[1:], columns=all_rows[header_row])
-            else:
-                result_df = pd.DataFrame(all_rows)
-            return result_df
-        except Exception as error:
-            count += 1
-            if count < limit:
-                sleep(wait)
-            else:
-                raise Exception(f"Fetch failed after {limit} tries. Error: {error}")
+    import pandas as pd
+
+    def load():
+        count = 0
+        while count < limit:
+            try:
+                all_rows = limiter.call(tab_obj.get_all_values) if limiter else tab_obj.get_all_values()
+                if optimize_dtypes:
+                    result_df = build_dataframe_from_values(all_rows, header_row=header_row, use_header=use_header)
+                elif use_header:
+                    result_df = pd.DataFrame(all_rows[1:], columns=all_rows[header_row])
+                else:
+                    result_df = pd.DataFrame(all_rows)
+                return result_df
+            except Exception as error:
+                count += 1
+                if count < limit:
+                    sleep(wait)
+                else:
+                    raise Exception(f"Fetch failed after {limit} tries. Error: {error}")
+
+    if cache is not None:
+        return cache.get_or_load(tab_obj, load, variant=f"{header_row}:{use_header}:{optimize_dtypes}")
+    return load()
 
 
 def find_next_row_with_resilience(tab_obj, col_index=1, limit=4, wait=60):
@@ -298,7 +785,7 @@ def find_next_row_with_resilience(tab_obj, col_index=1, limit=4, wait=60):
                 raise Exception(f"Row detection failed. Error: {error}")
 
 
-def safe_worksheet_update(tab_obj, target_cell, data_df, limit=5, wait=60):
+def safe_worksheet_update(tab_obj, target_cell, data_df, limit=5, wait=60, limiter=None):
     """
     Updates a Google Sheets worksheet with the provided data,
     using retries to handle potential errors during the update process.
@@ -307,9 +794,12 @@ def safe_worksheet_update(tab_obj, target_cell, data_df, limit=5, wait=60):
         tab_obj (gspread.models.Worksheet): The worksheet object to update.
         target_cell (str): The starting cell or range for the update (e.g., "A12").
                 Use `get_next_available_row_with_retry()` to determine available rows based on specific columns.
-        data_df (pandas.DataFrame): The data to be inserted, converted to a list of lists.
+        data_df (pandas.DataFrame): The data to be inserted; it is serialized with `iter_sheet_payloads`
+                and sent in requests under the API size limit.
         limit (int, optional): The maximum number of retry attempts in case of failure. Defaults to 5.
         wait (int, optional): The time (in seconds) to wait between retry attempts. Defaults to 60.
+        limiter (AdaptiveLimiter, optional): Shared limit on the concurrent writes, e.g. when several
+                threads update tabs of the same workbook; each attempt holds a slot.
 
     Returns:
         None
@@ -330,15 +820,23 @@ def safe_worksheet_update(tab_obj, target_cell, data_df, limit=5, wait=60):
         safe_worksheet_update(worksheet, target_cell="B5", dataframe.astype(str))
 
     """
-    count = 0
-    while count < limit:
-        try:
-            tab_obj.update(target_cell, data_df.values.tolist(), value_input_option="RAW")
-            print("Sync complete.")
-            return
-        except Exception as error:
-            count += 1
-            if count < limit:
-                sleep(wait)
-            else:
-                raise Exception(f"Update failed after {limit} tries. Error: {error}")
+    with track_stage(PIPE_LOAD, "safe_worksheet_update") as metrics:
+        metrics.rows_in = len(data_df.index)
+        # Each payload is retried on its own, so a failure never re-sends rows already written
+        for cell, rows, payload_bytes in _sized_sheet_payloads(data_df, target_cell, False, SHEETS_MAX_PAYLOAD_BYTES):
+            count = 0
+            while count < limit:
+                try:
+                    if limiter is not None:
+                        limiter.call(tab_obj.update, cell, rows, value_input_option="RAW")
+                    else:
+                        tab_obj.update(cell, rows, value_input_option="RAW")
+                    metrics.bytes_transferred += payload_bytes
+                    break
+                except Exception as error:
+                    count += 1
+                    if count < limit:
+                        sleep(wait)
+                    else:
+                        raise Exception(f"Update failed after {limit} tries. Error: {error}")
+        log.info(SUCCESS_API_DATA_UPDATED, "Sync complete.", stage=PIPE_LOAD, cell=target_cell)
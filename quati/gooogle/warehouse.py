@@ -1,11 +1,313 @@
-import pandas as pd
-import pandas_gbq
-from google.cloud import bigquery
-from google.oauth2 import service_account
+# pandas, pandas_gbq and the Google clients are imported inside the functions:
+# they cost seconds at import time and many callers only need one helper.
+import base64
+import collections
+import datetime as dt
+import functools
+import hashlib
+import heapq
+import json
+import math
+import os
+import queue
+import re
+import threading
+import time
+from contextlib import nullcontext
+from decimal import Decimal, InvalidOperation
+
+from quati.data.processing import parse_timestamp_series
+from quati.gooogle.spreadsheets import SHEETS_MAX_PAYLOAD_BYTES, _split_anchor_cell, upload_df_in_chunks
+from quati.logger import (
+    ERROR_API_FAILED,
+    ERROR_DB_QUERY,
+    ERROR_ETL_DATA_TRANSFORM,
+    ETL_FAILURE,
+    ETL_IN_PROGRESS,
+    PIPE_EXTRACT,
+    PIPE_LOAD,
+    PIPE_TRANSFORM,
+    STATUS_BQ_GET_TABLE,
+    SUCCESS_API_DATA_UPDATED,
+    SUCCESS_DB_QUERY_EXECUTED,
+)
+from quati.logger.instrumentation import track_stage
+from quati.logger.pipeline import get_logger
+
+log = get_logger(__name__)
+
+# Legacy and standard SQL spellings of the same BigQuery types
+BQ_TYPE_ALIASES = {
+    "BOOL": "BOOLEAN",
+    "FLOAT64": "FLOAT",
+    "INT64": "INTEGER",
+    "OBJECT": "STRING",
+    "STRUCT": "RECORD",
+    "DECIMAL": "NUMERIC",
+    "BIGDECIMAL": "BIGNUMERIC",
+}
+BQ_NUMERIC_SCALES = {"NUMERIC": 9, "BIGNUMERIC": 38}
+NUMERIC_MODES = ("decimal", "scaled", "float")
+# Types whose values are parsed even when `cast_ids_as_string` matches the column name
+BQ_TEMPORAL_TYPES = ("DATE", "DATETIME", "TIMESTAMP", "TIME")
+INT64_BOUND = 2**63 - 1
+
+
+def _bq_kind(field) -> str:
+    kind = field.field_type.upper()
+    return BQ_TYPE_ALIASES.get(kind, kind)
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _to_decimal(value):
+    if _is_missing(value):
+        return None
+    try:
+        # repr keeps the shortest exact form of floats (0.1 -> Decimal("0.1"))
+        return value if isinstance(value, Decimal) else Decimal(repr(value) if isinstance(value, float) else str(value).strip())
+    except InvalidOperation:
+        return None
+
+
+def _to_bool(value):
+    return value if isinstance(value, bool) else str(value).strip().lower() in ("true", "1", "t", "yes")
+
+
+def _to_timestamp(value):
+    moment = value if isinstance(value, dt.datetime) else dt.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return moment.replace(tzinfo=dt.timezone.utc) if moment.tzinfo is None else moment.astimezone(dt.timezone.utc)
+
+
+# Element parsers for values nested in REPEATED / RECORD fields
+_SCALAR_PARSERS = {
+    "BOOLEAN": _to_bool,
+    "FLOAT": float,
+    "INTEGER": int,
+    "STRING": str,
+    "NUMERIC": _to_decimal,
+    "BIGNUMERIC": _to_decimal,
+    "DATE": lambda value: value if isinstance(value, dt.date) else dt.date.fromisoformat(str(value)[:10]),
+    "DATETIME": lambda value: value if isinstance(value, dt.datetime) else dt.datetime.fromisoformat(str(value)),
+    "TIMESTAMP": _to_timestamp,
+    "TIME": lambda value: value if isinstance(value, dt.time) else dt.time.fromisoformat(str(value)),
+    "JSON": lambda value: value if isinstance(value, str) else json.dumps(value),
+    "GEOGRAPHY": str,
+    "BYTES": lambda value: base64.b64decode(value) if isinstance(value, str) else bytes(value),
+}
+
+
+def _python_value(value, field):
+    """Normalize one (possibly JSON-encoded) REPEATED or RECORD value into plain Python objects."""
+    kind = _bq_kind(field)
+    if isinstance(value, str) and (field.mode == "REPEATED" or kind == "RECORD"):
+        value = json.loads(value)
+    if field.mode == "REPEATED":
+        return None if value is None else [_scalar_value(item, field, kind) for item in value]
+    return _scalar_value(value, field, kind)
+
+
+def _scalar_value(value, field, kind):
+    if _is_missing(value):
+        return None
+    if kind == "RECORD":
+        if isinstance(value, str):
+            value = json.loads(value)
+        return {sub.name: _python_value(value.get(sub.name), sub) for sub in field.fields}
+    parse = _SCALAR_PARSERS.get(kind)
+    return parse(value) if parse else value
+
+
+def _arrow_type(field):
+    import pyarrow as pa
+
+    kind = _bq_kind(field)
+    if kind == "RECORD":
+        base = pa.struct([(sub.name, _arrow_type(sub)) for sub in field.fields])
+    else:
+        base = {
+            "BOOLEAN": pa.bool_,
+            "FLOAT": pa.float64,
+            "INTEGER": pa.int64,
+            "STRING": pa.string,
+            "NUMERIC": lambda: pa.decimal128(38, BQ_NUMERIC_SCALES["NUMERIC"]),
+            "BIGNUMERIC": lambda: pa.decimal256(76, BQ_NUMERIC_SCALES["BIGNUMERIC"]),
+            "DATE": pa.date32,
+            "DATETIME": lambda: pa.timestamp("us"),
+            "TIMESTAMP": lambda: pa.timestamp("us", tz="UTC"),
+            "TIME": lambda: pa.time64("us"),
+            "JSON": pa.string,
+            "GEOGRAPHY": pa.string,
+            "BYTES": pa.binary,
+        }[kind]()
+    return pa.list_(base) if field.mode == "REPEATED" else base
+
+
+def _map_unique(column, function, dtype=None):
+    """Apply `function` once per distinct non-null value of `column`; missing values stay missing."""
+    import numpy as np
+    import pandas as pd
+
+    codes, uniques = pd.factorize(column)
+    if dtype is None:
+        mapped = np.empty(len(uniques) + 1, dtype=object)  # last slot (code -1) stays None
+        for position, value in enumerate(uniques):
+            mapped[position] = function(value)
+        return pd.Series(mapped[codes], index=column.index, name=column.name)
+    mapped = pd.array([function(value) for value in uniques], dtype=dtype)
+    return pd.Series(mapped.take(codes, allow_fill=True), index=column.index, name=column.name)
+
+
+def _convert_numeric(column, field, numeric_as="decimal"):
+    if numeric_as == "float":
+        return column.astype(float)
+    decimals = _map_unique(column, _to_decimal)
+    if numeric_as == "decimal":
+        return decimals
+
+    # Scaled int64: integer count of 10**-scale units, exact but bounded to int64
+    scale = getattr(field, "scale", None) or BQ_NUMERIC_SCALES[_bq_kind(field)]
+
+    def scaled(value):
+        if value is None:
+            return None
+        units = int(value.scaleb(scale).to_integral_value())
+        if abs(units) > INT64_BOUND:
+            raise ValueError(f"Column '{column.name}' does not fit in int64 at scale {scale}; use numeric_as='decimal'")
+        return units
+
+    return _map_unique(decimals, scaled, dtype="Int64")
+
+
+def _convert_time(column, field):
+    import pandas as pd
+
+    # Time of day as a timedelta since midnight (datetime.time values and "HH:MM:SS[.ffffff]" strings)
+    codes, uniques = pd.factorize(column)
+    parsed = pd.to_timedelta(pd.Index(uniques, dtype=object).astype(str), errors="coerce")
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=column.index, name=column.name)
+
+
+def _convert_json(column, field):
+    def load(value):
+        if not isinstance(value, str):
+            return value
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+
+    # Not deduplicated: parsed objects are mutable and must not be shared between rows
+    return column.map(load, na_action="ignore")
+
+
+def _convert_nested(column, field):
+    """REPEATED and RECORD fields: Arrow list/struct columns when pandas supports them, Python lists/dicts otherwise."""
+    import pandas as pd
+
+    values = [None if _is_missing(value) else _python_value(value, field) for value in column]
+    if hasattr(pd, "ArrowDtype"):
+        try:
+            return pd.Series(values, index=column.index, name=column.name, dtype=pd.ArrowDtype(_arrow_type(field)))
+        except (ImportError, TypeError, ValueError):
+            pass
+    return pd.Series(values, index=column.index, name=column.name, dtype=object)
+
+
+def _convert_legacy(column, field, python_type):
+    return column.astype(python_type)
+
+
+def _convert_date(column, field):
+    import pandas as pd
+
+    return pd.to_datetime(column, format="%Y-%m-%d", errors="coerce")
+
+
+def _convert_timestamp(column, field):
+    # DATETIME and TIMESTAMP; values with an offset are converted to UTC, the result is naive
+    parsed, failures = parse_timestamp_series(column, return_failures=True)
+    if failures:
+        log.error(ERROR_ETL_DATA_TRANSFORM, "%d values of '%s' are not valid timestamps", failures, column.name, stage=PIPE_TRANSFORM)
+    return parsed
+
+
+BQ_COLUMN_CONVERTERS = {
+    "BOOLEAN": functools.partial(_convert_legacy, python_type=bool),
+    "FLOAT": functools.partial(_convert_legacy, python_type=float),
+    "INTEGER": functools.partial(_convert_legacy, python_type=int),
+    "STRING": functools.partial(_convert_legacy, python_type=str),
+    "NUMERIC": _convert_numeric,
+    "BIGNUMERIC": _convert_numeric,
+    "DATE": _convert_date,
+    "DATETIME": _convert_timestamp,
+    "TIMESTAMP": _convert_timestamp,
+    "TIME": _convert_time,
+    "JSON": _convert_json,
+    "GEOGRAPHY": lambda column, field: column.astype("string"),
+    "BYTES": lambda column, field: _map_unique(column, _SCALAR_PARSERS["BYTES"]),
+    "RECORD": _convert_nested,
+}
+
+
+def compile_bq_schema(schema_fields, cast_ids_as_string: bool = False, numeric_as: str = "decimal") -> list:
+    """
+    Resolve a BigQuery schema once into a list of `(column, converter)` pairs.
+
+    The plan can be reused for every chunk or page of the same table instead of
+    looking up each field type again.
+
+    Args
+    ----
+        - `schema_fields` (list[SchemaField]): Table schema, e.g. `client.get_table(table_id).schema`.
+        - `cast_ids_as_string` (bool, optional): Convert the columns whose name contains "id" to `str`, whatever
+          their type, except date/time (DATE, DATETIME, TIMESTAMP, TIME) and REPEATED/RECORD columns.
+        - `numeric_as` (str, optional): NUMERIC/BIGNUMERIC representation: "decimal" (exact `Decimal` objects),
+          "scaled" (nullable int64 counting 10**-scale units) or "float".
+
+    Returns
+    -------
+        - `list[tuple[str, Callable]]`: Column name and a function converting that column (pd.Series -> pd.Series).
+    """
+    if numeric_as not in NUMERIC_MODES:
+        raise ValueError(f"numeric_as '{numeric_as}' is not supported. Choose from {list(NUMERIC_MODES)}")
+
+    plan = []
+    for field in schema_fields:
+        kind = _bq_kind(field)
+        if field.mode == "REPEATED":
+            converter = _convert_nested
+        elif cast_ids_as_string and "id" in field.name and kind not in BQ_TEMPORAL_TYPES and kind != "RECORD":
+            converter = BQ_COLUMN_CONVERTERS["STRING"]
+        elif kind in BQ_NUMERIC_SCALES:
+            converter = functools.partial(_convert_numeric, numeric_as=numeric_as)
+        elif kind in BQ_COLUMN_CONVERTERS:
+            converter = BQ_COLUMN_CONVERTERS[kind]
+        else:
+            raise ValueError(f"BigQuery type '{field.field_type}' of column '{field.name}' is not supported")
+        plan.append((field.name, functools.partial(converter, field=field)))
+    return plan
+
+
+def apply_bq_schema(df_input, plan: list):
+    """
+    Convert the columns of `df_input` in place following a plan from `compile_bq_schema` and return it.
+    """
+    for name, convert in plan:
+        df_input[name] = convert(df_input[name])
+    return df_input
 
 
 def sync_dataframe_to_bq_schema(
-    df_input, target_project, bq_table_id, auth_json, verbose=False, cast_ids_as_string: bool = False
+    df_input,
+    target_project,
+    bq_table_id,
+    auth_json,
+    verbose=False,
+    cast_ids_as_string: bool = False,
+    numeric_as: str = "decimal",
 ):
     """
     Synchronize the data types of a Pandas DataFrame with a BigQuery table's schema.
@@ -20,6 +322,9 @@ def sync_dataframe_to_bq_schema(
         - `bq_table_id` (str): The name of the BigQuery table to retrieve the schema from.
         - `auth_json` (str): Path to the service account credential file for authentication.
         - `verbose` (bool, optional): Whether to print debug information (default is False).
+        - `cast_ids_as_string` (bool, optional): Convert the columns whose name contains "id" to `str`, except
+          date/time and REPEATED/RECORD columns (see `compile_bq_schema`).
+        - `numeric_as` (str, optional): NUMERIC/BIGNUMERIC representation, see `compile_bq_schema`.
 
     Returns
     -------
@@ -33,6 +338,10 @@ def sync_dataframe_to_bq_schema(
             'path/to/your/credential_file.json', verbose=True
         )
     """
+    import pandas_gbq
+    from google.cloud import bigquery
+    from google.oauth2 import service_account
+
     pandas_gbq.context.project = target_project
     bq_client = bigquery.Client(
         credentials=service_account.Credentials.from_service_account_file(auth_json),
@@ -40,48 +349,174 @@ def sync_dataframe_to_bq_schema(
     )
     remote_table = bq_client.get_table(bq_table_id)
 
-    schema_definitions = [{"field": item.name, "dtype": item.field_type} for item in remote_table.schema]
+    plan = compile_bq_schema(remote_table.schema, cast_ids_as_string, numeric_as)
+
+    if verbose:
+        for item in remote_table.schema:
+            log.info(STATUS_BQ_GET_TABLE, "%s", {"field": item.name, "dtype": item.field_type, "mode": item.mode})
+
+    return apply_bq_schema(df_input, plan)
+
+
+class QueryHistory:
+    """
+    Default sink of the per-query metrics of `execute_bq_fetch`: keeps the last `max_records` in memory.
+
+    Any callable taking the metrics dict can be used as a sink instead (e.g. `records.append`
+    or a function shipping them to a monitoring system).
+
+    Example
+    -------
+    ```
+        execute_bq_fetch(sql, "project", "key.json")
+        QUERY_HISTORY.slowest(5, key="slot_millis")
+    ```
+    """
+
+    def __init__(self, max_records: int = 1000):
+        self.records = collections.deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def __call__(self, record: dict):
+        with self._lock:
+            self.records.append(record)
+
+    def reset(self):
+        with self._lock:
+            self.records.clear()
+
+    def slowest(self, count: int = 10, key: str = "wall_seconds") -> list:
+        """Records with the highest `key` (e.g. "slot_millis", "total_bytes_billed", "download_seconds")."""
+        measured = [record for record in list(self.records) if record.get(key) is not None]
+        return heapq.nlargest(count, measured, key=lambda record: record[key])
 
-    type_mapping = {
-        "BOOLEAN": bool,
-        "FLOAT": float,
-        "INTEGER": int,
-        "OBJECT": str,
-        "STRING": str,
+
+QUERY_HISTORY = QueryHistory()
+
+
+def _seconds_between(start, end):
+    return (end - start).total_seconds() if start is not None and end is not None else None
+
+
+def _job_metrics(query_job) -> dict:
+    """Cost and server-side timing statistics of a finished (or dry-run) query job."""
+    created, started, ended = (getattr(query_job, name, None) for name in ("created", "started", "ended"))
+    return {
+        "job_id": getattr(query_job, "job_id", None),
+        "location": getattr(query_job, "location", None),
+        "cache_hit": getattr(query_job, "cache_hit", None),
+        "total_bytes_processed": getattr(query_job, "total_bytes_processed", None),
+        "total_bytes_billed": getattr(query_job, "total_bytes_billed", None),
+        "slot_millis": getattr(query_job, "slot_millis", None),
+        "queue_seconds": _seconds_between(created, started),
+        "execution_seconds": _seconds_between(started, ended),
     }
 
-    iso_date_fmt = "%Y-%m-%d"
-    iso_timestamp_fmt = "%Y-%m-%d %H:%M:%S:%f"
 
-    for entry in schema_definitions:
-        name = entry["field"]
-        kind = entry["dtype"]
+def _publish_query_metrics(metrics_sink, record):
+    try:
+        metrics_sink(record)
+    except Exception as error_msg:
+        log.error(ERROR_DB_QUERY, "metrics sink failed: %r", error_msg, stage=PIPE_EXTRACT)
 
-        if verbose:
-            print(entry)
 
-        if kind == "DATE":
-            df_input[name] = pd.to_datetime(df_input[name], format=iso_date_fmt, errors="coerce")
-        elif kind == "TIMESTAMP":
-            df_input[name] = pd.to_datetime(df_input[name], format=iso_timestamp_fmt, errors="ignore")
-        elif cast_ids_as_string and "id" in name:
-            df_input[name] = df_input[name].astype(str)
-        else:
-            df_input[name] = df_input[name].astype(type_mapping[kind])
+@functools.lru_cache(maxsize=8)
+def _bq_client(gcp_project, key_path):
+    """Authenticated client, built once per project and key file and reused by every query."""
+    from google.cloud import bigquery
+    from google.oauth2 import service_account
+
+    credentials_obj = service_account.Credentials.from_service_account_file(key_path)
+    return bigquery.Client(credentials=credentials_obj, project=gcp_project)
+
+
+def _parameter_type(value) -> str:
+    import numbers
+
+    if value is None:
+        return "STRING"  # a typed NULL
+    if isinstance(value, bool):
+        return "BOOL"
+    if isinstance(value, numbers.Integral):
+        return "INT64"
+    if isinstance(value, Decimal):
+        digits, exponent = len(value.as_tuple().digits), value.as_tuple().exponent
+        return "NUMERIC" if exponent >= -BQ_NUMERIC_SCALES["NUMERIC"] and digits <= 38 else "BIGNUMERIC"
+    if isinstance(value, numbers.Real):
+        return "FLOAT64"
+    if isinstance(value, str):
+        return "STRING"
+    if isinstance(value, bytes):
+        return "BYTES"
+    if isinstance(value, dt.datetime):
+        return "DATETIME" if value.tzinfo is None else "TIMESTAMP"
+    if isinstance(value, dt.date):
+        return "DATE"
+    if isinstance(value, dt.time):
+        return "TIME"
+    raise TypeError(f"Cannot infer a BigQuery type for query parameter {value!r}; pass a bigquery QueryParameter instead")
+
+
+def _query_parameter(name, value):
+    from google.cloud import bigquery
+
+    if hasattr(value, "to_api_repr"):
+        return value  # already a ScalarQueryParameter / ArrayQueryParameter / StructQueryParameter
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = list(value)
+        return bigquery.ArrayQueryParameter(name, _parameter_type(items[0]) if items else "STRING", items)
+    return bigquery.ScalarQueryParameter(name, _parameter_type(value), value)
 
-    return df_input
 
+def build_query_parameters(params) -> list:
+    """
+    Convert Python values to BigQuery query parameters.
+
+    A dict gives named parameters (`@name` in the SQL), a list or tuple gives positional
+    ones (`?`). Types are inferred from the values (lists become ARRAY parameters); pass a
+    `bigquery.ScalarQueryParameter` for a value whose type cannot be inferred.
+    """
+    if not params:
+        return []
+    if isinstance(params, dict):
+        return [_query_parameter(name.lstrip("@"), value) for name, value in params.items()]
+    return [_query_parameter(None, value) for value in params]
 
-def execute_bq_fetch(sql_command, gcp_project, key_path):
+
+def execute_bq_fetch(
+    sql_command,
+    gcp_project,
+    key_path,
+    params=None,
+    dry_run: bool = False,
+    maximum_bytes_billed: int = None,
+    use_query_cache: bool = True,
+    metrics_sink=None,
+    return_metrics: bool = False,
+    limiter=None,
+):
     """
     Executes a BigQuery SQL query and returns the result as a Pandas DataFrame.
 
     Parameters:
     sql_command (str): The SQL query to execute on BigQuery.
+    params (dict | list, optional): Named (`@name`) or positional (`?`) query parameters.
+        Keep values out of the SQL text: identical texts are served from BigQuery's cache.
+    dry_run (bool, optional): Only validate the query and return the bytes it would process.
+    maximum_bytes_billed (int, optional): Fail the query instead of billing more than this.
+    use_query_cache (bool, optional): Allow results from BigQuery's cache (default is True).
+    metrics_sink (callable, optional): Receives the metrics dict of the query (default is `QUERY_HISTORY`).
+    return_metrics (bool, optional): Return `(result, metrics)` instead of the result alone.
+    limiter (AdaptiveLimiter, optional): Shared limit on the concurrent queries; quota and rate
+        errors (e.g. "Exceeded rate limits") lower it for every thread using the same limiter.
+
+    Every query records its job ID, bytes processed and billed, slot-ms, cache hit, queue and
+    execution time on BigQuery, client wait time, and download versus DataFrame conversion time.
 
     Returns:
     pandas.DataFrame or None: The result of the query as a DataFrame if successful,
                               None if there was an error.
+    int: The estimated bytes processed when `dry_run` is True.
 
     Example:
     >>> query = "SELECT * FROM `my_dataset.my_table` LIMIT 10"
@@ -95,19 +530,745 @@ def execute_bq_fetch(sql_command, gcp_project, key_path):
     2      value1  value2  value3  value4  value5
     3      value1  value2  value3  value4  value5
     4      value1  value2  value3  value4  value5
+    >>> sql = "SELECT * FROM `my_dataset.orders` WHERE day = @day AND store IN UNNEST(@stores)"
+    >>> execute_bq_fetch(sql, "project", "key.json", params={"day": date(2024, 1, 1), "stores": [1, 2]}, dry_run=True)
+    52428800
     """
-    try:
-        credentials_obj = service_account.Credentials.from_service_account_file(key_path)
-        client_instance = bigquery.Client(
-            credentials=credentials_obj,
-            project=gcp_project,
-        )
+    from google.cloud import bigquery
 
-        results_df = client_instance.query(sql_command).to_dataframe()
+    record = {"sql": sql_command, "dry_run": dry_run, "error": None}
+    result = None
 
-        print(f" [{len(results_df.index)} rows, {len(results_df.columns)} columns]")
-        return results_df
+    with track_stage(PIPE_EXTRACT, "execute_bq_fetch") as metrics, (limiter.slot() if limiter else nullcontext()) as ticket:
+        try:
+            client_instance = _bq_client(gcp_project, key_path)
+            job_config = bigquery.QueryJobConfig(
+                query_parameters=build_query_parameters(params),
+                dry_run=dry_run,
+                # A cached result would report 0 bytes for the dry run
+                use_query_cache=use_query_cache and not dry_run,
+            )
+            if maximum_bytes_billed is not None:
+                job_config.maximum_bytes_billed = maximum_bytes_billed
 
-    except Exception as error_msg:
-        print(f"\n  ❌ Query error: {repr(error_msg)}")
+            started = time.perf_counter()
+            query_job = client_instance.query(sql_command, job_config=job_config)
+
+            if dry_run:
+                record.update(_job_metrics(query_job))
+                log.info(SUCCESS_DB_QUERY_EXECUTED, "dry run: %d bytes", query_job.total_bytes_processed, stage=PIPE_EXTRACT)
+                result = query_job.total_bytes_processed
+            else:
+                row_iterator = query_job.result()
+                record.update(_job_metrics(query_job), wait_seconds=time.perf_counter() - started)
+
+                # to_dataframe() downloads through to_arrow() then converts: time both halves
+                download_seconds = []
+                fetch_arrow = row_iterator.to_arrow
+
+                def timed_to_arrow(*args, **kwargs):
+                    fetch_started = time.perf_counter()
+                    try:
+                        arrow_table = fetch_arrow(*args, **kwargs)
+                        metrics.bytes_transferred += getattr(arrow_table, "nbytes", 0)
+                        return arrow_table
+                    finally:
+                        download_seconds.append(time.perf_counter() - fetch_started)
+
+                row_iterator.to_arrow = timed_to_arrow
+                fetch_started = time.perf_counter()
+                results_df = row_iterator.to_dataframe()
+                fetch_seconds = time.perf_counter() - fetch_started
+                record.update(
+                    download_seconds=sum(download_seconds) if download_seconds else fetch_seconds,
+                    conversion_seconds=fetch_seconds - sum(download_seconds) if download_seconds else None,
+                    rows=len(results_df.index),
+                    columns=len(results_df.columns),
+                )
+                metrics.rows_out = len(results_df.index)
+
+                log.info(
+                    SUCCESS_DB_QUERY_EXECUTED,
+                    "[%d rows, %d columns]",
+                    len(results_df.index),
+                    len(results_df.columns),
+                    stage=PIPE_EXTRACT,
+                    job_id=record["job_id"],
+                    bytes_billed=record["total_bytes_billed"],
+                    cache_hit=record["cache_hit"],
+                )
+                result = results_df
+
+        except Exception as error_msg:
+            metrics.status = ETL_FAILURE
+            record["error"] = repr(error_msg)
+            if ticket is not None:
+                ticket.error = error_msg
+            log.error(ERROR_DB_QUERY, "%r", error_msg, stage=PIPE_EXTRACT)
+
+    record["wall_seconds"] = metrics.wall_seconds
+    _publish_query_metrics(metrics_sink or QUERY_HISTORY, record)
+    return (result, record) if return_metrics else result
+
+
+def _export_fingerprint(sql_command, params, anchor_cell) -> str:
+    """Identity of an export, so a checkpoint is only resumed by the same query into the same place."""
+    payload = json.dumps([sql_command, params, anchor_cell], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _load_export_checkpoint(checkpoint_path, fingerprint):
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
         return None
+    with open(checkpoint_path, encoding="utf-8") as input_file:
+        checkpoint = json.load(input_file)
+    return checkpoint if checkpoint.get("fingerprint") == fingerprint else None
+
+
+def _save_export_checkpoint(checkpoint_path, checkpoint):
+    # Write then rename, so a crash never leaves a truncated checkpoint behind
+    temporary_path = f"{checkpoint_path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as output_file:
+        json.dump(checkpoint, output_file)
+    os.replace(temporary_path, checkpoint_path)
+
+
+def _put_unless_stopped(pages, item, stop) -> bool:
+    """Queue `item`, giving up once `stop` is set (the consumer is gone and the queue may stay full)."""
+    while not stop.is_set():
+        try:
+            pages.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _prefetch_pages(row_iterator, pages, stop):
+    """Download thread of `export_bq_to_gsheet`: queue DataFrame pages until the end, an error or `stop`."""
+    try:
+        for page_df in row_iterator.to_dataframe_iterable():
+            if not _put_unless_stopped(pages, page_df, stop):
+                return
+        _put_unless_stopped(pages, None, stop)
+    except Exception as error_msg:
+        _put_unless_stopped(pages, error_msg, stop)
+
+
+def export_bq_to_gsheet(
+    sql_command,
+    gcp_project,
+    key_path,
+    tab_obj,
+    anchor_cell: str = "A1",
+    params=None,
+    include_header: bool = True,
+    page_size: int = 20000,
+    prefetch_pages: int = 2,
+    value_input_option: str = "USER_ENTERED",
+    max_payload_bytes: int = SHEETS_MAX_PAYLOAD_BYTES,
+    checkpoint_path: str = None,
+    limit: int = 5,
+    wait: int = 60,
+    limiter=None,
+) -> dict:
+    """
+    Stream the result of a BigQuery query into a worksheet, page by page.
+
+    Pages of `page_size` rows are downloaded by a background thread while the previous ones
+    are uploaded, and each page is serialized directly into size-limited Sheets requests
+    (`upload_df_in_chunks`), so memory stays bounded by `prefetch_pages + 1` pages whatever
+    the size of the result. No full DataFrame and no `astype(str)` copy are ever built.
+
+    With `checkpoint_path`, the job ID and the number of rows written are saved after every
+    page. If the export fails, calling it again with the same arguments resumes from the
+    first unwritten row of the same query result (kept by BigQuery for about 24 hours)
+    instead of running the query again; the checkpoint is removed once the export completes.
+
+    Args
+    ----
+        - `sql_command` (str): The query whose result is exported.
+        - `tab_obj` (gspread.models.Worksheet): Destination worksheet.
+        - `anchor_cell` (str): Top-left cell of the export (the header row, if included).
+        - `params` (dict | list, optional): Query parameters, see `build_query_parameters`.
+        - `include_header` (bool): Write the column names above the data.
+        - `page_size` (int): Rows per downloaded page.
+        - `prefetch_pages` (int): Pages downloaded ahead of the upload.
+        - `checkpoint_path` (str, optional): JSON file used to resume an interrupted export.
+        - `limit`, `wait` (int): Attempts per page and seconds between them; rewriting a page is harmless.
+        - `limiter` (AdaptiveLimiter, optional): Upload the requests of a page concurrently, following the quota.
+
+    Returns
+    -------
+        - `dict`: `job_id`, `rows` (written by this call), `pages`, `resumed_from` (row offset) and `next_cell`.
+
+    Example
+    -------
+    ```
+    export_bq_to_gsheet(
+        "SELECT * FROM `project.dataset.orders` WHERE day = @day",
+        "project",
+        "key.json",
+        worksheet,
+        "A1",
+        params={"day": date(2024, 1, 1)},
+        checkpoint_path="/tmp/orders_export.json",
+    )
+    {'job_id': 'job_x1', 'rows': 1250000, 'pages': 63, 'resumed_from': 0, 'next_cell': 'A1250002'}
+    ```
+    """
+    from google.cloud import bigquery
+
+    column_letters, first_row = _split_anchor_cell(anchor_cell)
+    fingerprint = _export_fingerprint(sql_command, params, anchor_cell)
+    checkpoint = _load_export_checkpoint(checkpoint_path, fingerprint)
+    client_instance = _bq_client(gcp_project, key_path)
+
+    with track_stage(PIPE_LOAD, "export_bq_to_gsheet") as metrics:
+        if checkpoint:
+            query_job = client_instance.get_job(checkpoint["job_id"], location=checkpoint["location"])
+            rows_written = checkpoint["rows_written"]
+            log.info(ETL_IN_PROGRESS, "resuming export at row %d", rows_written, stage=PIPE_LOAD, job_id=query_job.job_id)
+        else:
+            job_config = bigquery.QueryJobConfig(query_parameters=build_query_parameters(params))
+            query_job = client_instance.query(sql_command, job_config=job_config)
+            rows_written = 0
+        resumed_from = rows_written
+
+        row_iterator = query_job.result(page_size=page_size, start_index=rows_written or None)
+        data_row = first_row + (1 if include_header else 0)
+        checkpoint = {
+            "fingerprint": fingerprint,
+            "job_id": query_job.job_id,
+            "location": query_job.location,
+            "rows_written": rows_written,
+        }
+        if include_header and not resumed_from:
+            tab_obj.update(f"{column_letters}{first_row}", [[field.name for field in row_iterator.schema]], value_input_option="RAW")
+
+        pages = queue.Queue(maxsize=max(1, prefetch_pages))
+        stop = threading.Event()
+        downloader = threading.Thread(target=_prefetch_pages, args=(row_iterator, pages, stop), daemon=True)
+        downloader.start()
+        page_count = 0
+        try:
+            while True:
+                page_df = pages.get()
+                if page_df is None:
+                    break
+                if isinstance(page_df, Exception):
+                    raise page_df
+
+                cell = f"{column_letters}{data_row + rows_written}"
+                for attempt in range(1, limit + 1):
+                    try:
+                        upload_df_in_chunks(
+                            tab_obj,
+                            page_df,
+                            cell,
+                            value_input_option=value_input_option,
+                            max_payload_bytes=max_payload_bytes,
+                            limiter=limiter,
+                            stage_metrics=metrics,
+                        )
+                        break
+                    except Exception as error_msg:
+                        log.error(ERROR_API_FAILED, "page at %s, attempt %d: %r", cell, attempt, error_msg, stage=PIPE_LOAD)
+                        if attempt == limit:
+                            raise
+                        time.sleep(wait)
+
+                rows_written += len(page_df.index)
+                page_count += 1
+                metrics.rows_out += len(page_df.index)
+                if checkpoint_path:
+                    checkpoint["rows_written"] = rows_written
+                    _save_export_checkpoint(checkpoint_path, checkpoint)
+        finally:
+            stop.set()
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    next_cell = f"{column_letters}{data_row + rows_written}"
+    log.info(
+        SUCCESS_API_DATA_UPDATED,
+        "%d rows exported in %d pages",
+        rows_written - resumed_from,
+        page_count,
+        stage=PIPE_LOAD,
+        job_id=query_job.job_id,
+        next_cell=next_cell,
+    )
+    return {
+        "job_id": query_job.job_id,
+        "rows": rows_written - resumed_from,
+        "pages": page_count,
+        "resumed_from": resumed_from,
+        "next_cell": next_cell,
+    }
+
+
+def _utc_watermark(value):
+    """Datetime marks as timezone-aware UTC (naive ones are UTC already), so naive and aware marks can be compared."""
+    if hasattr(value, "to_pydatetime"):
+        value = value.to_pydatetime()
+    if isinstance(value, dt.datetime):
+        return value.replace(tzinfo=dt.timezone.utc) if value.tzinfo is None else value.astimezone(dt.timezone.utc)
+    return value
+
+
+def _encode_watermark(value) -> dict:
+    """JSON form of a high-water mark, keeping its BigQuery type so it is sent back as the same parameter type."""
+    if hasattr(value, "to_pydatetime"):
+        value = value.to_pydatetime()
+    elif hasattr(value, "item"):
+        value = value.item()  # numpy scalar
+    if isinstance(value, dt.datetime) and value.tzinfo is not None:
+        value = value.astimezone(dt.timezone.utc)  # TIMESTAMP marks are stored with a +00:00 offset
+    kind = _parameter_type(value)
+    if isinstance(value, (dt.date, dt.time)):
+        text = value.isoformat()
+    else:
+        text = str(value) if isinstance(value, Decimal) else value
+    return {"type": kind, "value": text}
+
+
+def _decode_watermark(stored: dict):
+    kind, value = stored["type"], stored["value"]
+    if kind in ("DATETIME", "TIMESTAMP"):
+        return dt.datetime.fromisoformat(value)
+    if kind == "DATE":
+        return dt.date.fromisoformat(value)
+    if kind in BQ_NUMERIC_SCALES:
+        return Decimal(value)
+    return value
+
+
+class WatermarkStore:
+    """
+    High-water marks of the incremental sources, kept in a small JSON file.
+
+    Every update rewrites the file atomically (write then rename), so an interrupted run
+    leaves the previous marks in place.
+
+    Example
+    -------
+    ```
+        store = WatermarkStore("/var/lib/quati/watermarks.json")
+        store.get("orders")
+        {'column': 'updated_at', 'type': 'TIMESTAMP', 'value': '2024-06-01T10:00:00+00:00', 'updated_at': '...'}
+    ```
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        if not os.path.exists(self.file_path):
+            return {}
+        with open(self.file_path, encoding="utf-8") as input_file:
+            return json.load(input_file)
+
+    def get(self, source: str):
+        """The stored entry of `source`, or None before its first extraction."""
+        with self._lock:
+            return self._read().get(source)
+
+    def set(self, source: str, column: str, value):
+        with self._lock:
+            state = self._read()
+            state[source] = {
+                "column": column,
+                **_encode_watermark(value),
+                "updated_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+            }
+            folder = os.path.dirname(os.path.abspath(self.file_path))
+            os.makedirs(folder, exist_ok=True)
+            temporary_path = f"{self.file_path}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as output_file:
+                json.dump(state, output_file, indent=2)
+            os.replace(temporary_path, self.file_path)
+
+    def reset(self, source: str):
+        """Forget `source`, so its next extraction reads the whole table again."""
+        with self._lock:
+            state = self._read()
+            if state.pop(source, None) is not None:
+                temporary_path = f"{self.file_path}.tmp"
+                with open(temporary_path, "w", encoding="utf-8") as output_file:
+                    json.dump(state, output_file, indent=2)
+                os.replace(temporary_path, self.file_path)
+
+
+def _parquet_parts(dataset_dir) -> list:
+    # "compacted-*" sorts before "part-*", and both carry a UTC timestamp: name order is write order
+    names = sorted(name for name in os.listdir(dataset_dir) if name.endswith(".parquet"))
+    return [os.path.join(dataset_dir, name) for name in names]
+
+
+def _write_parquet(df_input, dataset_dir, prefix) -> str:
+    stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    file_path = os.path.join(dataset_dir, f"{prefix}-{stamp}.parquet")
+    # Written under a name the readers skip, then renamed, so a crash never leaves a partial part
+    df_input.to_parquet(f"{file_path}.tmp", index=False)
+    os.replace(f"{file_path}.tmp", file_path)
+    return file_path
+
+
+def compact_parquet_dataset(dataset_dir: str, key_columns: list = None, order_column: str = None) -> dict:
+    """
+    Merge the part files of a local Parquet dataset into a single file.
+
+    Args
+    ----
+        - `dataset_dir` (str): Folder written by `extract_incremental`.
+        - `key_columns` (list[str], optional): Keep only the last version of each key; rows re-read by
+          `lookback` or updated at the source collapse into one.
+        - `order_column` (str, optional): Column deciding which version is the last (the watermark column).
+
+    Returns
+    -------
+        - `dict`: `files` merged, `rows_in`, `rows_out` and the `file` written.
+    """
+    import pandas as pd
+
+    parts = _parquet_parts(dataset_dir)
+    if len(parts) < 2:
+        return {"files": len(parts), "rows_in": None, "rows_out": None, "file": parts[0] if parts else None}
+
+    with track_stage(PIPE_TRANSFORM, "compact_parquet_dataset") as metrics:
+        merged_df = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+        metrics.rows_in = len(merged_df.index)
+        if key_columns:
+            if order_column:
+                merged_df = merged_df.sort_values(order_column, kind="stable")
+            merged_df = merged_df.drop_duplicates(subset=key_columns, keep="last")
+        metrics.rows_out = len(merged_df.index)
+
+        compacted_path = _write_parquet(merged_df, dataset_dir, "compacted")
+        metrics.bytes_transferred = os.path.getsize(compacted_path)
+        for part in parts:
+            os.remove(part)
+
+    log.info(
+        ETL_IN_PROGRESS,
+        "compacted %d files: %d -> %d rows",
+        len(parts),
+        metrics.rows_in,
+        metrics.rows_out,
+        stage=PIPE_TRANSFORM,
+    )
+    return {"files": len(parts), "rows_in": metrics.rows_in, "rows_out": metrics.rows_out, "file": compacted_path}
+
+
+def extract_incremental(
+    source: str,
+    watermark_column: str,
+    gcp_project,
+    key_path,
+    dataset_dir: str,
+    state_store: WatermarkStore = None,
+    source_name: str = None,
+    initial_watermark=None,
+    lookback=None,
+    key_columns: list = None,
+    compact_after_files: int = None,
+) -> dict:
+    """
+    Fetch only the rows of a BigQuery source above its high-water mark and append them to a local Parquet dataset.
+
+    The mark is the largest value of `watermark_column` seen so far (an update timestamp or an
+    increasing ID). It is sent as a query parameter (`WHERE column > @watermark`) and only
+    advances once the new part file is on disk, so a failed run is simply repeated by the next one.
+
+    Args
+    ----
+        - `source` (str): Table ID ("project.dataset.table") or a SELECT statement.
+        - `watermark_column` (str): TIMESTAMP, DATETIME, DATE or INTEGER column that grows with new or changed rows.
+        - `dataset_dir` (str): Folder of the Parquet dataset; one part file is added per run.
+        - `state_store` (WatermarkStore, optional): Where the marks are kept (default is `<dataset_dir>/_watermarks.json`).
+        - `source_name` (str, optional): Key of the source in the store (default is `source`).
+        - `initial_watermark` (optional): Lower bound of the first run; the whole source is read when None.
+        - `lookback` (optional): Re-read this much below the mark (`timedelta` or int) to catch late rows.
+          The overlap shows up as duplicates until the next compaction with `key_columns`.
+        - `key_columns` (list[str], optional): Primary key used to deduplicate on compaction.
+        - `compact_after_files` (int, optional): Compact once the dataset has more part files than this.
+
+    Returns
+    -------
+        - `dict`: `source`, `rows`, `previous_watermark`, `watermark`, `file`, `error` and `compaction`.
+
+    Example
+    -------
+    ```
+    extract_incremental(
+        "project.sales.orders", "updated_at", "project", "key.json", "/data/orders",
+        key_columns=["order_id"], lookback=dt.timedelta(hours=1), compact_after_files=30,
+    )
+    {'source': 'project.sales.orders', 'rows': 18230, 'previous_watermark': datetime(...), 'watermark': datetime(...), ...}
+    ```
+    """
+    source_name = source_name or source
+    state_store = state_store or WatermarkStore(os.path.join(dataset_dir, "_watermarks.json"))
+    os.makedirs(dataset_dir, exist_ok=True)
+
+    stored = state_store.get(source_name)
+    previous_watermark = _decode_watermark(stored) if stored else initial_watermark
+    if stored and stored["column"] != watermark_column:
+        raise ValueError(f"{source_name} is tracked by '{stored['column']}', not '{watermark_column}'; reset it first")
+
+    is_table = re.fullmatch(r"[\w\-]+(\.[\w\-]+){1,2}", source.strip()) is not None
+    sql_command = f"SELECT * FROM `{source.strip()}`" if is_table else f"SELECT * FROM ({source})"
+    params = None
+    if previous_watermark is not None:
+        lower_bound = previous_watermark - lookback if lookback else previous_watermark
+        sql_command += f" WHERE `{watermark_column}` > @watermark"
+        params = {"watermark": lower_bound}
+
+    summary = {
+        "source": source_name,
+        "rows": 0,
+        "previous_watermark": previous_watermark,
+        "watermark": previous_watermark,
+        "file": None,
+        "error": None,
+        "compaction": None,
+    }
+    delta_df, record = execute_bq_fetch(sql_command, gcp_project, key_path, params=params, return_metrics=True)
+    if delta_df is None:
+        summary["error"] = record["error"]
+        log.error(ERROR_DB_QUERY, "%s: watermark kept at %s", source_name, previous_watermark, stage=PIPE_EXTRACT)
+        return summary
+
+    if len(delta_df.index):
+        summary["file"] = _write_parquet(delta_df, dataset_dir, "part")
+        summary["rows"] = len(delta_df.index)
+
+    # Rows with a NULL watermark are kept, but only the others can move the mark forward
+    marks = delta_df[watermark_column].dropna()
+    if len(marks.index):
+        newest = marks.max()
+        # With a lookback the delta may hold nothing newer than the stored mark. Compared in UTC: a naive
+        # mark (DATETIME column, or a naive `initial_watermark`) and an aware one (TIMESTAMP) cannot be compared as is
+        if previous_watermark is None or _utc_watermark(newest) > _utc_watermark(previous_watermark):
+            state_store.set(source_name, watermark_column, newest)
+            summary["watermark"] = _decode_watermark(_encode_watermark(newest))
+
+    log.info(
+        SUCCESS_DB_QUERY_EXECUTED,
+        "%s: %d new rows, watermark %s",
+        source_name,
+        summary["rows"],
+        summary["watermark"],
+        stage=PIPE_EXTRACT,
+    )
+
+    if compact_after_files and len(_parquet_parts(dataset_dir)) > compact_after_files:
+        summary["compaction"] = compact_parquet_dataset(dataset_dir, key_columns, watermark_column)
+    return summary
+
+
+KEEP_STRATEGIES = ("first", "last", False)
+
+
+def _quote_identifier(name: str) -> str:
+    """Backtick-quote a column or table ID (`project.dataset.table` stays one identifier)."""
+    if "`" in name or not name.strip():
+        raise ValueError(f"invalid BigQuery identifier {name!r}")
+    return f"`{name.strip()}`"
+
+
+def _as_list(columns) -> list:
+    return [columns] if isinstance(columns, str) else list(columns)
+
+
+def _ranking_clause(key_columns, keep_strategy, order_by) -> str:
+    """QUALIFY filter keeping one row per key like `drop_duplicates(keep=keep_strategy)` does."""
+    if keep_strategy not in KEEP_STRATEGIES:
+        raise ValueError(f"keep_strategy {keep_strategy!r} is not supported. Choose from {list(KEEP_STRATEGIES)}")
+    partition = ", ".join(_quote_identifier(column) for column in _as_list(key_columns))
+    if keep_strategy is False:
+        return f"QUALIFY COUNT(*) OVER (PARTITION BY {partition}) = 1"
+    order = ""
+    if order_by:
+        direction = "ASC" if keep_strategy == "first" else "DESC"
+        order = " ORDER BY " + ", ".join(f"{_quote_identifier(column)} {direction}" for column in _as_list(order_by))
+    return f"QUALIFY ROW_NUMBER() OVER (PARTITION BY {partition}{order}) = 1"
+
+
+def build_bq_dedupe_sql(table_id: str, key_columns, keep_strategy="first", order_by=None) -> str:
+    """
+    SQL rewriting `table_id` in place with a single row per key.
+
+    The `MERGE ... ON FALSE` form deletes every row and inserts the kept ones in one atomic
+    statement, so partitioning, clustering and column descriptions of the table are preserved
+    (a `CREATE OR REPLACE TABLE` would drop them). `keep_strategy` follows `drop_duplicates`:
+    "first" and "last" are decided by `order_by`, False drops every key that appears twice.
+    """
+    table = _quote_identifier(table_id)
+    return (
+        f"MERGE {table} AS target\n"
+        f"USING (SELECT * FROM {table} WHERE TRUE {_ranking_clause(key_columns, keep_strategy, order_by)}) AS source\n"
+        "ON FALSE\n"
+        "WHEN NOT MATCHED BY SOURCE THEN DELETE\n"
+        "WHEN NOT MATCHED BY TARGET THEN INSERT ROW"
+    )
+
+
+def build_bq_merge_sql(target_table: str, staging_table: str, key_columns, columns, keep_strategy="last", order_by=None) -> str:
+    """
+    SQL upserting `staging_table` into `target_table` on `key_columns`.
+
+    Duplicated keys in the staging table are reduced to one row first. With "last" the staging
+    row replaces the target row (update when the key exists, insert otherwise); with "first" the
+    rows already in the target win and only new keys are inserted, as `drop_duplicates` would on
+    the target followed by the staging rows. Rows with a NULL key never match, as in SQL.
+    """
+    if keep_strategy not in ("first", "last"):
+        raise ValueError(f"keep_strategy {keep_strategy!r} is not supported for merges. Choose from ['first', 'last']")
+    keys = _as_list(key_columns)
+    quoted = [_quote_identifier(column) for column in columns]
+    condition = " AND ".join(f"target.{_quote_identifier(key)} = source.{_quote_identifier(key)}" for key in keys)
+    statement = (
+        f"MERGE {_quote_identifier(target_table)} AS target\n"
+        f"USING (SELECT * FROM {_quote_identifier(staging_table)} WHERE TRUE {_ranking_clause(keys, keep_strategy, order_by)}) AS source\n"
+        f"ON {condition}\n"
+    )
+    updated = [column for column, name in zip(quoted, columns) if name not in keys]
+    if keep_strategy == "last" and updated:
+        statement += "WHEN MATCHED THEN UPDATE SET " + ", ".join(f"{column} = source.{column}" for column in updated) + "\n"
+    return statement + (
+        f"WHEN NOT MATCHED BY TARGET THEN INSERT ({', '.join(quoted)}) "
+        f"VALUES ({', '.join(f'source.{column}' for column in quoted)})"
+    )
+
+
+def _run_bq_statement(sql_command, gcp_project, key_path, name, dry_run=False, metrics_sink=None) -> dict:
+    """Run a DML statement and return its row counts and cost; errors are logged and returned, not raised."""
+    from google.cloud import bigquery
+
+    summary = {"sql": sql_command, "dry_run": dry_run, "inserted": None, "updated": None, "deleted": None, "affected": None, "error": None}
+    with track_stage(PIPE_LOAD, name) as metrics:
+        try:
+            job_config = bigquery.QueryJobConfig(dry_run=dry_run, use_query_cache=False)
+            query_job = _bq_client(gcp_project, key_path).query(sql_command, job_config=job_config)
+            if not dry_run:
+                query_job.result()
+            summary.update(_job_metrics(query_job))
+
+            dml_stats = getattr(query_job, "dml_stats", None)
+            counts = {
+                "inserted": getattr(dml_stats, "inserted_row_count", None),
+                "updated": getattr(dml_stats, "updated_row_count", None),
+                "deleted": getattr(dml_stats, "deleted_row_count", None),
+                "affected": getattr(query_job, "num_dml_affected_rows", None),
+            }
+            summary.update(counts)
+            metrics.rows_out = counts["affected"] or 0
+        except Exception as error_msg:
+            metrics.status = ETL_FAILURE
+            summary["error"] = repr(error_msg)
+            log.error(ERROR_DB_QUERY, "%s: %r", name, error_msg, stage=PIPE_LOAD)
+
+    summary["wall_seconds"] = metrics.wall_seconds
+    _publish_query_metrics(metrics_sink or QUERY_HISTORY, summary)
+    return summary
+
+
+def dedupe_bq_table(
+    table_id: str,
+    key_columns,
+    gcp_project,
+    key_path,
+    keep_strategy="first",
+    order_by=None,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Remove duplicated keys from a BigQuery table inside BigQuery, without downloading it.
+
+    Args
+    ----
+        - `table_id` (str): "project.dataset.table" to deduplicate in place.
+        - `key_columns` (str | list[str]): Columns identifying a row, like `match_columns` of `remove_gsheet_duplicates`.
+        - `keep_strategy` ("first" | "last" | False): Row kept per key, as in `drop_duplicates`.
+        - `order_by` (str | list[str], optional): Columns ordering the rows of a key (e.g. a load timestamp);
+          without it "first" and "last" keep an arbitrary row.
+        - `dry_run` (bool): Only estimate the bytes the statement would process.
+
+    Returns
+    -------
+        - `dict`: `removed` rows, `rows_before`, `rows_after`, the DML counts, the job metrics and `error`.
+
+    Example
+    -------
+    ```
+    dedupe_bq_table("project.sales.orders", ["order_id"], "project", "key.json", "last", order_by="loaded_at")
+    {'removed': 120433, 'rows_before': 310552871, 'rows_after': 310432438, 'job_id': '...', ...}
+    ```
+    """
+    sql_command = build_bq_dedupe_sql(table_id, key_columns, keep_strategy, order_by)
+    summary = _run_bq_statement(sql_command, gcp_project, key_path, "dedupe_bq_table", dry_run)
+    # Every row is deleted and the kept ones inserted again
+    rows_before, rows_after = summary.get("deleted"), summary.get("inserted")
+    summary.update(
+        rows_before=rows_before,
+        rows_after=rows_after,
+        removed=None if rows_before is None or rows_after is None else rows_before - rows_after,
+    )
+    if summary["removed"] is not None:
+        log.info(SUCCESS_DB_QUERY_EXECUTED, "%s: %d duplicated rows removed", table_id, summary["removed"], stage=PIPE_LOAD)
+    return summary
+
+
+def merge_into_bq_table(
+    target_table: str,
+    staging_table: str,
+    key_columns,
+    gcp_project,
+    key_path,
+    keep_strategy="last",
+    order_by=None,
+    columns: list = None,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Upsert a staging table into a target table with a single server-side `MERGE`.
+
+    Args
+    ----
+        - `target_table`, `staging_table` (str): "project.dataset.table" IDs.
+        - `key_columns` (str | list[str]): Columns matching staging rows to target rows.
+        - `keep_strategy` ("first" | "last"): "last" updates existing keys with the staging values,
+          "first" keeps the target rows and only inserts new keys. Also picks the staging row kept per key.
+        - `order_by` (str | list[str], optional): Columns ordering duplicated keys inside the staging table.
+        - `columns` (list[str], optional): Columns to write (default is every column of the staging table).
+        - `dry_run` (bool): Only estimate the bytes the statement would process.
+
+    Returns
+    -------
+        - `dict`: `inserted`, `updated`, `affected` rows, the job metrics and `error`.
+
+    Example
+    -------
+    ```
+    merge_into_bq_table("project.sales.orders", "project.staging.orders_today", ["order_id"], "project", "key.json")
+    {'inserted': 18230, 'updated': 1022, 'deleted': 0, 'affected': 19252, 'job_id': '...', ...}
+    ```
+    """
+    if columns is None:
+        columns = [field.name for field in _bq_client(gcp_project, key_path).get_table(staging_table).schema]
+    sql_command = build_bq_merge_sql(target_table, staging_table, key_columns, columns, keep_strategy, order_by)
+    summary = _run_bq_statement(sql_command, gcp_project, key_path, "merge_into_bq_table", dry_run)
+    if summary["affected"] is not None:
+        log.info(
+            SUCCESS_DB_QUERY_EXECUTED,
+            "%s: %s inserted, %s updated",
+            target_table,
+            summary["inserted"],
+            summary["updated"],
+            stage=PIPE_LOAD,
+        )
+    return summary
@@ -0,0 +1,269 @@
+import functools
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from quati.logger import ETL_FAILURE, ETL_SUCCESS
+from quati.logger.pipeline import get_logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+log = get_logger(__name__)
+
+# Summed over the calls of a stage; the memory fields keep the largest value instead
+METRIC_FIELDS = ("wall_seconds", "cpu_seconds", "rows_in", "rows_out", "bytes_transferred")
+MEMORY_FIELDS = ("rss_delta_mb", "process_peak_rss_mb")
+PROMETHEUS_METRICS = {
+    "calls": ("quati_stage_calls_total", "counter"),
+    "failures": ("quati_stage_failures_total", "counter"),
+    "wall_seconds": ("quati_stage_wall_seconds_total", "counter"),
+    "cpu_seconds": ("quati_stage_cpu_seconds_total", "counter"),
+    "rows_in": ("quati_stage_rows_in_total", "counter"),
+    "rows_out": ("quati_stage_rows_out_total", "counter"),
+    "bytes_transferred": ("quati_stage_bytes_transferred_total", "counter"),
+    "rss_delta_mb": ("quati_stage_rss_delta_megabytes", "gauge"),
+    "process_peak_rss_mb": ("quati_process_peak_rss_megabytes", "gauge"),
+}
+
+
+def _process_peak_rss_mb():
+    """High-water mark of the process resident memory since it started, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+@functools.lru_cache(maxsize=None)
+def _psutil_process():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process()
+
+
+def _current_rss_mb():
+    """Resident memory of the process right now, in MB (psutil when installed, /proc on Linux, else None)."""
+    process = _psutil_process()
+    if process is not None:
+        return process.memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm_file:
+            resident_pages = int(statm_file.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class StageMetrics:
+    """Measurements of a single stage execution; counters are filled in by the instrumented code."""
+
+    __slots__ = (
+        "stage",
+        "name",
+        "status",
+        "rows_in",
+        "rows_out",
+        "bytes_transferred",
+        "wall_seconds",
+        "cpu_seconds",
+        "rss_delta_mb",
+        "process_peak_rss_mb",
+    )
+
+    def __init__(self, stage: str, name: str):
+        self.stage = stage.strip()
+        self.name = name
+        self.status = ETL_SUCCESS
+        self.rows_in = 0
+        self.rows_out = 0
+        self.bytes_transferred = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        # Resident memory at the end of the stage minus at its start; the peak is the whole process'
+        self.rss_delta_mb = None
+        self.process_peak_rss_mb = None
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class RunMetrics:
+    """
+    Collects `StageMetrics` for a whole run and exports the summary.
+
+    The totals cover every stage recorded since the last `reset()`, while only the most
+    recent `max_stages` individual measurements are kept in `stages`, so a long-running
+    process does not grow without bound.
+
+    Example
+    -------
+    ```
+        print(RUN_METRICS.summary_table())
+        RUN_METRICS.export_prometheus("/var/lib/node_exporter/quati_etl.prom")
+    ```
+    """
+
+    def __init__(self, max_stages: int = 10000):
+        self.stages = deque(maxlen=max_stages)
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def add(self, metrics: StageMetrics):
+        with self._lock:
+            self.stages.append(metrics)
+            entry = self._totals.setdefault(
+                (metrics.stage, metrics.name),
+                {"calls": 0, "failures": 0, **{field: 0 for field in METRIC_FIELDS + MEMORY_FIELDS}},
+            )
+            entry["calls"] += 1
+            entry["failures"] += metrics.status == ETL_FAILURE
+            for field in METRIC_FIELDS:
+                entry[field] += getattr(metrics, field)
+            for field in MEMORY_FIELDS:
+                entry[field] = max(entry[field], getattr(metrics, field) or 0)
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self._totals = {}
+
+    def totals(self) -> dict:
+        """Aggregate per `(stage, name)`: number of calls plus the sum of every counter (max for the memory fields)."""
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._totals.items()}
+
+    def summary_table(self) -> str:
+        header = (
+            "stage",
+            "name",
+            "calls",
+            "failures",
+            "wall_s",
+            "cpu_s",
+            "rows_in",
+            "rows_out",
+            "bytes",
+            "rss_delta_mb",
+            "process_peak_mb",
+        )
+        rows = [header]
+        for (stage, name), entry in self.totals().items():
+            rows.append(
+                (
+                    stage,
+                    name,
+                    entry["calls"],
+                    entry["failures"],
+                    f"{entry['wall_seconds']:.3f}",
+                    f"{entry['cpu_seconds']:.3f}",
+                    entry["rows_in"],
+                    entry["rows_out"],
+                    entry["bytes_transferred"],
+                    round(entry["rss_delta_mb"], 1),
+                    entry["process_peak_rss_mb"],
+                )
+            )
+        widths = [max(len(str(row[column])) for row in rows) for column in range(len(header))]
+        return "\n".join("  ".join(str(value).ljust(width) for value, width in zip(row, widths)) for row in rows)
+
+    def export_prometheus(self, file_path: str):
+        """Write the totals in the Prometheus text exposition format (e.g. for node_exporter's textfile collector)."""
+        lines = []
+        totals = self.totals()
+        for field, (metric, kind) in PROMETHEUS_METRICS.items():
+            lines.append(f"# TYPE {metric} {kind}")
+            for (stage, name), entry in totals.items():
+                lines.append(f'{metric}{{stage="{stage}",name="{name}"}} {entry[field]}')
+
+        # Write then rename so the collector never reads a half-written file
+        temporary_path = f"{file_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as output_file:
+            output_file.write("\n".join(lines) + "\n")
+        os.replace(temporary_path, file_path)
+
+
+RUN_METRICS = RunMetrics()
+
+
+@contextmanager
+def track_stage(stage: str, name: str, recorder: RunMetrics = None):
+    """
+    Measure wall time, CPU time and resident memory growth of a block, and let it report rows and bytes.
+
+    `cpu_seconds` is the CPU time of the calling thread, so stages running concurrently in other
+    threads do not inflate each other's figure; work the block hands to thread or process pools
+    is not included (compare it with `wall_seconds` to spot time spent waiting on them).
+    `rss_delta_mb` and `process_peak_rss_mb` are process-wide.
+
+    Args
+    ----
+        - `stage` (str): One of `PIPE_EXTRACT`, `PIPE_TRANSFORM`, `PIPE_LOAD`.
+        - `name` (str): Step name, usually the function being measured.
+        - `recorder` (RunMetrics, optional): Where to store the result (default is `RUN_METRICS`).
+
+    Example
+    -------
+    ```
+    with track_stage(PIPE_TRANSFORM, "clean_orders") as metrics:
+        metrics.rows_in = len(raw_df)
+        clean_df = raw_df.dropna()
+        metrics.rows_out = len(clean_df)
+    ```
+    """
+    metrics = StageMetrics(stage, name)
+    rss_start = _current_rss_mb()
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield metrics
+    except BaseException:
+        metrics.status = ETL_FAILURE
+        raise
+    finally:
+        metrics.wall_seconds = time.perf_counter() - wall_start
+        metrics.cpu_seconds = time.thread_time() - cpu_start
+        rss_end = _current_rss_mb()
+        if rss_start is not None and rss_end is not None:
+            metrics.rss_delta_mb = round(rss_end - rss_start, 1)
+        metrics.process_peak_rss_mb = _process_peak_rss_mb()
+        (recorder or RUN_METRICS).add(metrics)
+        log.debug(metrics.status, "%s finished in %.3fs", name, metrics.wall_seconds, stage=stage, rows_out=metrics.rows_out)
+
+
+def timed_stage(stage: str, name: str = None, count_rows: bool = True, recorder: RunMetrics = None):
+    """
+    Decorator version of `track_stage`.
+
+    When `count_rows` is True and the function returns something with a length
+    (a DataFrame, a list), that length is recorded as `rows_out`.
+
+    Example
+    -------
+    ```
+    @timed_stage(PIPE_TRANSFORM)
+    def clean_orders(raw_df):
+        return raw_df.dropna()
+    ```
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with track_stage(stage, name or function.__name__, recorder) as metrics:
+                result = function(*args, **kwargs)
+                if count_rows and hasattr(result, "__len__"):
+                    metrics.rows_out = len(result)
+                return result
+
+        return wrapper
+
+    return decorator
+
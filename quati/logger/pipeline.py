@@ -0,0 +1,368 @@
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import struct
+import sys
+import threading
+
+import quati.logger as catalog
+from quati.logger import LOG_DEBUG, LOG_ERROR, LOG_INFO
+
+# Every message constant of quati.logger becomes a typed event code, e.g.
+# "Updating sheet data" -> "STATUS_GSHEET_UPDATE_SHEET"
+EVENT_CODES = {
+    value: name
+    for name, value in sorted(vars(catalog).items())
+    if name.startswith(("ERROR_", "SUCCESS_", "STATUS_", "ETL_")) and isinstance(value, str)
+}
+
+# Codes stored in binary records. They are part of the file format: never renumber nor reuse
+# one, give new constants the next free code (0 is reserved for events without a code)
+EVENT_INDEX = {
+    "ERROR_API_AUTH_FAILED": 1,
+    "ERROR_API_ENDPOINT_NOT_FOUND": 2,
+    "ERROR_API_FAILED": 3,
+    "ERROR_API_LIMIT_EXCEEDED": 4,
+    "ERROR_API_TIMEOUT": 5,
+    "ERROR_DB_CONNECTION_FAILED": 6,
+    "ERROR_DB_QUERY": 7,
+    "ERROR_ETL_CONFIG": 8,
+    "ERROR_ETL_DATA_LOAD": 9,
+    "ERROR_ETL_DATA_TRANSFORM": 10,
+    "ERROR_ETL_PROCESS": 11,
+    "ERROR_FILE_NOT_FOUND": 12,
+    "ERROR_FILE_READ": 13,
+    "ERROR_FILE_WRITE": 14,
+    "ERROR_SELENIUM_AUTH": 15,
+    "ERROR_SELENIUM_BROWSER": 16,
+    "ERROR_SELENIUM_DRIVER_MISSING": 17,
+    "ERROR_SELENIUM_ELEMENT": 18,
+    "ERROR_SELENIUM_TIMEOUT": 19,
+    "ETL_FAILURE": 20,
+    "ETL_IN_PROGRESS": 21,
+    "ETL_SUCCESS": 22,
+    "STATUS_API_CACHE_RESPONSE": 23,
+    "STATUS_API_FETCH_DATA": 24,
+    "STATUS_API_PROCESS_RESPONSE": 25,
+    "STATUS_API_RECEIVE_RESPONSE": 26,
+    "STATUS_API_REQUEST_START": 27,
+    "STATUS_API_SAVE_DATA": 28,
+    "STATUS_API_SEND_REQUEST": 29,
+    "STATUS_API_UPDATE_CACHE": 30,
+    "STATUS_API_VALIDATE_RESPONSE": 31,
+    "STATUS_BQ_GET_DATASET": 32,
+    "STATUS_BQ_GET_PROJECT": 33,
+    "STATUS_BQ_GET_TABLE": 34,
+    "STATUS_BQ_UPDATE_DATASET": 35,
+    "STATUS_BQ_UPDATE_PROJECT": 36,
+    "STATUS_BQ_UPDATE_TABLE": 37,
+    "STATUS_GSHEET_GET_SHEET": 38,
+    "STATUS_GSHEET_GET_SPREADSHEET": 39,
+    "STATUS_GSHEET_UPDATE_SHEET": 40,
+    "STATUS_INSTAGRAM_BIO": 41,
+    "STATUS_INSTAGRAM_FOLLOWERS": 42,
+    "STATUS_INSTAGRAM_FOLLOWING": 43,
+    "STATUS_INSTAGRAM_POSTS": 44,
+    "STATUS_INSTAGRAM_POST_COMMENTS": 45,
+    "STATUS_INSTAGRAM_POST_DATE": 46,
+    "STATUS_INSTAGRAM_POST_DESC": 47,
+    "STATUS_INSTAGRAM_POST_ID": 48,
+    "STATUS_INSTAGRAM_POST_IMAGE": 49,
+    "STATUS_INSTAGRAM_POST_LIKES": 50,
+    "STATUS_INSTAGRAM_POST_URL": 51,
+    "STATUS_INSTAGRAM_POST_VIEWS": 52,
+    "STATUS_PANDAS_AGGREGATE": 53,
+    "STATUS_PANDAS_ANALYZE_STATS": 54,
+    "STATUS_PANDAS_CONVERT_TYPES": 55,
+    "STATUS_PANDAS_CREATE_VISUALS": 56,
+    "STATUS_PANDAS_DROP_DUPLICATES": 57,
+    "STATUS_PANDAS_FILL_NA": 58,
+    "STATUS_PANDAS_FILTER": 59,
+    "STATUS_PANDAS_GROUP": 60,
+    "STATUS_PANDAS_HANDLE_MISSING": 61,
+    "STATUS_PANDAS_INIT_DF": 62,
+    "STATUS_PANDAS_JOIN": 63,
+    "STATUS_PANDAS_LOAD_CSV": 64,
+    "STATUS_PANDAS_MERGE": 65,
+    "STATUS_PANDAS_REORDER_COLUMNS": 66,
+    "STATUS_PANDAS_SAVE_CSV": 67,
+    "STATUS_PANDAS_TREAT_CHARS": 68,
+    "STATUS_SELENIUM_GO_TO_PAGE": 69,
+    "STATUS_SELENIUM_IMPORT_COOKIES": 70,
+    "STATUS_SELENIUM_OPEN_BROWSER": 71,
+    "STATUS_SELENIUM_REFRESH_PAGE": 72,
+    "SUCCESS_API_AUTH": 73,
+    "SUCCESS_API_DATA_CREATED": 74,
+    "SUCCESS_API_DATA_RETRIEVED": 75,
+    "SUCCESS_API_DATA_UPDATED": 76,
+    "SUCCESS_DB_CONNECTED": 77,
+    "SUCCESS_DB_QUERY_EXECUTED": 78,
+    "SUCCESS_ETL_CONFIG_VALID": 79,
+    "SUCCESS_ETL_DATA_LOADED": 80,
+    "SUCCESS_ETL_DATA_TRANSFORMED": 81,
+    "SUCCESS_ETL_PROCESS_COMPLETED": 82,
+    "SUCCESS_FILE_READ": 83,
+    "SUCCESS_FILE_WRITE": 84,
+    "SUCCESS_SELENIUM_AUTH": 85,
+    "SUCCESS_SELENIUM_ELEMENT": 86,
+    "SUCCESS_SELENIUM_OPERATION": 87,
+}
+
+LEVELS = {LOG_DEBUG: logging.DEBUG, LOG_INFO: logging.INFO, LOG_ERROR: logging.ERROR}
+
+# Compact binary record: timestamp, level, event index (0 = unknown), payload length, then UTF-8 JSON payload
+BINARY_HEADER = struct.Struct("<dBHI")
+
+_state = {"listener": None, "handler": None, "sampling": {}, "counters": {}, "muted": set()}
+_state_lock = threading.Lock()
+
+
+class _JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "stage": record.stage,
+            "event": record.event,
+            "text": record.text,
+            "msg": record.getMessage(),
+        }
+        entry.update(record.fields)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _ConsoleFormatter(logging.Formatter):
+    def format(self, record):
+        stage = f"{record.stage} | " if record.stage else ""
+        message = record.getMessage()
+        details = " ".join(f"{key}={value}" for key, value in record.fields.items())
+        # Free-text events have no catalog message: show the event itself
+        parts = [part for part in (record.text or record.event, message, details) if part]
+        return f"{record.levelname.ljust(5)} | {stage}{' - '.join(parts)}"
+
+
+class _BinaryFileHandler(logging.Handler):
+    def __init__(self, path):
+        super().__init__()
+        self.stream = open(path, "ab")
+
+    def emit(self, record):
+        try:
+            payload = {"stage": record.stage, "msg": record.getMessage()}
+            payload.update(record.fields)
+            body = json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+            header = BINARY_HEADER.pack(record.created, record.levelno, EVENT_INDEX.get(record.event, 0), len(body))
+            self.stream.write(header + body)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        self.stream.close()
+        super().close()
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never formats nor blocks in the caller's thread; records are dropped when full."""
+
+    def __init__(self, record_queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Formatting is deferred to the listener thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+def dropped_record_count() -> int:
+    """
+    Number of records discarded because the queue was full, since the last `configure_pipeline_logging()`.
+
+    A growing count means the sink cannot keep up: raise `queue_size`, sample the noisy levels or use a faster output.
+    """
+    handler = _state["handler"]
+    return handler.dropped if handler is not None else 0
+
+
+class _DrainingQueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # The queue may be full: wait for the listener to free a slot instead of raising queue.Full
+        self.queue.put(self._sentinel)
+
+
+def decode_binary_records(buffer: bytes):
+    """
+    Decode a file written with `configure_pipeline_logging(output="binary")`.
+
+    Yields
+    ------
+        - `dict`: One record per entry with `ts`, `level`, `event` and the JSON payload fields.
+    """
+    event_names = {position: name for name, position in EVENT_INDEX.items()}
+    offset = 0
+    while offset + BINARY_HEADER.size <= len(buffer):
+        created, level, event_index, length = BINARY_HEADER.unpack_from(buffer, offset)
+        offset += BINARY_HEADER.size
+        entry = {"ts": created, "level": logging.getLevelName(level), "event": event_names.get(event_index)}
+        entry.update(json.loads(buffer[offset : offset + length].decode("utf-8")))
+        offset += length
+        yield entry
+
+
+def configure_pipeline_logging(
+    output: str = "console",
+    destination=None,
+    level: str = LOG_INFO,
+    sampling: dict = None,
+    queue_size: int = 10000,
+):
+    """
+    Route every quati log record through a background queue to a single sink.
+
+    Args
+    ----
+        - `output` (str): "console" (human readable), "json" (JSON lines) or "binary" (length-prefixed records).
+        - `destination` (str | stream, optional): File path or text stream; defaults to stdout ("binary" requires a path).
+        - `level` (str): Minimum level, one of `LOG_DEBUG`, `LOG_INFO`, `LOG_ERROR`.
+        - `sampling` (dict, optional): Fraction of records kept per level, e.g. `{LOG_DEBUG: 0.01}`.
+        - `queue_size` (int): Records buffered before new ones are dropped instead of blocking the caller.
+
+    Example
+    -------
+    ```
+    configure_pipeline_logging("json", "/var/log/etl/run.jsonl", level=LOG_DEBUG, sampling={LOG_DEBUG: 0.1})
+    ```
+    """
+    if output == "binary":
+        if not isinstance(destination, str):
+            raise ValueError("The binary output requires a file path as destination")
+        sink = _BinaryFileHandler(destination)
+    else:
+        formatters = {"console": _ConsoleFormatter, "json": _JsonLinesFormatter}
+        if output not in formatters:
+            raise ValueError(f"Output '{output}' is not supported. Choose from {['binary', *formatters]}")
+        if isinstance(destination, str):
+            sink = logging.FileHandler(destination, encoding="utf-8")
+        else:
+            sink = logging.StreamHandler(destination or sys.stdout)
+        sink.setFormatter(formatters[output]())
+
+    with _state_lock:
+        shutdown_pipeline_logging()
+
+        root = logging.getLogger("quati")
+        root.setLevel(LEVELS[level])
+        root.propagate = False
+
+        handler = _NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        root.addHandler(handler)
+        listener = _DrainingQueueListener(handler.queue, sink)
+        listener.start()
+
+        # Keep one record out of every N per level: deterministic and cheaper than random sampling
+        _state.update(
+            listener=listener,
+            handler=handler,
+            sampling={LEVELS[name]: max(1, round(1 / rate)) for name, rate in (sampling or {}).items() if rate > 0},
+            counters={LEVELS[name]: itertools.count() for name in (sampling or {})},
+            muted={LEVELS[name] for name, rate in (sampling or {}).items() if rate <= 0},
+        )
+
+
+def _start_default_logging():
+    """Console output at INFO (the former prints) for records logged before any `configure_pipeline_logging()`.
+
+    A level the application already set on the "quati" logger is kept.
+    """
+    with _state_lock:
+        if _state["listener"] is not None:
+            return
+    level = logging.getLogger("quati").level
+    configure_pipeline_logging()
+    if level != logging.NOTSET:
+        logging.getLogger("quati").setLevel(level)
+
+
+def shutdown_pipeline_logging():
+    """Flush the queue and stop the background listener (registered with `atexit`)."""
+    listener, handler = _state["listener"], _state["handler"]
+    if listener is not None:
+        listener.stop()
+        for sink in listener.handlers:
+            sink.close()
+    if handler is not None:
+        logging.getLogger("quati").removeHandler(handler)
+    _state.update(listener=None, handler=None)
+
+
+atexit.register(shutdown_pipeline_logging)
+
+
+class PipelineLogger:
+    """
+    Structured logger whose events are the message constants of `quati.logger`.
+
+    Messages use %-style arguments and are only formatted by the background listener,
+    so a record that is filtered out or sampled away costs a couple of comparisons.
+
+    The first record logged before `configure_pipeline_logging()` starts the listener
+    thread with the console output at INFO level, so the library prints as it did
+    before; call `configure_pipeline_logging()` first to choose the output instead.
+
+    Example
+    -------
+    ```
+        log = get_logger(__name__)
+        log.info(STATUS_GSHEET_UPDATE_SHEET, "%d rows", len(df), stage=PIPE_LOAD, sheet="Daily")
+        log.error(ERROR_DB_QUERY, "%r", error, stage=PIPE_EXTRACT)
+    ```
+    """
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(name)
+
+    def log(self, level: int, event: str, message: str = "", *args, stage: str = None, **fields):
+        if _state["listener"] is None:
+            _start_default_logging()
+        if not self._logger.isEnabledFor(level):
+            return
+        if level in _state["muted"]:
+            return
+        every = _state["sampling"].get(level)
+        if every and next(_state["counters"][level]) % every:
+            return
+
+        extra = {
+            "event": EVENT_CODES.get(event, event),
+            "text": event if event in EVENT_CODES else "",
+            "stage": stage.strip() if stage else None,
+            "fields": fields,
+        }
+        self._logger.log(level, message, *args, extra=extra)
+
+    def debug(self, event: str, message: str = "", *args, **fields):
+        self.log(logging.DEBUG, event, message, *args, **fields)
+
+    def info(self, event: str, message: str = "", *args, **fields):
+        self.log(logging.INFO, event, message, *args, **fields)
+
+    def error(self, event: str, message: str = "", *args, **fields):
+        self.log(logging.ERROR, event, message, *args, **fields)
+
+
+def get_logger(name: str = "quati") -> PipelineLogger:
+    """Return a `PipelineLogger` attached to the `quati` logging hierarchy."""
+    return PipelineLogger(name if name.startswith("quati") else f"quati.{name}")
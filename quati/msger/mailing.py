@@ -1,16 +1,37 @@
+import base64
 import mimetypes
+import os
+import re
 import smtplib
+import string
+import threading
+import uuid
+import zipfile
+import zlib
 from email import encoders
+from email.message import EmailMessage
 from email.mime.base import MIMEBase
-from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from email.policy import SMTP as SMTP_POLICY
 
-import requests
+from quati.logger import ERROR_API_FAILED, PIPE_LOAD, SUCCESS_API_DATA_CREATED
+from quati.logger.instrumentation import track_stage
+from quati.logger.pipeline import get_logger
+
+log = get_logger(__name__)
 
 # Asset and Connection Settings
 BRAND_LOGO_LINK = "https://raw.githubusercontent.com/quati-dev/quati/refs/heads/main/assets/quati.png"
 MAIL_SERVER = "smtp.mailing.com"
 MAIL_PORT = 587
+LOGO_TIMEOUT = 10
+# Seconds an SMTP connect or reply may take before the call fails instead of hanging
+MAIL_TIMEOUT = 60
+
+# Attachments are read in multiples of 57 bytes, which base64-encode into whole 76-character lines
+ATTACHMENT_CHUNK_BYTES = 57 * 1024
+COMPRESS_ABOVE_BYTES = 5 * 1024 * 1024
+COMPRESSION_FORMATS = {"gzip": (".gz", "application/gzip"), "zip": (".zip", "application/zip")}
 
 # Visual Themes for Alerts
 ALERT_THEMES = {
@@ -21,61 +42,8 @@ ALERT_THEMES = {
     "warning": {"primary": "#FFBE0B", "glyph": "🔸", "alias": "Warning"},
 }
 
-
-class Dispatcher:
-    """
-    Class for sending alert emails with custom HTML and attachment support.
-
-    Allows you to configure a sender user, authentication token, and default recipient list.
-    Uses SMTP with STARTTLS for secure sending.
-
-    Args
-    ----
-    - `account_user` (str): Sender's email address.
-    - `access_key` (str): Sender's app token or password (e.g., Gmail).
-    - `default_list` (list[str]): Default recipient list
-
-    Example
-    -------
-    ```
-        notifier = Dispatcher("sys@service.com", "key_123", ["admin@service.com"])
-        notifier.push_emsg(title="Failure", message="System down", type="error")
-    ```
-    """
-
-    def __init__(self, account_user: str, access_key: str, default_list: list[str]):
-        self.sender_id = account_user
-        self.secret = access_key
-        self.mailing_list = default_list
-
-    def push_emsg(
-        self,
-        abstract: str = "N/A",
-        title: str = "System Notification",
-        datetime: str = "Unknown Time",
-        message: str = "Empty Body",
-        context: str = "General",
-        extra_data: dict = None,
-        files: list[str] = [],
-        type: str = "error",
-        recipients: list[str] = None,
-    ):
-        if type not in ALERT_THEMES:
-            raise ValueError(f"Category '{type}' is not supported. Choose from {list(ALERT_THEMES.keys())}")
-
-        # Extract Theme Config
-        ui = ALERT_THEMES[type]
-        accent, icon, tag = ui["primary"], ui["glyph"], ui["alias"]
-        email_subject = f"System Notification • [{tag.upper()}] {title}"
-
-        # Dynamic Metadata Generation
-        custom_fields = ""
-        if extra_data:
-            for key, val in extra_data.items():
-                custom_fields += f"<div style='margin-bottom: 4px;'><b>{key}:</b> {val}</div>"
-
-        # Refined Modern Template
-        email_content = f"""<!DOCTYPE html>
+# Refined Modern Template (placeholders are filled by _render_alert)
+ALERT_TEMPLATE = """<!DOCTYPE html>
 <html>
 <head>
     <style>
@@ -156,7 +124,7 @@ class Dispatcher:
                 {message}
             </div>
             <div class="info-grid">
-                <div><b>Date and time:</b> {datetime}</div>
+                <div><b>Date and time:</b> {occurred_at}</div>
                 <div><b>Context:</b> {context}</div>
                 {custom_fields}
             </div>
@@ -169,40 +137,438 @@ class Dispatcher:
 </body>
 </html>"""
 
-        # Construct Email Object
-        container = MIMEMultipart("related")
-        container["Subject"] = email_subject
-        container["From"] = self.sender_id
-        container["To"] = ", ".join(recipients or self.mailing_list)
-        container.attach(MIMEText(email_content, "html"))
 
-        # Embed Brand Logo
-        try:
-            raw_img = requests.get(BRAND_LOGO_LINK).content
-            img_attachment = MIMEBase("image", "png")
-            img_attachment.set_payload(raw_img)
-            encoders.encode_base64(img_attachment)
-            img_attachment.add_header("Content-ID", "<brand_logo>")
-            img_attachment.add_header("Content-Disposition", "inline", filename="logo.png")
-            container.attach(img_attachment)
-        except Exception as e:
-            print(f"Warning: Could not embed logo: {e}")
-
-        # Process File Attachments
-        for path in files:
-            kind, _ = mimetypes.guess_type(path)
-            kind = kind or "application/octet-stream"
-            major, minor = kind.split("/", 1)
-
-            with open(path, "rb") as source_file:
-                payload = MIMEBase(major, minor)
-                payload.set_payload(source_file.read())
-                encoders.encode_base64(payload)
-                payload.add_header("Content-Disposition", f"attachment; filename={path.split('/')[-1]}")
-                container.attach(payload)
+def _compile_template(template):
+    """Split a `str.format` template once into (literal, field) pairs, so rendering is a single join."""
+    return [(literal, field) for literal, field, _, _ in string.Formatter().parse(template)]
+
+
+_COMPILED_ALERT = _compile_template(ALERT_TEMPLATE)
+_LOGO_CACHE = {}
+
+
+def _render_alert(values):
+    return "".join(literal + (str(values[field]) if field is not None else "") for literal, field in _COMPILED_ALERT)
+
+
+def _brand_logo():
+    """Return the logo as an inline MIME part, downloading it once per process (None on failure, also cached)."""
+    if "logo" in _LOGO_CACHE:
+        return _LOGO_CACHE["logo"]
+    try:
+        import requests
+
+        response = requests.get(BRAND_LOGO_LINK, timeout=LOGO_TIMEOUT)
+        response.raise_for_status()
+        raw_img = response.content
+    except Exception as e:
+        log.error(ERROR_API_FAILED, "Could not embed logo: %r", e)
+        # Remembered so an unreachable host does not delay every following message
+        _LOGO_CACHE["logo"] = None
+        return None
+    img_attachment = MIMEBase("image", "png")
+    img_attachment.set_payload(raw_img)
+    encoders.encode_base64(img_attachment)
+    img_attachment.add_header("Content-ID", "<brand_logo>")
+    img_attachment.add_header("Content-Disposition", "inline", filename="logo.png")
+    _LOGO_CACHE["logo"] = img_attachment
+    return img_attachment
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object that lets ZipFile output be drained chunk by chunk."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def _iter_file_bytes(path, compression=None):
+    """Yield the content of `path` in chunks, optionally compressed on the fly."""
+    with open(path, "rb") as source_file:
+        blocks = iter(lambda: source_file.read(ATTACHMENT_CHUNK_BYTES), b"")
+        if compression == "gzip":
+            compressor = zlib.compressobj(wbits=31)  # gzip container
+            for block in blocks:
+                yield compressor.compress(block)
+            yield compressor.flush()
+        elif compression == "zip":
+            sink = _ChunkSink()
+            with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+                with archive.open(os.path.basename(path), "w", force_zip64=True) as member:
+                    for block in blocks:
+                        member.write(block)
+                        yield sink.drain()
+            yield sink.drain()
+        else:
+            yield from blocks
+
+
+def _iter_base64_lines(raw_chunks):
+    """Base64-encode a byte stream into CRLF-terminated 76-character lines."""
+    pending = b""
+    for chunk in raw_chunks:
+        pending += chunk
+        usable = len(pending) - len(pending) % 57
+        if usable:
+            yield base64.encodebytes(pending[:usable]).replace(b"\n", b"\r\n")
+            pending = pending[usable:]
+    if pending:
+        yield base64.encodebytes(pending).replace(b"\n", b"\r\n")
+
+
+def _header_bytes(message):
+    return b"".join(SMTP_POLICY.fold_binary(name, value) for name, value in message.items())
+
+
+def _dot_stuff(data):
+    # SMTP DATA ends at a line holding a single "."; lines starting with "." are escaped
+    return re.sub(rb"(?m)^\.", b"..", data)
+
+
+def _iter_message_bytes(headers, inline_parts, files, compression=None, compress_above=COMPRESS_ABOVE_BYTES):
+    """
+    Return an iterator over a multipart/related message as CRLF, dot-stuffed chunks ready for the SMTP DATA phase.
+
+    `inline_parts` are small MIME objects rendered at once; `files` are streamed from disk,
+    so memory stays flat whatever their size. Missing files raise here, before anything is sent.
+    """
+    file_sizes = [(path, os.path.getsize(path)) for path in files]
+    return _generate_message_bytes(headers, inline_parts, file_sizes, compression, compress_above)
+
+
+def _generate_message_bytes(headers, inline_parts, file_sizes, compression, compress_above):
+    boundary = f"===============quati{uuid.uuid4().hex}=="
+    envelope = EmailMessage(policy=SMTP_POLICY)
+    for name, value in headers.items():
+        envelope[name] = value
+    envelope["MIME-Version"] = "1.0"
+    envelope["Content-Type"] = f'multipart/related; boundary="{boundary}"'
+    yield _dot_stuff(_header_bytes(envelope)) + b"\r\n"
+
+    delimiter = f"--{boundary}\r\n".encode()
+    for part in inline_parts:
+        yield delimiter + _dot_stuff(part.as_bytes(policy=SMTP_POLICY)) + b"\r\n"
+
+    for path, size in file_sizes:
+        file_name = os.path.basename(path)
+        kind = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        codec = compression if compression and size > compress_above else None
+        if codec:
+            suffix, kind = COMPRESSION_FORMATS[codec]
+            file_name += suffix
+
+        part_headers = EmailMessage(policy=SMTP_POLICY)
+        part_headers["Content-Type"] = kind
+        part_headers["Content-Transfer-Encoding"] = "base64"
+        part_headers.add_header("Content-Disposition", "attachment", filename=file_name)
+        yield delimiter + _header_bytes(part_headers) + b"\r\n"
+        yield from _iter_base64_lines(_iter_file_bytes(path, codec))
+
+    yield f"--{boundary}--\r\n".encode()
+
+
+def _stream_message(server, sender, recipients, chunks):
+    """
+    Run the SMTP transaction by hand, writing `chunks` to the socket as they are produced
+    (`sendmail` needs the whole message in memory).
+
+    Returns the refused recipients (like `sendmail`) and the number of message bytes sent.
+    """
+    server.ehlo_or_helo_if_needed()
+    code, response = server.mail(sender)
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPSenderRefused(code, response, sender)
+
+    refused = {}
+    for recipient in recipients:
+        code, response = server.rcpt(recipient)
+        if code not in (250, 251):
+            refused[recipient] = (code, response)
+    if len(refused) == len(recipients):
+        server.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+    code, response = server.docmd("data")
+    if code != 354:
+        server.rset()
+        raise smtplib.SMTPDataError(code, response)
+
+    sent_bytes = 0
+    for chunk in chunks:
+        server.send(chunk)
+        sent_bytes += len(chunk)
+    server.send(b".\r\n")
+
+    code, response = server.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, response)
+    return refused, sent_bytes
+
+
+def _end_session(server):
+    """Send QUIT, closing the socket anyway when the server does not answer it."""
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        server.close()
+
+
+def _compose_alert(
+    abstract="N/A",
+    title="System Notification",
+    datetime="Unknown Time",
+    message="Empty Body",
+    context="General",
+    extra_data=None,
+    type="error",
+):
+    """Return the subject and the inline MIME parts (HTML body and logo) of an alert."""
+    if type not in ALERT_THEMES:
+        raise ValueError(f"Category '{type}' is not supported. Choose from {list(ALERT_THEMES.keys())}")
+
+    # Extract Theme Config
+    ui = ALERT_THEMES[type]
+    email_subject = f"System Notification • [{ui['alias'].upper()}] {title}"
+
+    # Dynamic Metadata Generation
+    custom_fields = "".join(
+        f"<div style='margin-bottom: 4px;'><b>{key}:</b> {val}</div>" for key, val in (extra_data or {}).items()
+    )
+    email_content = _render_alert(
+        {
+            "accent": ui["primary"],
+            "icon": ui["glyph"],
+            "title": title,
+            "abstract": abstract,
+            "message": message,
+            "occurred_at": datetime,
+            "context": context,
+            "custom_fields": custom_fields,
+        }
+    )
+
+    inline_parts = [MIMEText(email_content, "html")]
+    logo = _brand_logo()
+    if logo is not None:
+        inline_parts.append(logo)
+    return email_subject, inline_parts
+
+
+class Dispatcher:
+    """
+    Class for sending alert emails with custom HTML and attachment support.
+
+    Allows you to configure a sender user, authentication token, and default recipient list.
+    Uses SMTP with STARTTLS for secure sending.
+
+    Args
+    ----
+    - `account_user` (str): Sender's email address.
+    - `access_key` (str): Sender's app token or password (e.g., Gmail).
+    - `default_list` (list[str]): Default recipient list
+
+    Example
+    -------
+    ```
+        notifier = Dispatcher("sys@service.com", "key_123", ["admin@service.com"])
+        notifier.push_emsg(title="Failure", message="System down", type="error")
+    ```
+    """
+
+    def __init__(self, account_user: str, access_key: str, default_list: list[str]):
+        self.sender_id = account_user
+        self.secret = access_key
+        self.mailing_list = default_list
+
+    def push_emsg(
+        self,
+        abstract: str = "N/A",
+        title: str = "System Notification",
+        datetime: str = "Unknown Time",
+        message: str = "Empty Body",
+        context: str = "General",
+        extra_data: dict = None,
+        files: list[str] = [],
+        type: str = "error",
+        recipients: list[str] = None,
+        compression: str = None,
+        compress_above: int = COMPRESS_ABOVE_BYTES,
+    ):
+        """
+        Send the alert. Attachments are streamed from disk straight to the SMTP socket,
+        so peak memory does not grow with their size.
+
+        Args
+        ----
+        - `files` (list[str]): Paths of the files to attach.
+        - `compression` (str, optional): "zip" or "gzip" to compress attachments larger than `compress_above` bytes.
+        - `compress_above` (int): Size threshold for `compression` (default is 5 MB).
+        """
+        if compression is not None and compression not in COMPRESSION_FORMATS:
+            raise ValueError(f"Compression '{compression}' is not supported. Choose from {list(COMPRESSION_FORMATS)}")
+
+        email_subject, inline_parts = _compose_alert(abstract, title, datetime, message, context, extra_data, type)
+        target_list = recipients or self.mailing_list
+        headers = {"Subject": email_subject, "From": self.sender_id, "To": ", ".join(target_list)}
 
         # Transmission Logic
-        with smtplib.SMTP(MAIL_SERVER, MAIL_PORT) as server:
+        with track_stage(PIPE_LOAD, "push_emsg") as metrics:
+            metrics.rows_in = len(target_list)
+            chunks = _iter_message_bytes(headers, inline_parts, files, compression, compress_above)
+            server = self._connect()
+            try:
+                _, metrics.bytes_transferred = _stream_message(server, self.sender_id, target_list, chunks)
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # The server answered: the transaction was reset or completed, QUIT is safe
+                _end_session(server)
+                raise
+            except BaseException:
+                # Failed mid-transaction (e.g. an attachment vanished while streaming): the server
+                # would read QUIT as message data and never answer, so only the socket is closed
+                server.close()
+                raise
+            _end_session(server)
+
+    def push_emsg_bulk(
+        self,
+        deliveries: list[tuple[list[str], dict]],
+        max_connections: int = 4,
+        compression: str = None,
+        compress_above: int = COMPRESS_ABOVE_BYTES,
+        **shared_fields,
+    ) -> list[dict]:
+        """
+        Send one personalized alert per `(recipients, fields)` pair. Messages are rendered from the
+        shared compiled template and sent over a small pool of SMTP connections that are opened,
+        secured and authenticated once, then reused for every message.
+
+        Args
+        ----
+        - `deliveries` (list[tuple[list[str], dict]]): Recipient list and the `push_emsg` fields
+          (`title`, `message`, `extra_data`, `files`, `type`, ...) of each message.
+        - `max_connections` (int): Messages sent in parallel, one connection each.
+        - `compression`, `compress_above`: Same as in `push_emsg`.
+        - `**shared_fields`: Default `push_emsg` fields, overridden by the per-delivery ones.
+
+        Returns
+        -------
+        - `list[dict]`: One entry per recipient with `delivery` (index in `deliveries`), `recipient`,
+          `status` ("sent", "refused" or "failed") and `error`.
+
+        Example
+        -------
+        ```
+            notifier.push_emsg_bulk(
+                [(["sales@service.com"], {"message": sales_report}), (["ops@service.com"], {"message": ops_report})],
+                title="Daily report",
+                type="note",
+            )
+        ```
+        """
+        if compression is not None and compression not in COMPRESSION_FORMATS:
+            raise ValueError(f"Compression '{compression}' is not supported. Choose from {list(COMPRESSION_FORMATS)}")
+        from concurrent.futures import ThreadPoolExecutor
+
+        opened = []
+        opened_lock = threading.Lock()
+        pool = threading.local()
+
+        def connection():
+            if getattr(pool, "server", None) is None:
+                pool.server = self._connect()
+                with opened_lock:
+                    opened.append(pool.server)
+            return pool.server
+
+        def deliver(index, recipients, fields):
+            fields = {**shared_fields, **fields}
+            files = fields.pop("files", None) or []
+            try:
+                email_subject, inline_parts = _compose_alert(**fields)
+                headers = {"Subject": email_subject, "From": self.sender_id, "To": ", ".join(recipients)}
+                for attempt in range(2):
+                    # Missing attachments raise here, before the transaction opens
+                    chunks = _iter_message_bytes(headers, inline_parts, files, compression, compress_above)
+                    server = connection()
+                    try:
+                        refused, sent_bytes = _stream_message(server, self.sender_id, recipients, chunks)
+                        break
+                    except smtplib.SMTPServerDisconnected:
+                        # The server may drop idle connections: reconnect once
+                        pool.server = None
+                        if attempt:
+                            raise
+                    except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                        # The server answered: the transaction was reset or completed, the session is clean
+                        raise
+                    except Exception:
+                        # Failed mid-transaction (e.g. an attachment vanished while streaming): the
+                        # session may be stuck inside DATA, so it is closed instead of reused
+                        pool.server = None
+                        server.close()
+                        raise
+            except smtplib.SMTPRecipientsRefused as e:
+                log.error(ERROR_API_FAILED, "Delivery %d refused: %r", index, e.recipients, stage=PIPE_LOAD)
+                return [
+                    {"delivery": index, "recipient": recipient, "status": "refused", "error": repr(e.recipients.get(recipient))}
+                    for recipient in recipients
+                ], 0
+            except Exception as e:
+                log.error(ERROR_API_FAILED, "Delivery %d failed: %r", index, e, stage=PIPE_LOAD)
+                return [
+                    {"delivery": index, "recipient": recipient, "status": "failed", "error": repr(e)}
+                    for recipient in recipients
+                ], 0
+
+            return [
+                {
+                    "delivery": index,
+                    "recipient": recipient,
+                    "status": "refused" if recipient in refused else "sent",
+                    "error": repr(refused[recipient]) if recipient in refused else None,
+                }
+                for recipient in recipients
+            ], sent_bytes
+
+        with track_stage(PIPE_LOAD, "push_emsg_bulk") as metrics:
+            try:
+                with ThreadPoolExecutor(max_workers=max(1, max_connections)) as executor:
+                    futures = [
+                        executor.submit(deliver, index, recipients, fields)
+                        for index, (recipients, fields) in enumerate(deliveries)
+                    ]
+                    outcomes = [future.result() for future in futures]
+            finally:
+                for server in opened:
+                    _end_session(server)
+
+            results = [entry for entries, _ in outcomes for entry in entries]
+            metrics.rows_in = len(results)
+            metrics.rows_out = sum(entry["status"] == "sent" for entry in results)
+            metrics.bytes_transferred = sum(sent_bytes for _, sent_bytes in outcomes)
+
+        log.info(SUCCESS_API_DATA_CREATED, "%d/%d recipients reached", metrics.rows_out, metrics.rows_in, stage=PIPE_LOAD)
+        return results
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open an authenticated STARTTLS connection to the mail server."""
+        server = smtplib.SMTP(MAIL_SERVER, MAIL_PORT, timeout=MAIL_TIMEOUT)
+        try:
             server.starttls()
             server.login(self.sender_id, self.secret)
-            server.sendmail(self.sender_id, recipients or self.mailing_list, container.as_string().encode("utf-8"))
+        except BaseException:
+            server.close()
+            raise
+        return server
@@ -1,14 +1,54 @@
+import base64
 import glob
+import json
+import os
 import pickle
 import platform
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
 import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
+from quati.logger import ERROR_FILE_WRITE, ERROR_SELENIUM_BROWSER, ERROR_SELENIUM_TIMEOUT, PIPE_EXTRACT
+from quati.logger.instrumentation import track_stage
+from quati.logger.pipeline import get_logger
+from quati.system.concurrency import AdaptiveLimiter
+from quati.system.unix import DownloadTracker
+
+if TYPE_CHECKING:
+    from selenium import webdriver
 
 warnings.filterwarnings("ignore")
 
+log = get_logger(__name__)
+
+# Resolves every selector inside the page so the whole extraction costs one WebDriver round-trip.
+# Selectors starting with "/" or "(" are evaluated as XPath, anything else as a CSS selector.
+BATCH_EXTRACTION_SCRIPT = """
+const selectors = arguments[0];
+const extracted = {};
+for (const [field, query] of Object.entries(selectors)) {
+    let node = null;
+    try {
+        if (query.startsWith("/") || query.startsWith("(")) {
+            node = document.evaluate(query, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } else {
+            node = document.querySelector(query);
+        }
+    } catch (error) {
+        node = null;
+    }
+    extracted[field] = node ? (node.innerText || node.textContent || "").trim() : null;
+}
+return extracted;
+"""
+
 
 def launch_navigator(
     target_url: str = "about:blank",
@@ -16,7 +56,10 @@ def launch_navigator(
     is_headless: bool = False,
     is_muted: bool = True,
     custom_flags: list = None,
-) -> webdriver.Chrome:
+    capture_network: bool = False,
+    isolate_downloads: bool = False,
+    download_root: str = None,
+) -> "webdriver.Chrome":
     """
     Initializes a Chrome browser using Selenium with customizable settings.
 
@@ -26,6 +69,13 @@ def launch_navigator(
     - is_headless (bool): If True, the browser runs in headless mode (without a graphical interface). Default is False.
     - is_muted (bool): If True, the browser's audio is muted. Default is True.
     - custom_flags (list): A list of custom flags to be passed to Chrome. Default is None, and if not provided, default flags are used.
+    - capture_network (bool): If True, Chrome records its network events (performance log over CDP) so
+      `capture_json_responses()` can return the JSON loaded by the page. Default is False.
+    - isolate_downloads (bool): If True, the browser downloads into its own new folder (under `download_root`,
+      or the system temp folder), exposed as `browser.download_dir`, and `browser.downloads` is a
+      `DownloadTracker` returning each file as soon as it is complete. Default is False.
+    - download_root (str): Parent of the per-browser download folders. Default is None. The folder is
+      removed if the launch fails; otherwise the caller owns it, see `cleanup_downloads()`.
 
     Returns:
     - webdriver.Chrome: The Chrome browser object, ready for automation with Selenium.
@@ -33,12 +83,29 @@ def launch_navigator(
     Example usage:
     >>> browser = launch_navigator("path/to/chromedriver", "https://www.example.com", custom_flags=["--incognito", "--disable-plugins"])
     """
+    from selenium import webdriver
 
     chrome_cfg = webdriver.ChromeOptions() 
     if is_headless: # Adding headless mode flag if necessary
         chrome_cfg.add_argument("--headless=new")
     if is_muted: # Adding muted audio flag if necessary
         chrome_cfg.add_argument("--mute-audio")
+    if capture_network:  # Network.* events are then readable with driver.get_log("performance")
+        chrome_cfg.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    download_dir = None
+    if isolate_downloads:  # Parallel browsers never share a folder, so their downloads cannot be mixed up
+        if download_root:
+            os.makedirs(download_root, exist_ok=True)
+        download_dir = tempfile.mkdtemp(prefix="quati-downloads-", dir=download_root)
+        chrome_cfg.add_experimental_option(
+            "prefs",
+            {
+                "download.default_directory": download_dir,
+                "download.prompt_for_download": False,
+                "download.directory_upgrade": True,
+                "safebrowsing.enabled": True,
+            },
+        )
 
     # Default security and performance flags
     # fmt:off
@@ -57,20 +124,321 @@ def launch_navigator(
     os_identity = platform.system()
 
     # Initialize the WebDriver based on the operating system
-    if os_identity == "Windows":
-        driver_instance = webdriver.Chrome(options=chrome_cfg)
-    elif os_identity in ["Linux", "Darwin"]:  # Linux or macOS
-        driver_instance = webdriver.Chrome(options=chrome_cfg, executable_path=driver_binary)
-    else:
-        raise OSError("Unidentified operating system")
+    try:
+        if os_identity == "Windows":
+            driver_instance = webdriver.Chrome(options=chrome_cfg)
+        elif os_identity in ["Linux", "Darwin"]:  # Linux or macOS
+            driver_instance = webdriver.Chrome(options=chrome_cfg, executable_path=driver_binary)
+        else:
+            raise OSError("Unidentified operating system")
+    except BaseException:
+        if download_dir:  # nobody else knows about the folder yet
+            shutil.rmtree(download_dir, ignore_errors=True)
+        raise
+
+    if download_dir:
+        try:  # Older headless modes ignore the download preferences
+            driver_instance.execute_cdp_cmd("Page.setDownloadBehavior", {"behavior": "allow", "downloadPath": download_dir})
+        except Exception as error:
+            log.error(ERROR_SELENIUM_BROWSER, "Download folder not set over CDP: %s", error)
+        driver_instance.download_dir = download_dir
+        driver_instance.downloads = DownloadTracker(download_dir)
 
     # Attempt to navigate to the provided URL
     try:
         driver_instance.get(target_url)
         return driver_instance
     except Exception as error:
-        print(f"Failed to navigate to the URL: {str(error)}")
+        log.error(ERROR_SELENIUM_BROWSER, "Failed to navigate to %s: %s", target_url, error)
         driver_instance.quit()
+        cleanup_downloads(driver_instance)
+
+
+def cleanup_downloads(driver_obj) -> bool:
+    """
+    Delete the download folder created by `launch_navigator(isolate_downloads=True)`, with its files.
+
+    The folder outlives `quit()` so the files can still be read; callers own it and should call this
+    once they moved what they need, otherwise long-running scrapers keep filling the temp folder.
+
+    Parameters
+    ----------
+    `driver_obj` : Browser object started with `isolate_downloads=True`
+
+    Returns
+    -------
+    bool
+        True if a folder was removed.
+
+    Examples
+    --------
+    >>> report_path = browser.downloads.wait(max_wait=120)
+    >>> shutil.move(report_path, "/data/reports/")
+    >>> browser.quit()
+    >>> cleanup_downloads(browser)
+    True
+    """
+    download_dir = getattr(driver_obj, "download_dir", None)
+    if not download_dir or not os.path.isdir(download_dir):
+        return False
+    shutil.rmtree(download_dir, ignore_errors=True)
+    driver_obj.download_dir = None
+    return True
+
+
+def extract_page_fields(field_selectors: dict, driver_obj, magnitude_fields: list = None) -> dict:
+    """
+    Extract several fields from the current page with a single `execute_script` call.
+
+    Parameters
+    ----------
+    `field_selectors` : Mapping of field name to an XPath (starting with "/" or "(") or a CSS selector.
+    `driver_obj` : Browser object
+    `magnitude_fields` : Fields holding counts such as "10.3M" that should be returned as `int`.
+
+    Returns
+    -------
+    dict
+        Field name to the element text, or None when the selector matched nothing.
+        XPath selectors may target attributes directly, e.g. `//a[@class='post']/@href`.
+
+    Examples
+    --------
+    Extract an Instagram profile header in one round-trip
+
+    >>> extract_page_fields(
+    ...     {
+    ...         "bio": "//header//section/div[3]/span",
+    ...         "posts": "//header//li[1]//span/span",
+    ...         "followers": "//header//li[2]//span/span",
+    ...         "following": "//header//li[3]//span/span",
+    ...     },
+    ...     browser,
+    ...     magnitude_fields=["posts", "followers", "following"],
+    ... )
+    {'bio': 'Official account', 'posts': 1204, 'followers': 10300000, 'following': 87}
+    """
+    from quati.data.processing import convert_magnitude_series
+
+    extracted = driver_obj.execute_script(BATCH_EXTRACTION_SCRIPT, field_selectors) or {}
+
+    numeric_fields = [field for field in (magnitude_fields or []) if field in extracted]
+    if numeric_fields:
+        parsed = convert_magnitude_series([extracted[field] for field in numeric_fields])
+        for field, value, is_valid in zip(numeric_fields, parsed, parsed.notna()):
+            extracted[field] = int(value) if is_valid else None
+
+    return extracted
+
+
+# Performance-log entries kept per browser between reads (Chrome hands each entry out only once)
+NETWORK_LOG_ENTRIES = 10000
+
+
+def _read_network_log(driver_obj, discard=False):
+    """Move the new performance-log entries into the browser's `network_log` buffer and return those entries.
+
+    `get_log("performance")` empties Chrome's log, so the entries are kept on the driver for the
+    next calls; `discard` drops everything read so far (used before opening a new page).
+    """
+    buffer = getattr(driver_obj, "network_log", None)
+    if buffer is None:
+        buffer = driver_obj.network_log = deque(maxlen=NETWORK_LOG_ENTRIES)
+    entries = driver_obj.get_log("performance")
+    if discard:
+        buffer.clear()
+        return []
+    buffer.extend(entries)
+    return entries
+
+
+def _collect_network_events(entries, patterns, responses):
+    """Fold performance-log entries into `responses` (request ID -> details) for URLs matching `patterns`."""
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.responseReceived":
+            response = params["response"]
+            if any(pattern.search(response["url"]) for pattern in patterns):
+                responses[params["requestId"]] = {
+                    "url": response["url"],
+                    "status": response.get("status"),
+                    "state": "pending",
+                }
+        elif method == "Network.loadingFinished" and params.get("requestId") in responses:
+            responses[params["requestId"]]["state"] = "finished"
+        elif method == "Network.loadingFailed" and params.get("requestId") in responses:
+            responses[params["requestId"]]["state"] = "failed"
+
+
+def capture_json_responses(
+    driver_obj,
+    url_patterns: list,
+    target_url: str = None,
+    timeout: float = 15,
+    poll_interval: float = 0.1,
+) -> list:
+    """
+    Return the parsed JSON bodies of the responses whose URL matches `url_patterns`.
+
+    Reads the network events of the CDP performance log (the browser must come from
+    `launch_navigator(capture_network=True)`) and fetches each finished body with
+    `Network.getResponseBody`, so the data the page loads from its API is obtained
+    without querying the DOM and without waiting for it to be rendered.
+
+    Parameters
+    ----------
+    `driver_obj` : Browser object started with `capture_network=True`
+    `url_patterns` : Regular expressions searched in the response URLs ("." and "?" are regex syntax:
+    use `re.escape` for a literal substring)
+    `target_url` : Page to open first; the events buffered from earlier pages are discarded. None keeps them
+    and searches everything buffered since the last navigation made by this function
+    `timeout` : Seconds to wait until every pattern has at least one finished response
+    `poll_interval` : Seconds between two reads of the performance log
+
+    Returns
+    -------
+    list
+        One `{"url", "status", "data"}` dict per matching response, in arrival order; `data` is
+        the parsed JSON (or the raw text when the body is not JSON).
+
+    Examples
+    --------
+    >>> browser = launch_navigator(is_headless=True, capture_network=True)
+    >>> capture_json_responses(browser, [r"/api/v1/profile/\\w+"], "https://www.example.com/quati")
+    [{'url': 'https://www.example.com/api/v1/profile/quati', 'status': 200, 'data': {'followers': 10300000, ...}}]
+    """
+    patterns = [re.compile(pattern) if isinstance(pattern, str) else pattern for pattern in url_patterns]
+    responses = {}
+    if target_url is not None:
+        _read_network_log(driver_obj, discard=True)  # drop the events of the previous pages
+        driver_obj.get(target_url)
+
+    deadline = time.monotonic() + timeout
+    _read_network_log(driver_obj)
+    entries = list(driver_obj.network_log)  # everything buffered since the last navigation
+    while True:
+        _collect_network_events(entries, patterns, responses)
+        done = [details["url"] for details in responses.values() if details["state"] != "pending"]
+        answered = sum(any(pattern.search(url) for url in done) for pattern in patterns)
+        if answered == len(patterns):
+            break
+        if time.monotonic() >= deadline:
+            log.error(ERROR_SELENIUM_TIMEOUT, "%d of %d URL patterns answered", answered, len(patterns), stage=PIPE_EXTRACT)
+            break
+        time.sleep(poll_interval)
+        # Later polls only parse what arrived since the previous one
+        entries = _read_network_log(driver_obj)
+
+    captured = []
+    for request_id, details in responses.items():
+        if details["state"] != "finished":
+            continue
+        try:
+            body = driver_obj.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except Exception as error:  # evicted from the browser buffer or redirected
+            log.error(ERROR_SELENIUM_BROWSER, "No body for %s: %s", details["url"], error, stage=PIPE_EXTRACT)
+            continue
+        text = base64.b64decode(body["body"]).decode("utf-8") if body.get("base64Encoded") else body["body"]
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = text
+        captured.append({"url": details["url"], "status": details["status"], "data": data})
+    return captured
+
+
+def _launch_pooled_navigator():
+    # Every pooled browser needs its own DevTools port; Chrome keeps the last value of a repeated flag
+    return launch_navigator(is_headless=True, custom_flags=["--remote-debugging-port=0"])
+
+
+def scrape_pages(targets, extract, driver_factory=None, limiter=None) -> list:
+    """
+    Visit every URL with a pool of browsers sized by an `AdaptiveLimiter`.
+
+    Browsers are reused between pages. The pool grows while pages load without errors and
+    shrinks on Chrome crashes ("tab crashed", out of memory) or when the host memory is above
+    85%; a browser that failed is quit instead of being reused, and browsers above a lowered
+    limit are closed as they come back to the pool.
+
+    Parameters
+    ----------
+    `targets` : URLs to visit
+    `extract` : Called as `extract(driver, url)` once the page is loaded; its return value is the page result
+    `driver_factory` : Creates a browser; default is a headless `launch_navigator`
+    `limiter` : Shared `AdaptiveLimiter`; default starts at 2 browsers, at most 8, watching the host memory
+
+    Returns
+    -------
+    list
+        One `{"url", "result", "error"}` dict per target, in the input order.
+
+    Examples
+    --------
+    >>> scrape_pages(
+    ...     profile_urls,
+    ...     lambda driver, url: extract_page_fields({"followers": "//header//li[2]//span/span"}, driver, ["followers"]),
+    ... )
+    [{'url': 'https://www.instagram.com/quati/', 'result': {'followers': 10300000}, 'error': None}, ...]
+    """
+    if limiter is None:
+        from quati.system.unix import get_host_sampler
+
+        limiter = AdaptiveLimiter(initial=2, maximum=8, sampler=get_host_sampler(), memory_limit=85.0)
+    driver_factory = driver_factory or _launch_pooled_navigator
+    idle_drivers = queue.SimpleQueue()
+    pool_lock = threading.Lock()
+    open_drivers = [0]
+
+    def discard(driver_obj):
+        with pool_lock:
+            open_drivers[0] -= 1
+        try:
+            driver_obj.quit()
+        except Exception:
+            pass
+
+    def visit(url):
+        with limiter.slot() as ticket:
+            driver_obj = None
+            try:
+                try:
+                    driver_obj = idle_drivers.get_nowait()
+                except queue.Empty:
+                    driver_obj = driver_factory()
+                    if driver_obj is None:
+                        raise RuntimeError("the browser could not be started")
+                    with pool_lock:
+                        open_drivers[0] += 1
+                driver_obj.get(url)
+                result = extract(driver_obj, url)
+            except Exception as error:
+                ticket.error = error
+                log.error(ERROR_SELENIUM_BROWSER, "Failed to scrape %s: %s", url, error, stage=PIPE_EXTRACT)
+                if driver_obj is not None:
+                    discard(driver_obj)
+                return {"url": url, "result": None, "error": repr(error)}
+
+            with pool_lock:
+                keep = open_drivers[0] <= limiter.limit
+            if keep:
+                idle_drivers.put(driver_obj)
+            else:
+                discard(driver_obj)
+            return {"url": url, "result": result, "error": None}
+
+    with track_stage(PIPE_EXTRACT, "scrape_pages") as metrics:
+        metrics.rows_in = len(targets)
+        try:
+            with ThreadPoolExecutor(max_workers=limiter.maximum) as pool:
+                pages = list(pool.map(visit, targets))
+        finally:
+            while not idle_drivers.empty():
+                discard(idle_drivers.get_nowait())
+        metrics.rows_out = sum(page["error"] is None for page in pages)
+    return pages
+
 
 def load_session_cookies(dir_path, search_term, driver_obj):
     """Import cookies to browser.
@@ -131,7 +499,7 @@ def save_session_cookies(destination_path, driver_obj):
             pickle.dump(session_cookies, output_file)
         return True
     except Exception as error:
-        print(f"Cookie export failed: {str(error)}")
+        log.error(ERROR_FILE_WRITE, "Cookie export failed: %s", error)
         return False
 
 
@@ -145,6 +513,8 @@ def is_node_present(xpath_query: str = ""):
     Returns:
         bool: True if the element is found, False otherwise.
     """
+    from selenium.webdriver.common.by import By
+
     try:
         # Assumes 'browser' is defined globally or managed in scope
         browser.find_element(By.XPATH, xpath_query)
@@ -165,6 +535,10 @@ def dismiss_popup(target_xpath: str, use_esc: bool = False, element_css_class: s
     Returns:
         None
     """
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+
     attempts = 0
     while is_node_present(target_xpath) and attempts < 3:
         if use_esc:
@@ -0,0 +1,271 @@
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from time import monotonic, sleep
+
+from quati.logger import ETL_IN_PROGRESS
+from quati.logger.pipeline import get_logger
+
+log = get_logger(__name__)
+
+# HTTP statuses meaning "slow down"; Google APIs also answer 403 with a rate-limit reason
+THROTTLING_STATUSES = (429, 503)
+# Anchored forms of the same signals in error messages, for exceptions without a status attribute
+# (gspread's "APIError: [429]: ...", "HTTP 503", Google error reasons, Chrome crashes). Bare numbers
+# or words such as "quota" are not enough: they also show up in row ids and column names.
+THROTTLING_PATTERNS = re.compile(
+    r"\[(?:429|503)\]"
+    r"|\b(?:http|status|code|error)[\s:=]*(?:429|503)\b"
+    r"|\b(?:429|503) (?:too many requests|service unavailable)\b"
+    r"|\btoo many requests\b"
+    r"|\b(?:user)?ratelimitexceeded\b|\brate limit exceeded\b|\bexceeded rate limits\b"
+    r"|\bquotaexceeded\b|\bquota exceeded\b"
+    r"|\bresource_exhausted\b"
+    r"|\bbackenderror\b"
+    r"|\bout of memory\b|\btab crashed\b|\bpage crash|\bchrome not reachable\b",
+    re.IGNORECASE,
+)
+
+
+def _error_status(error):
+    """HTTP status carried by the exception (`code`, `status_code` or `response.status_code`), if any."""
+    response = getattr(error, "response", None)
+    for status in (getattr(error, "code", None), getattr(error, "status_code", None), getattr(response, "status_code", None)):
+        try:
+            return int(status)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def is_throttling_error(error):
+    """Tell whether an exception means "slow down" (HTTP 429/503, quota, Chrome out of memory).
+
+    The status code on the exception decides first; the message is only searched for
+    anchored patterns (`THROTTLING_PATTERNS`), so "row 4291" or "quota_used" do not match.
+
+    Parameters
+    ----------
+    `error` : The exception raised by the call
+
+    Examples
+    --------
+    ```
+    is_throttling_error(Exception("APIError: [429]: Quota exceeded for quota metric 'Write requests'"))
+    True
+    is_throttling_error(KeyError("quota_used"))
+    False
+    ```
+    """
+    if error is None:
+        return False
+    status = _error_status(error)
+    if status in THROTTLING_STATUSES:
+        return True
+    # Other statuses only count with an explicit rate-limit reason (Google's 403 rateLimitExceeded)
+    return THROTTLING_PATTERNS.search(f"{type(error).__name__} {error}") is not None
+
+
+class SlotTicket:
+    """Handle yielded by `AdaptiveLimiter.slot()`; set `error` to report a failure that was handled."""
+
+    __slots__ = ("error",)
+
+    def __init__(self):
+        self.error = None
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit shared by the workers calling the same backend.
+
+    The limit grows by `increase` per round of successful calls that used all the
+    available slots (additive increase), and is multiplied by `backoff` when a call
+    is throttled, the error rate or the average latency of the recent calls is too
+    high, or the host memory is above `memory_limit` (multiplicative decrease).
+    A throttled call only counts if it started after the last decrease, and the other
+    signals are spaced by `cooldown` seconds, so one burst of errors counts once.
+
+    Parameters
+    ----------
+    `initial` : Starting number of concurrent calls
+    `minimum`, `maximum` : Bounds of the limit
+    `increase` : Slots added per round of saturated successful calls
+    `backoff` : Factor applied to the limit on a decrease
+    `latency_target` : Average latency (seconds) above which the limit decreases; None disables the check
+    `error_rate_limit` : Share of failed calls in the window above which the limit decreases
+    `window` : Number of recent calls used for the error rate and the average latency
+    `cooldown` : Minimum seconds between two decreases caused by errors, latency or memory
+    `sampler` : Optional `HostSampler` consulted for memory pressure
+    `memory_limit` : Memory usage (percent) above which the limit decreases
+    `clock` : Time source, replaceable in simulations
+
+    Examples
+    --------
+    ```
+    limiter = AdaptiveLimiter(initial=2, maximum=16)
+    with limiter.slot():
+        worksheet.update("A1", rows)
+    limiter.map(send_payload, payloads)
+    ```
+    """
+
+    def __init__(
+        self,
+        initial=4,
+        minimum=1,
+        maximum=32,
+        increase=1.0,
+        backoff=0.75,
+        latency_target=None,
+        error_rate_limit=0.2,
+        window=20,
+        cooldown=1.0,
+        sampler=None,
+        memory_limit=90.0,
+        clock=monotonic,
+    ):
+        if not minimum <= initial <= maximum:
+            raise ValueError(f"initial ({initial}) must be between minimum ({minimum}) and maximum ({maximum})")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_target = latency_target
+        self.error_rate_limit = error_rate_limit
+        self.cooldown = cooldown
+        self.sampler = sampler
+        self.memory_limit = memory_limit
+        self._clock = clock
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._outcomes = deque(maxlen=window)
+        self._latencies = deque(maxlen=window)
+        self._last_decrease = None
+        self._condition = threading.Condition()
+        self.history = deque([(clock(), initial, "start")], maxlen=1000)
+
+    @property
+    def limit(self):
+        return max(self.minimum, int(self._limit))
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def acquire(self, timeout=None):
+        """Wait for a free slot; returns False if `timeout` seconds pass first."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < self.limit, timeout):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, latency=None, error=None):
+        """Free a slot and feed back how the call went."""
+        with self._condition:
+            # Only a call that ran with every slot taken proves the limit is too low; after a
+            # decrease the calls above the new limit drain first
+            saturated = self._in_flight == self.limit
+            self._in_flight -= 1
+            throttled = is_throttling_error(error)
+            # Throttling has its own response; counting it as an error too would back off twice
+            self._outcomes.append(error is not None and not throttled)
+            if error is None and latency is not None:
+                self._latencies.append(latency)
+
+            reason = "throttled" if throttled else self._backoff_reason()
+            if reason:
+                started = None if latency is None else self._clock() - latency
+                self._decrease(reason, started)
+            elif error is None and saturated and self._limit < self.maximum:
+                self._set_limit(min(self.maximum, self._limit + self.increase / self._limit), "increase")
+            self._condition.notify_all()
+
+    def _backoff_reason(self):
+        if self.sampler is not None:
+            memory = self.sampler.snapshot().get("memory_percent")
+            if memory is not None and memory >= self.memory_limit:
+                return "memory"
+        if len(self._outcomes) >= self._outcomes.maxlen // 2:
+            if sum(self._outcomes) / len(self._outcomes) > self.error_rate_limit:
+                return "errors"
+        if self.latency_target is not None and len(self._latencies) >= self._latencies.maxlen // 2:
+            if sum(self._latencies) / len(self._latencies) > self.latency_target:
+                return "latency"
+        return None
+
+    def _decrease(self, reason, started=None):
+        now = self._clock()
+        if self._last_decrease is not None:
+            # A throttled call sent before the last decrease was answered for the old limit;
+            # the other signals are averages, so they are only spaced by the cooldown
+            if reason == "throttled" and started is not None:
+                if started <= self._last_decrease:
+                    return
+            elif now - self._last_decrease < self.cooldown:
+                return
+        self._last_decrease = now
+        # Start the next evaluation from the new limit, not from the calls that caused the decrease
+        self._outcomes.clear()
+        self._latencies.clear()
+        self._set_limit(max(self.minimum, self._limit * self.backoff), reason)
+
+    def _set_limit(self, value, reason):
+        before = self.limit
+        self._limit = float(value)
+        if self.limit != before:
+            self.history.append((self._clock(), self.limit, reason))
+            log.debug(ETL_IN_PROGRESS, "concurrency limit %d -> %d", before, self.limit, reason=reason)
+
+    @contextmanager
+    def slot(self):
+        """Hold a slot for the duration of the block; exceptions raised in it count as failures."""
+        self.acquire()
+        ticket = SlotTicket()
+        started = self._clock()
+        try:
+            yield ticket
+        except Exception as error:
+            ticket.error = ticket.error or error
+            raise
+        finally:
+            self.release(self._clock() - started, ticket.error)
+
+    def call(self, function, *args, **kwargs):
+        with self.slot():
+            return function(*args, **kwargs)
+
+    def map(self, function, items, retries=0, retry_wait=1.0):
+        """Run `function` on every item with at most `limit` calls in flight; results keep the input order.
+
+        Items are pulled lazily, so a generator is never materialized ahead of the free slots.
+        A throttled call is retried up to `retries` times: its slot is released (lowering the
+        limit), then it waits `retry_wait` seconds, doubled on every attempt (at most 60), and
+        queues for a slot again. The first exception is raised once every submitted call has finished.
+        """
+
+        def run(item, started):
+            attempt = 0
+            while True:
+                error = None
+                try:
+                    return function(item)
+                except Exception as raised:
+                    error = raised
+                    if attempt >= retries or not is_throttling_error(raised):
+                        raise
+                finally:
+                    self.release(self._clock() - started, error)
+                attempt += 1
+                sleep(min(60, retry_wait * 2 ** (attempt - 1)))
+                self.acquire()
+                started = self._clock()
+
+        with ThreadPoolExecutor(max_workers=self.maximum) as pool:
+            futures = []
+            for item in items:
+                self.acquire()
+                futures.append(pool.submit(run, item, self._clock()))
+        return [future.result() for future in futures]
@@ -1,10 +1,17 @@
 import os
+import ctypes
+import ctypes.util
+import fnmatch
 import glob
-import subprocess
+import platform
+import select
+import struct
+import threading
 import warnings
-from datetime import datetime
-from time import sleep
-from tqdm import tqdm
+from bisect import bisect_left, insort
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep, time
 
 warnings.filterwarnings("ignore")
 
@@ -13,6 +20,63 @@ PATH_PLACEHOLDER = BASE_PATH
 SRC_IDENTIFIER = f"{BASE_PATH}filename.txt"
 DEST_IDENTIFIER = f"{BASE_PATH}new_filename.txt"
 
+# Suffixes used by browsers and downloaders while a file is still being written
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".tmp", ".download")
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class _InotifyWatcher:
+    """Minimal ctypes binding over Linux inotify, reporting the directory entries that changed."""
+
+    def __init__(self, folders):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.folders = {}
+        mask = IN_CREATE | IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO
+        for folder in folders:
+            descriptor = libc.inotify_add_watch(self.fd, os.fsencode(folder), mask)
+            if descriptor < 0:
+                self.close()
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {folder}")
+            self.folders[descriptor] = folder
+
+    def read(self, timeout):
+        """Block up to `timeout` seconds; return changed paths, or None when the queue overflowed."""
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return []
+
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed, offset = [], 0
+        while offset + INOTIFY_EVENT.size <= len(buffer):
+            descriptor, mask, _, name_length = INOTIFY_EVENT.unpack_from(buffer, offset)
+            offset += INOTIFY_EVENT.size
+            name = buffer[offset : offset + name_length].rstrip(b"\0")
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if name and descriptor in self.folders:
+                changed.append(os.path.join(self.folders[descriptor], os.fsdecode(name)))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
 
 def modify_file_name(
     folder_path=PATH_PLACEHOLDER,
@@ -64,6 +128,351 @@ def erase_file(folder_path=PATH_PLACEHOLDER, target_file=SRC_IDENTIFIER):
         os.remove(full_path)
 
 
+class _PrefixIndex:
+    """Sorted listing of a folder, answering "first file starting with X" with a binary search."""
+
+    def __init__(self, folder_path):
+        with os.scandir(folder_path) as entries:
+            self.names = sorted(entry.name for entry in entries if entry.is_file())
+
+    def first(self, prefix):
+        position = bisect_left(self.names, prefix)
+        if position < len(self.names) and self.names[position].startswith(prefix):
+            return self.names[position]
+        return None
+
+    def add(self, name):
+        position = bisect_left(self.names, name)
+        if position == len(self.names) or self.names[position] != name:
+            insort(self.names, name)
+
+    def discard(self, name):
+        position = bisect_left(self.names, name)
+        if position < len(self.names) and self.names[position] == name:
+            del self.names[position]
+
+
+def _run_file_operations(plan, operation, dry_run, max_workers, chained=False):
+    """Execute planned (source, target) operations and return one result dict per item, in order.
+
+    `chained` plans (operations that depend on each other's order) always run sequentially.
+    """
+
+    def execute(step):
+        result = {"source": step["source"], "target": step["target"]}
+        if step["source"] is None:
+            return {**result, "status": "not_found", "error": None}
+        if dry_run:
+            return {**result, "status": "planned", "error": None}
+        try:
+            operation(step["source"], step["target"])
+            return {**result, "status": "done", "error": None}
+        except OSError as error:
+            return {**result, "status": "failed", "error": repr(error)}
+
+    if max_workers and max_workers > 1 and not chained:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(execute, plan))
+    return [execute(step) for step in plan]
+
+
+def bulk_modify_file_names(folder_path=PATH_PLACEHOLDER, renames=(), dry_run=False, max_workers=None):
+    """Rename many files with a single directory scan.
+
+    Each `(current_name, updated_name)` pair behaves like `modify_file_name`: `current_name`
+    may be a full filename or its prefix. Pairs are resolved in order against an in-memory
+    index, so a file renamed by an earlier pair is visible to the later ones.
+
+    Parameters
+    ----------
+    `folder_path` : Full file path.
+    `renames` : List of `(current_name, updated_name)` pairs.
+    `dry_run` : Only resolve the operations, without touching the file system.
+    `max_workers` : Run the renames on a thread pool (useful on network file systems).
+
+    Returns
+    -------
+    list[dict]
+        One entry per pair with `source`, `target`, `status` ("done", "planned", "not_found", "failed") and `error`.
+
+    Examples
+    --------
+    Rename two downloaded reports
+
+    ```
+    bulk_modify_file_names("/home/computer/Downloads", [("sales_", "sales.csv"), ("stock_", "stock.csv")])
+    [{'source': '/home/computer/Downloads/sales_2024.csv', 'target': '/home/computer/Downloads/sales.csv', 'status': 'done', 'error': None}, ...]
+    ```
+    """
+    index = _PrefixIndex(folder_path)
+    plan, produced, chained = [], set(), False
+    for current_name, updated_name in renames:
+        match = index.first(current_name)
+        target_path = os.path.join(folder_path, updated_name)
+        if match is None:
+            plan.append({"source": None, "target": target_path})
+            continue
+        chained = chained or match in produced
+        index.discard(match)
+        index.add(updated_name)
+        produced.add(updated_name)
+        plan.append({"source": os.path.join(folder_path, match), "target": target_path})
+
+    # Order also matters when a rename overwrites the source of another one (a->b, c->a)
+    # or two renames share a target: in parallel either could run first and lose a file
+    sources = {step["source"] for step in plan if step["source"] is not None}
+    targets = [step["target"] for step in plan if step["source"] is not None]
+    chained = chained or len(set(targets)) < len(targets) or not sources.isdisjoint(targets)
+
+    return _run_file_operations(plan, os.rename, dry_run, max_workers, chained)
+
+
+def bulk_erase_files(folder_path=PATH_PLACEHOLDER, target_files=(), match_prefix=False, dry_run=False, max_workers=None):
+    """Delete many files with a single directory scan.
+
+    Parameters
+    ----------
+    `folder_path` : Full file path.
+    `target_files` : List of filenames (or prefixes when `match_prefix` is True).
+    `match_prefix` : Delete the first file starting with each entry instead of requiring an exact name.
+    `dry_run` : Only resolve the operations, without touching the file system.
+    `max_workers` : Run the deletions on a thread pool (useful on network file systems).
+
+    Returns
+    -------
+    list[dict]
+        One entry per target with `source`, `target` (always None), `status` and `error`.
+
+    Examples
+    --------
+    Remove last week's exports, checking first what would be deleted
+
+    ```
+    bulk_erase_files("/home/computer/Downloads", ["sales_", "stock_"], match_prefix=True, dry_run=True)
+    ```
+    """
+    index = _PrefixIndex(folder_path)
+    plan = []
+    for target_file in target_files:
+        match = index.first(target_file)
+        if match is not None and not match_prefix and match != target_file:
+            match = None
+        if match is not None:
+            index.discard(match)
+        plan.append({"source": None if match is None else os.path.join(folder_path, match), "target": None})
+
+    return _run_file_operations(plan, lambda source, _: os.remove(source), dry_run, max_workers)
+
+
+def wait_for_files(
+    folder_path=PATH_PLACEHOLDER,
+    target_patterns=SRC_IDENTIFIER,
+    byte_threshold=1,
+    max_wait=15,
+    stable_for=0.5,
+    poll_interval=0.25,
+):
+    """Wait until files matching one or more prefixes appear and stop growing.
+
+    On Linux the folder is watched with inotify, so the call wakes up as soon as a
+    file is created or written; elsewhere (or when inotify is unavailable) it falls
+    back to scanning the folder every `poll_interval` seconds.
+
+    Parameters
+    ----------
+    `folder_path` : Full file path.
+    `target_patterns` : Full filename or its prefix, or a list of them.
+    `byte_threshold` : The minimum size of a file to be able to use it
+    `max_wait` : Maximum waiting time (seconds) for all patterns
+    `stable_for` : Seconds a file size must stay unchanged before it counts as complete
+    `poll_interval` : Re-check interval (seconds) for the polling fallback
+
+    A file still carrying a partial-download suffix (`.crdownload`, `.part`, ...) is ignored when its
+    final name also matches the pattern; a pattern naming the suffix itself ("export.tmp") still matches it.
+
+    Returns
+    -------
+    dict
+        Pattern to the matched file path, or None for patterns that timed out.
+
+    Examples
+    --------
+    Wait for two reports downloaded by the browser
+
+    ```
+    wait_for_files("/home/computer/Downloads", ["sales_", "stock_"], 100, 60)
+    {'sales_': '/home/computer/Downloads/sales_2024.csv', 'stock_': None}
+    ```
+    """
+    patterns = [target_patterns] if isinstance(target_patterns, str) else list(target_patterns)
+
+    # Patterns may carry a sub-folder, exactly like the glob used by locate_and_verify_file
+    lookups = {}
+    for pattern in patterns:
+        full_pattern = os.path.join(folder_path, pattern)
+        lookups[pattern] = (os.path.dirname(full_pattern) or ".", f"{os.path.basename(full_pattern)}*")
+
+    matched = {pattern: None for pattern in patterns}
+    candidates = {}  # path -> (last size, monotonic time the size was first seen)
+    deadline = monotonic() + max_wait
+
+    def pending_patterns(path):
+        folder, name = os.path.split(path)
+        # "report.csv.crdownload" is the unfinished "report.csv": skip it for the patterns
+        # its final name would match, but not for one asking for the partial name itself
+        final_name = next((name[: -len(suffix)] for suffix in PARTIAL_SUFFIXES if name.endswith(suffix)), None)
+        return [
+            pattern
+            for pattern, (pattern_folder, name_glob) in lookups.items()
+            if matched[pattern] is None
+            and folder == pattern_folder
+            and fnmatch.fnmatch(name, name_glob)
+            and not (final_name and fnmatch.fnmatch(final_name, name_glob))
+        ]
+
+    def collect(paths):
+        for path in paths:
+            if pending_patterns(path):
+                candidates.setdefault(path, (-1, monotonic()))
+
+    def scan_folders():
+        for folder in {folder for folder, _ in lookups.values()}:
+            try:
+                with os.scandir(folder) as entries:
+                    collect([os.path.join(folder, entry.name) for entry in entries])
+            except OSError:
+                continue
+
+    watcher = None
+    if platform.system() == "Linux":
+        try:
+            watcher = _InotifyWatcher({folder for folder, _ in lookups.values()})
+        except (OSError, AttributeError):
+            watcher = None
+
+    try:
+        scan_folders()
+        while True:
+            now = monotonic()
+            for path, (last_size, seen_at) in list(candidates.items()):
+                try:
+                    current_size = os.stat(path).st_size if os.path.isfile(path) else -1
+                except OSError:
+                    current_size = -1
+
+                if current_size != last_size:
+                    candidates[path] = (current_size, now)
+                    last_size, seen_at = current_size, now
+                if last_size < byte_threshold or now - seen_at < stable_for:
+                    continue
+
+                for pattern in pending_patterns(path):
+                    matched[pattern] = path
+                del candidates[path]
+
+            remaining = deadline - monotonic()
+            if all(matched.values()) or remaining <= 0:
+                return matched
+
+            # Unstable candidates still need a re-check once their settle time has passed
+            timeout = min(remaining, poll_interval) if candidates or watcher is None else remaining
+            if watcher is None:
+                sleep(timeout)
+                scan_folders()
+            else:
+                changed = watcher.read(timeout)
+                if changed is None:
+                    scan_folders()
+                else:
+                    collect(changed)
+    finally:
+        if watcher is not None:
+            watcher.close()
+
+
+class DownloadTracker:
+    """Detect the files completed in a download folder since the tracker was created.
+
+    Browsers write to `name.crdownload` (or another partial suffix) and rename the file
+    when it is done, so a new file counts as complete once it has its final name, no
+    partial sibling is left and it holds at least `byte_threshold` bytes. On Linux the
+    folder is watched with inotify and `wait()` returns on the rename itself; elsewhere
+    it re-scans every `poll_interval` seconds.
+
+    Parameters
+    ----------
+    `folder_path` : Folder the browser downloads to, ideally used by that browser only
+
+    Examples
+    --------
+    ```
+    tracker = DownloadTracker("/tmp/quati-downloads-x1")
+    browser.find_element(By.ID, "export").click()
+    tracker.wait(max_wait=120)
+    '/tmp/quati-downloads-x1/sales_2024.csv'
+    ```
+    """
+
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        os.makedirs(folder_path, exist_ok=True)
+        self.completed = []
+        self._known = set(os.listdir(folder_path))
+
+    def pending(self):
+        """Partial downloads currently in the folder."""
+        return [name for name in os.listdir(self.folder_path) if name.endswith(PARTIAL_SUFFIXES)]
+
+    def _new_complete_files(self, byte_threshold):
+        found = []
+        names = set(os.listdir(self.folder_path))
+        for name in names - self._known:
+            path = os.path.join(self.folder_path, name)
+            if name.endswith(PARTIAL_SUFFIXES) or any(f"{name}{suffix}" in names for suffix in PARTIAL_SUFFIXES):
+                continue
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            # Chrome reserves the final name with an empty file while the download runs
+            if os.path.isfile(path) and info.st_size >= byte_threshold:
+                found.append((info.st_mtime, path))
+        return [path for _, path in sorted(found)]
+
+    def wait(self, max_wait=60, byte_threshold=1, poll_interval=0.25):
+        """Return the path of the next completed download, or None after `max_wait` seconds.
+
+        Each file is returned once; several downloads are collected by calling `wait()` again.
+        """
+        deadline = monotonic() + max_wait
+        watcher = None
+        if platform.system() == "Linux":
+            try:
+                watcher = _InotifyWatcher([self.folder_path])
+            except (OSError, AttributeError):
+                watcher = None
+
+        try:
+            while True:
+                ready = self._new_complete_files(byte_threshold)
+                if ready:
+                    self._known.add(os.path.basename(ready[0]))
+                    self.completed.append(ready[0])
+                    return ready[0]
+
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    return None
+                # Any event (or an overflow) is followed by a full re-scan: the folder is small
+                if watcher is None:
+                    sleep(min(remaining, poll_interval))
+                else:
+                    watcher.read(remaining)
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+
 def locate_and_verify_file(
     folder_path=PATH_PLACEHOLDER,
     target_pattern=SRC_IDENTIFIER,
@@ -84,6 +493,8 @@ def locate_and_verify_file(
             - must be informed in bytes
         - `max_wait` : wait 15 seconds
 
+    Uses `wait_for_files`, so the call returns as soon as the file shows up instead of on the next full second.
+
     Examples
     --------
     Looking for a file that actually exists, called "teste.txt", with a minimum of 100 Bytes and waiting a maximum of 10 seconds
@@ -93,28 +504,8 @@ def locate_and_verify_file(
     True
     ```
     """
-    is_ready = False
-    deadline = int(datetime.now().timestamp()) + max_wait
-
-    while not is_ready:
-        try:
-            found_items = glob.glob(os.path.join(folder_path, f"{target_pattern}*"))
-
-            if found_items:
-                target_item = found_items[0]
-                if os.path.isfile(target_item):
-                    actual_size = os.path.getsize(target_item)
-
-                    if actual_size >= byte_threshold:
-                        is_ready = True
-                        return is_ready
-
-            sleep(1)
-            if int(datetime.now().timestamp()) >= deadline:
-                return False
-        except Exception:
-            if int(datetime.now().timestamp()) >= deadline:
-                return False
+    found = wait_for_files(folder_path, [target_pattern], byte_threshold, max_wait, stable_for=0)
+    return found[target_pattern] is not None
 
 
 def display_timer(duration=1, use_visual: bool = True):
@@ -133,6 +524,8 @@ def display_timer(duration=1, use_visual: bool = True):
     """
     label = f"Waiting {duration}s"
     if use_visual:
+        from tqdm import tqdm
+
         for _ in tqdm(range(duration), desc=label):
             sleep(1)
     else:
@@ -141,39 +534,174 @@ def display_timer(duration=1, use_visual: bool = True):
 
 def fetch_host_details():
     """
-    Retrieves system information using the 'uname -a' command.
+    Retrieves system information from the kernel (`os.uname`, without spawning `uname -a`).
 
     Returns:
         `dict`: A dictionary containing the system information with the following keys:
             - `kernel_name`: The name of the kernel.
             - `hostname`: The hostname of the system.
-            - `kernel_version`: The version of the kernel.
+            - `kernel_version`: The version (release) of the kernel.
             - `build_info`: Additional build information.
             - `architecture`: The system architecture.
 
-    Raises:
-        subprocess.CalledProcessError: If the 'uname -a' command fails to execute.
-
     ```
     info = fetch_host_details()
     print(info['hostname'])
     print(info['kernel_version'])
     ```
     """
-    try:
-        execution = subprocess.run(["uname", "-a"], capture_output=True, text=True, check=True)
-        raw_string = execution.stdout.strip()
-        segments = raw_string.split()
-
-        data_map = {
-            "kernel_name": segments[0],
-            "hostname": segments[1],
-            "kernel_version": segments[2],
-            "build_info": " ".join(segments[3:6]),
-            "architecture": " ".join(segments[6:]),
-        }
-
-        return data_map
-    except Exception as err:
-        print(f"Diagnostics failure: {err}")
-        return None
+    # platform.uname() mirrors os.uname() and also works on Windows
+    details = platform.uname()
+    return {
+        "kernel_name": details.system,
+        "hostname": details.node,
+        "kernel_version": details.release,
+        "build_info": details.version,
+        "architecture": details.machine,
+    }
+
+
+def _count_open_fds():
+    for fd_folder in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(fd_folder))
+        except OSError:
+            continue
+    return None
+
+
+class HostSampler:
+    """Sample host and process resources on a background thread and keep a rolling window.
+
+    CPU, memory, load average, disk I/O rates, RSS and open file descriptors are read
+    in-process (psutil when installed, the standard library otherwise). `snapshot()`
+    returns a precomputed dict, cheap enough to be called before every task by pools
+    that size themselves.
+
+    Parameters
+    ----------
+    `interval` : Seconds between two samples
+    `window` : Number of samples kept for the rolling averages
+
+    Examples
+    --------
+    ```
+    sampler = HostSampler(interval=1, window=30).start()
+    sampler.snapshot()["cpu_percent"]
+    41.7
+    if sampler.is_under_pressure(memory_limit=85):
+        pool_size -= 1
+    sampler.stop()
+    ```
+    """
+
+    def __init__(self, interval=1.0, window=60):
+        self.interval = interval
+        self.history = deque(maxlen=window)
+        self._latest = {}
+        self._previous_io = None
+        self._stop = threading.Event()
+        self._thread = None
+        try:
+            import psutil
+
+            self._psutil = psutil
+            self._process = psutil.Process()
+            psutil.cpu_percent(interval=None)  # the first call only sets the reference point
+        except ImportError:
+            self._psutil = self._process = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self.sample()
+            self._thread = threading.Thread(target=self._run, name="quati-host-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """Take one reading now, add it to the window and refresh the snapshot."""
+        now = time()
+        reading = {"timestamp": now, "cpu_percent": None, "memory_percent": None, "memory_available_mb": None}
+        reading["load_1m"] = os.getloadavg()[0] if hasattr(os, "getloadavg") else None
+        reading["open_fds"] = _count_open_fds()
+        reading["disk_read_bytes_per_s"] = reading["disk_write_bytes_per_s"] = None
+        reading["process_rss_mb"] = None
+
+        if self._psutil is not None:
+            memory = self._psutil.virtual_memory()
+            reading["cpu_percent"] = self._psutil.cpu_percent(interval=None)
+            reading["memory_percent"] = memory.percent
+            reading["memory_available_mb"] = round(memory.available / 1048576, 1)
+            reading["process_rss_mb"] = round(self._process.memory_info().rss / 1048576, 1)
+            if reading["open_fds"] is None and hasattr(self._process, "num_handles"):
+                reading["open_fds"] = self._process.num_handles()
+
+            io_counters = self._psutil.disk_io_counters()  # None on some containers
+            if io_counters is not None:
+                if self._previous_io is not None:
+                    elapsed = max(now - self._previous_io[0], 1e-6)
+                    reading["disk_read_bytes_per_s"] = (io_counters.read_bytes - self._previous_io[1].read_bytes) / elapsed
+                    reading["disk_write_bytes_per_s"] = (io_counters.write_bytes - self._previous_io[1].write_bytes) / elapsed
+                self._previous_io = (now, io_counters)
+
+        self.history.append(reading)
+        self._latest = self._summarize()
+        return reading
+
+    def _summarize(self):
+        readings = list(self.history)
+        summary = dict(readings[-1], samples=len(readings), cpu_count=os.cpu_count())
+        # Rolling averages smooth CPU and disk spikes; memory and FDs are levels, the latest value is kept
+        for field in ("cpu_percent", "load_1m", "disk_read_bytes_per_s", "disk_write_bytes_per_s"):
+            values = [reading[field] for reading in readings if reading[field] is not None]
+            summary[field] = round(sum(values) / len(values), 2) if values else None
+        return summary
+
+    def snapshot(self):
+        """Latest reading with window averages for CPU, load and disk I/O (a reading is taken if none exists)."""
+        if not self._latest:
+            self.sample()
+        return self._latest
+
+    def is_under_pressure(self, cpu_limit=90.0, memory_limit=90.0):
+        """True when the averaged CPU or the current memory usage is above its limit (in percent)."""
+        snapshot = self.snapshot()
+        return any(
+            value is not None and value >= limit
+            for value, limit in ((snapshot["cpu_percent"], cpu_limit), (snapshot["memory_percent"], memory_limit))
+        )
+
+
+_shared_sampler = {}
+_shared_sampler_lock = threading.Lock()
+
+
+def get_host_sampler(interval=1.0, window=60):
+    """Return the process-wide `HostSampler`, started on first use.
+
+    Parameters
+    ----------
+    `interval` : Seconds between two samples (only used when the sampler is created)
+    `window` : Number of samples kept (only used when the sampler is created)
+    """
+    with _shared_sampler_lock:
+        if "sampler" not in _shared_sampler:
+            _shared_sampler["sampler"] = HostSampler(interval, window).start()
+        return _shared_sampler["sampler"]
@@ -0,0 +1,109 @@
+import json
+import time
+import types
+
+import pytest
+
+import quati.navigation.automation as automation
+from quati.navigation.automation import capture_json_responses, cleanup_downloads, launch_navigator
+
+
+def log_entry(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+class FakeNetworkDriver:
+    """Browser whose performance log, like Chrome's, hands out every entry only once."""
+
+    def __init__(self):
+        self.pending_log = []
+        self.bodies = {}
+        self.visited = []
+
+    def load(self, request_id, url, payload):
+        self.pending_log += [
+            log_entry("Network.responseReceived", requestId=request_id, response={"url": url, "status": 200}),
+            log_entry("Network.loadingFinished", requestId=request_id),
+        ]
+        self.bodies[request_id] = json.dumps(payload)
+
+    def get_log(self, log_type):
+        entries, self.pending_log = self.pending_log, []
+        return entries
+
+    def get(self, url):
+        self.visited.append(url)
+        self.load("page-2", "https://example.com/api/profile.json?id=2", {"id": 2})
+
+    def execute_cdp_cmd(self, command, params):
+        return {"body": self.bodies[params["requestId"]], "base64Encoded": False}
+
+
+def test_events_survive_between_calls_without_navigation():
+    driver = FakeNetworkDriver()
+    driver.load("page-1", "https://example.com/api/profile.json?id=1", {"id": 1})
+    driver.load("other", "https://example.com/api/profileXjson", {"id": 0})
+
+    first = capture_json_responses(driver, [r"/api/profile\.json"], timeout=0)
+    second = capture_json_responses(driver, [r"/api/profile\.json"], timeout=0)
+
+    assert [item["data"] for item in first] == [{"id": 1}]
+    assert second == first
+
+
+def test_navigation_discards_the_previous_page():
+    driver = FakeNetworkDriver()
+    driver.load("page-1", "https://example.com/api/profile.json?id=1", {"id": 1})
+    capture_json_responses(driver, [r"/api/profile\.json"], timeout=0)
+
+    captured = capture_json_responses(driver, [r"/api/profile\.json"], "https://example.com/2", timeout=0)
+
+    assert [item["data"] for item in captured] == [{"id": 2}]
+
+
+def test_each_poll_parses_only_the_new_entries(monkeypatch):
+    driver, parsed = FakeNetworkDriver(), []
+    for position in range(50):
+        driver.load(f"noise-{position}", f"https://example.com/static/{position}.js", None)
+    collect = automation._collect_network_events
+
+    def counting_collect(entries, patterns, responses):
+        parsed.append(len(entries))
+        collect(entries, patterns, responses)
+
+    def slow_page(seconds):
+        if len(parsed) == 3:
+            driver.load("late", "https://example.com/api/profile.json?id=9", {"id": 9})
+
+    monkeypatch.setattr(automation, "_collect_network_events", counting_collect)
+    monkeypatch.setattr(automation, "time", types.SimpleNamespace(monotonic=time.monotonic, sleep=slow_page))
+    captured = capture_json_responses(driver, [r"/api/profile\.json"], timeout=5)
+
+    assert [item["data"] for item in captured] == [{"id": 9}]
+    assert parsed == [100, 0, 0, 2]
+    assert len(driver.network_log) == 102
+
+
+def test_download_folder_is_removed_when_the_launch_fails(tmp_path, monkeypatch):
+    from selenium import webdriver
+
+    def broken_chrome(*args, **kwargs):
+        raise RuntimeError("chromedriver not found")
+
+    monkeypatch.setattr(webdriver, "Chrome", broken_chrome)
+
+    with pytest.raises(RuntimeError):
+        launch_navigator(isolate_downloads=True, download_root=str(tmp_path))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cleanup_downloads(tmp_path):
+    download_dir = tmp_path / "quati-downloads-x1"
+    download_dir.mkdir()
+    (download_dir / "report.csv").write_text("id\n1\n")
+    driver = types.SimpleNamespace(download_dir=str(download_dir))
+
+    assert cleanup_downloads(driver) is True
+    assert not download_dir.exists()
+    assert cleanup_downloads(driver) is False
@@ -0,0 +1,49 @@
+import types
+
+import pytest
+
+from quati.system.concurrency import AdaptiveLimiter, is_throttling_error
+
+
+def http_error(message, status):
+    error = Exception(message)
+    error.response = types.SimpleNamespace(status_code=status)
+    return error
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (Exception("APIError: [429]: Quota exceeded for quota metric 'Write requests'"), True),
+        (http_error("Too busy", 429), True),
+        (Exception("HTTP 503 Service Unavailable"), True),
+        (Exception("403 Forbidden: Exceeded rate limits: too many table update operations"), True),
+        (Exception("Message: tab crashed"), True),
+        (http_error("Invalid value at 'data.values[4291]'", 400), False),
+        (Exception("could not parse row 4291"), False),
+        (KeyError("quota_used"), False),
+        (Exception("invalid value 503 in column total"), False),
+    ],
+)
+def test_throttling_detection(error, expected):
+    assert is_throttling_error(error) is expected
+
+
+def test_map_retries_throttled_calls_only():
+    attempts = {}
+
+    def call(item):
+        attempts[item] = attempts.get(item, 0) + 1
+        if item == "throttled" and attempts[item] == 1:
+            raise Exception("APIError: [429]: Quota exceeded")
+        if item == "broken":
+            raise ValueError("bad payload")
+        return item
+
+    limiter = AdaptiveLimiter(initial=2)
+    assert limiter.map(call, ["ok", "throttled"], retries=2, retry_wait=0) == ["ok", "throttled"]
+    assert attempts == {"ok": 1, "throttled": 2}
+
+    with pytest.raises(ValueError):
+        limiter.map(call, ["broken"], retries=2, retry_wait=0)
+    assert attempts["broken"] == 1
@@ -0,0 +1,33 @@
+import importlib.util
+import os
+
+import pytest
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "import_time.py")
+spec = importlib.util.spec_from_file_location("import_time", SCRIPT_PATH)
+import_time = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(import_time)
+
+
+@pytest.mark.parametrize("module_name", import_time.MODULES)
+def test_heavy_dependencies_are_not_imported_eagerly(module_name):
+    # Fresh interpreter per module, as in benchmarks/import_time.py; the time budget is left to the script
+    _, loaded = import_time.measure_import(module_name)
+
+    assert module_name in loaded
+    leaked = [
+        name for name in loaded for dependency in import_time.HEAVY_DEPENDENCIES if name == dependency or name.startswith(f"{dependency}.")
+    ]
+    assert leaked == []
+
+
+def test_every_quati_module_is_checked():
+    package_path = os.path.join(os.path.dirname(SCRIPT_PATH), "..", "quati")
+    modules = {
+        os.path.relpath(os.path.join(folder, name), os.path.join(package_path, ".."))[: -len(".py")].replace(os.sep, ".")
+        for folder, _, names in os.walk(package_path)
+        for name in names
+        if name.endswith(".py") and name != "__init__.py"
+    }
+
+    assert modules <= set(import_time.MODULES)
@@ -0,0 +1,117 @@
+import sys
+import threading
+import time
+
+import pytest
+
+import quati.logger.instrumentation as instrumentation
+from quati.logger import ETL_FAILURE, ETL_SUCCESS, PIPE_LOAD, PIPE_TRANSFORM
+from quati.logger.instrumentation import RunMetrics, timed_stage, track_stage
+
+
+def test_track_stage_records_counters_and_failures():
+    recorder = RunMetrics()
+
+    with track_stage(PIPE_LOAD, "upload", recorder) as metrics:
+        metrics.rows_in, metrics.bytes_transferred = 10, 2048
+    with pytest.raises(KeyError), track_stage(PIPE_LOAD, "upload", recorder) as metrics:
+        metrics.rows_in = 5
+        raise KeyError("sheet")
+
+    first, second = recorder.stages
+    assert (first.stage, first.status, second.status) == ("LOAD", ETL_SUCCESS, ETL_FAILURE)
+    assert first.wall_seconds >= 0 and first.process_peak_rss_mb > 0
+    assert first.as_dict()["bytes_transferred"] == 2048
+    totals = recorder.totals()[("LOAD", "upload")]
+    assert (totals["calls"], totals["failures"], totals["rows_in"], totals["bytes_transferred"]) == (2, 1, 15, 2048)
+
+
+def test_cpu_time_belongs_to_the_stage_thread():
+    recorder, stop = RunMetrics(), threading.Event()
+
+    def burn():
+        while not stop.is_set():
+            sum(range(1000))
+
+    busy = threading.Thread(target=burn)
+    busy.start()
+    try:
+        with track_stage(PIPE_TRANSFORM, "waiting", recorder) as waiting:
+            time.sleep(0.3)
+        with track_stage(PIPE_TRANSFORM, "working", recorder) as working:
+            deadline = time.thread_time() + 0.2
+            while time.thread_time() < deadline:
+                sum(range(1000))
+    finally:
+        stop.set()
+        busy.join()
+
+    # The busy thread ran during "waiting", which must not be charged for it
+    assert waiting.cpu_seconds < 0.1
+    assert working.cpu_seconds >= 0.2
+
+
+def test_timed_stage_counts_returned_rows():
+    recorder = RunMetrics()
+
+    @timed_stage(PIPE_TRANSFORM, recorder=recorder)
+    def clean(values):
+        return [value for value in values if value]
+
+    @timed_stage(PIPE_TRANSFORM, "count", recorder=recorder)
+    def count(values):
+        return len(values)
+
+    assert clean([1, 0, 2]) == [1, 2]
+    assert count([1, 0, 2]) == 3
+    assert recorder.totals()[("TRANSFORM", "clean")]["rows_out"] == 2
+    assert recorder.totals()[("TRANSFORM", "count")]["rows_out"] == 0
+
+
+def test_history_is_bounded_but_totals_are_not():
+    recorder = RunMetrics(max_stages=2)
+    for rows in range(5):
+        with track_stage(PIPE_LOAD, "upload", recorder) as metrics:
+            metrics.rows_out = rows
+
+    assert [stage.rows_out for stage in recorder.stages] == [3, 4]
+    assert recorder.totals()[("LOAD", "upload")]["calls"] == 5
+    assert recorder.totals()[("LOAD", "upload")]["rows_out"] == 10
+
+    recorder.reset()
+    assert not recorder.stages and recorder.totals() == {}
+
+
+def test_summary_table_and_prometheus_export(tmp_path):
+    recorder = RunMetrics()
+    with track_stage(PIPE_LOAD, "upload", recorder) as metrics:
+        metrics.rows_in = 7
+
+    header, row = recorder.summary_table().splitlines()
+    assert header.split()[:4] == ["stage", "name", "calls", "failures"]
+    assert row.split()[:4] == ["LOAD", "upload", "1", "0"]
+
+    path = tmp_path / "quati.prom"
+    recorder.export_prometheus(str(path))
+    lines = path.read_text().splitlines()
+    assert "# TYPE quati_stage_calls_total counter" in lines
+    assert 'quati_stage_rows_in_total{stage="LOAD",name="upload"} 7' in lines
+    assert not (tmp_path / "quati.prom.tmp").exists()
+
+
+def test_memory_readings_without_psutil_or_proc(monkeypatch):
+    instrumentation._psutil_process.cache_clear()
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    try:
+        assert instrumentation._psutil_process() is None
+        assert instrumentation._current_rss_mb() > 0  # read from /proc/self/statm
+
+        monkeypatch.setattr(instrumentation, "open", lambda *args, **kwargs: (_ for _ in ()).throw(OSError()), raising=False)
+        monkeypatch.setattr(instrumentation, "resource", None)
+        recorder = RunMetrics()
+        with track_stage(PIPE_LOAD, "upload", recorder) as metrics:
+            pass
+        assert (metrics.rss_delta_mb, metrics.process_peak_rss_mb) == (None, None)
+        assert recorder.totals()[("LOAD", "upload")]["rss_delta_mb"] == 0
+    finally:
+        instrumentation._psutil_process.cache_clear()
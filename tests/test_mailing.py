@@ -0,0 +1,235 @@
+import email
+import gzip
+import io
+import smtplib
+import socketserver
+import threading
+import time
+import zipfile
+
+import pytest
+
+import quati.msger.mailing as mailing
+from quati.msger.mailing import Dispatcher
+
+
+class SMTPStubHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server: refuses recipients containing "refused", keeps every complete message."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.reply("220 stub ready")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 stub")
+            elif verb == "MAIL":
+                sender, recipients = command, []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                if "refused" in command:
+                    self.reply("550 No such user")
+                else:
+                    recipients.append(command)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 Go ahead")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line:
+                        # Connection dropped mid-DATA: the message is discarded
+                        self.server.aborted.append(b"".join(lines))
+                        return
+                    if data_line == b".\r\n":
+                        break
+                    lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                self.server.messages.append((sender, list(recipients), b"".join(lines)))
+                self.reply("250 Queued")
+            elif verb == "RSET":
+                sender, recipients = None, []
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def smtp_stub(monkeypatch):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPStubHandler)
+    server.daemon_threads = True
+    server.messages, server.aborted = [], []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Plain SMTP on the stub: no STARTTLS or login, everything else is the real client
+    monkeypatch.setattr(Dispatcher, "_connect", lambda self: smtplib.SMTP(*server.server_address, timeout=5))
+    monkeypatch.setitem(mailing._LOGO_CACHE, "logo", None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_bulk_delivery_over_a_real_smtp_session(smtp_stub, tmp_path, monkeypatch):
+    attachment = tmp_path / "report.csv"
+    attachment.write_text("id,value\n" + "1,2\n" * 1000)
+    vanishing = tmp_path / "vanishing.csv"
+    vanishing.write_text("x" * 100)
+
+    stream_file = mailing._iter_file_bytes
+
+    def vanish_mid_stream(path, compression=None):
+        if path == str(vanishing):
+            yield b"partial content"
+            raise FileNotFoundError(path)
+        yield from stream_file(path, compression)
+
+    monkeypatch.setattr(mailing, "_iter_file_bytes", vanish_mid_stream)
+
+    notifier = Dispatcher("bot@quati.dev", "key", [])
+    results = notifier.push_emsg_bulk(
+        [
+            (["sales@quati.dev"], {"message": "first", "files": [str(attachment)]}),
+            (["ops@quati.dev"], {"message": "second", "files": [str(vanishing)]}),
+            (["refused@quati.dev"], {"message": "third"}),
+            (["team@quati.dev", "refused@quati.dev"], {"message": "fourth"}),
+            (["last@quati.dev"], {"message": "fifth", "files": [str(tmp_path / "missing.csv")]}),
+            (["last@quati.dev"], {"message": "sixth"}),
+        ],
+        max_connections=1,
+        title="Report",
+        type="note",
+    )
+
+    assert [(entry["recipient"], entry["status"]) for entry in results] == [
+        ("sales@quati.dev", "sent"),
+        ("ops@quati.dev", "failed"),
+        ("refused@quati.dev", "refused"),
+        ("team@quati.dev", "sent"),
+        ("refused@quati.dev", "refused"),
+        ("last@quati.dev", "failed"),
+        ("last@quati.dev", "sent"),
+    ]
+
+    # The message interrupted mid-DATA never reaches the server, and the next ones are intact
+    delivered = [email.message_from_bytes(body) for _, _, body in smtp_stub.messages]
+    assert [message["To"] for message in delivered] == ["sales@quati.dev", "team@quati.dev, refused@quati.dev", "last@quati.dev"]
+    attachment_part = [part for part in delivered[0].walk() if part.get_filename() == "report.csv"][0]
+    assert attachment_part.get_payload(decode=True) == attachment.read_bytes()
+
+
+def vanishing_attachment(monkeypatch, tmp_path):
+    vanishing = tmp_path / "vanishing.csv"
+    vanishing.write_text("x" * 100)
+    stream_file = mailing._iter_file_bytes
+
+    def vanish_mid_stream(path, compression=None):
+        if path == str(vanishing):
+            yield b"partial content"
+            raise FileNotFoundError(path)
+        yield from stream_file(path, compression)
+
+    monkeypatch.setattr(mailing, "_iter_file_bytes", vanish_mid_stream)
+    return vanishing
+
+
+def test_push_emsg_drops_the_connection_when_an_attachment_fails_mid_stream(smtp_stub, tmp_path, monkeypatch):
+    vanishing = vanishing_attachment(monkeypatch, tmp_path)
+    notifier = Dispatcher("bot@quati.dev", "key", ["ops@quati.dev"])
+
+    started = time.perf_counter()
+    with pytest.raises(FileNotFoundError):
+        notifier.push_emsg(message="report", files=[str(vanishing)])
+
+    # No QUIT written into the open DATA phase, so nothing waits for a reply that never comes
+    assert time.perf_counter() - started < 2
+    for _ in range(50):
+        if smtp_stub.aborted:
+            break
+        time.sleep(0.02)
+    assert len(smtp_stub.aborted) == 1 and b"QUIT" not in smtp_stub.aborted[0]
+    assert smtp_stub.messages == []
+
+
+def test_push_emsg_delivers_and_reports_refusals(smtp_stub, tmp_path):
+    attachment = tmp_path / "report.csv"
+    attachment.write_text("id,value\n" + "1,2\n" * 1000)
+    notifier = Dispatcher("bot@quati.dev", "key", ["ops@quati.dev"])
+
+    notifier.push_emsg(title="Report", message="daily", files=[str(attachment)], type="note")
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        notifier.push_emsg(message="nobody", recipients=["refused@quati.dev"])
+    with pytest.raises(ValueError, match="not supported"):
+        notifier.push_emsg(compression="rar")
+
+    (sender, recipients, body), = smtp_stub.messages
+    delivered = email.message_from_bytes(body)
+    assert delivered["To"] == "ops@quati.dev"
+    assert [part for part in delivered.walk() if part.get_filename() == "report.csv"][0].get_payload(decode=True) == attachment.read_bytes()
+
+
+class RecordingSMTP:
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.address, self.timeout, self.closed = (host, port), timeout, False
+        RecordingSMTP.instances.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        if password == "wrong":
+            raise smtplib.SMTPAuthenticationError(535, b"bad credentials")
+
+    def close(self):
+        self.closed = True
+
+
+def test_connections_have_a_timeout_and_are_closed_on_login_failure(monkeypatch):
+    monkeypatch.setattr(smtplib, "SMTP", RecordingSMTP)
+
+    server = Dispatcher("bot@quati.dev", "key", [])._connect()
+    with pytest.raises(smtplib.SMTPAuthenticationError):
+        Dispatcher("bot@quati.dev", "wrong", [])._connect()
+
+    assert server.address == (mailing.MAIL_SERVER, mailing.MAIL_PORT)
+    assert server.timeout == mailing.MAIL_TIMEOUT and not server.closed
+    assert RecordingSMTP.instances[-1].closed
+
+
+@pytest.mark.parametrize("compression, suffix", [(None, ""), ("gzip", ".gz"), ("zip", ".zip")])
+def test_streamed_message_parses_back(tmp_path, compression, suffix):
+    small, large = tmp_path / "small.txt", tmp_path / "large.csv"
+    small.write_text(".starts with a dot\n" * 10)
+    large.write_bytes(bytes(range(256)) * 4000)
+    inline = email.message_from_string("Content-Type: text/html\n\n<p>hi</p>\n.\n")
+
+    chunks = list(
+        mailing._iter_message_bytes({"Subject": "Report", "To": "ops@quati.dev"}, [inline], [str(small), str(large)], compression, 10000)
+    )
+    data = b"".join(chunks)
+
+    assert all(len(line) <= 998 for line in data.split(b"\r\n"))
+    assert b"\r\n.\r\n" not in data  # a lone dot would end the DATA phase
+    message = email.message_from_bytes(data.replace(b"\r\n..", b"\r\n."))
+    parts = {part.get_filename(): part.get_payload(decode=True) for part in message.walk() if part.get_filename()}
+    assert parts["small.txt"] == small.read_bytes()  # below the threshold: never compressed
+    payload = parts[f"large.csv{suffix}"]
+    if compression == "gzip":
+        payload = gzip.decompress(payload)
+    elif compression == "zip":
+        payload = zipfile.ZipFile(io.BytesIO(payload)).read("large.csv")
+    assert payload == large.read_bytes()
+
+
+def test_missing_attachments_fail_before_streaming(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        mailing._iter_message_bytes({"Subject": "x"}, [], [str(tmp_path / "missing.csv")])
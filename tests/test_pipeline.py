@@ -0,0 +1,156 @@
+import io
+import json
+import logging
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import quati.logger.pipeline as pipeline
+from quati.logger import LOG_DEBUG, LOG_ERROR, PIPE_LOAD, STATUS_GSHEET_UPDATE_SHEET
+from quati.logger.pipeline import (
+    EVENT_CODES,
+    EVENT_INDEX,
+    configure_pipeline_logging,
+    decode_binary_records,
+    dropped_record_count,
+    get_logger,
+    shutdown_pipeline_logging,
+)
+
+
+@pytest.fixture(autouse=True)
+def unconfigured_logging():
+    shutdown_pipeline_logging()
+    root = logging.getLogger("quati")
+    root.setLevel(logging.NOTSET)
+    yield root
+    shutdown_pipeline_logging()
+    root.setLevel(logging.NOTSET)
+    root.propagate = True
+
+
+def test_json_lines_carry_event_stage_and_fields():
+    stream = io.StringIO()
+    configure_pipeline_logging("json", stream)
+
+    get_logger("jobs.daily").info(STATUS_GSHEET_UPDATE_SHEET, "%d rows", 3, stage=PIPE_LOAD, sheet="Daily")
+    get_logger("jobs.daily").debug(STATUS_GSHEET_UPDATE_SHEET, "filtered out")
+    shutdown_pipeline_logging()
+
+    (entry,) = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert entry["event"] == "STATUS_GSHEET_UPDATE_SHEET"
+    assert entry["text"] == STATUS_GSHEET_UPDATE_SHEET
+    assert (entry["level"], entry["stage"], entry["msg"], entry["sheet"]) == ("INFO", "LOAD", "3 rows", "Daily")
+
+
+def test_console_output_and_unknown_events():
+    stream = io.StringIO()
+    configure_pipeline_logging("console", stream, level=LOG_ERROR)
+
+    get_logger().error("custom failure", "%s", "boom", table="t1")
+    shutdown_pipeline_logging()
+
+    assert stream.getvalue() == "ERROR | custom failure - boom - table=t1\n"
+
+
+def test_binary_records_round_trip_with_stable_codes(tmp_path):
+    path = tmp_path / "run.bin"
+    configure_pipeline_logging("binary", str(path))
+
+    get_logger().info(STATUS_GSHEET_UPDATE_SHEET, "%d rows", 3, stage=PIPE_LOAD)
+    get_logger().info("not a constant")
+    shutdown_pipeline_logging()
+
+    first, second = decode_binary_records(path.read_bytes())
+    assert (first["event"], first["level"], first["msg"], first["stage"]) == ("STATUS_GSHEET_UPDATE_SHEET", "INFO", "3 rows", "LOAD")
+    assert second["event"] is None
+    # Codes are written to files: they must not move when constants are added
+    assert EVENT_INDEX["STATUS_GSHEET_UPDATE_SHEET"] == 40
+    assert EVENT_INDEX["ERROR_API_AUTH_FAILED"] == 1
+
+
+def test_file_destinations_skip_unformattable_records(tmp_path, capsys):
+    configure_pipeline_logging("json", str(tmp_path / "run.jsonl"))
+    get_logger().info(STATUS_GSHEET_UPDATE_SHEET, "%d rows", 3)
+    shutdown_pipeline_logging()
+
+    configure_pipeline_logging("binary", str(tmp_path / "run.bin"))
+    get_logger().info(STATUS_GSHEET_UPDATE_SHEET, "%d rows", "three")
+    get_logger().info(STATUS_GSHEET_UPDATE_SHEET, "%d rows", 3)
+    shutdown_pipeline_logging()
+
+    assert json.loads((tmp_path / "run.jsonl").read_text())["msg"] == "3 rows"
+    assert [entry["msg"] for entry in decode_binary_records((tmp_path / "run.bin").read_bytes())] == ["3 rows"]
+    assert "TypeError" in capsys.readouterr().err
+
+
+def test_every_event_has_its_own_code():
+    assert set(EVENT_CODES.values()) <= set(EVENT_INDEX)
+    assert len(set(EVENT_INDEX.values())) == len(EVENT_INDEX)
+    assert 0 not in EVENT_INDEX.values()
+
+
+def test_sampling_and_muted_levels():
+    stream = io.StringIO()
+    configure_pipeline_logging("json", stream, level=LOG_DEBUG, sampling={LOG_DEBUG: 0.25, LOG_ERROR: 0})
+
+    log = get_logger()
+    for position in range(8):
+        log.debug(STATUS_GSHEET_UPDATE_SHEET, "%d", position)
+    log.error(STATUS_GSHEET_UPDATE_SHEET, "muted")
+    shutdown_pipeline_logging()
+
+    assert [json.loads(line)["msg"] for line in stream.getvalue().splitlines()] == ["0", "4"]
+
+
+def test_invalid_outputs():
+    with pytest.raises(ValueError, match="file path"):
+        configure_pipeline_logging("binary")
+    with pytest.raises(ValueError, match="not supported"):
+        configure_pipeline_logging("xml")
+
+
+def test_full_queue_drops_records_and_counts_them():
+    release = threading.Event()
+
+    class SlowStream(io.StringIO):
+        def write(self, text):
+            release.wait(5)
+            return super().write(text)
+
+    configure_pipeline_logging("json", SlowStream(), queue_size=1)
+    for position in range(20):
+        get_logger().info(STATUS_GSHEET_UPDATE_SHEET, "%d", position)
+
+    assert dropped_record_count() >= 18
+    release.set()
+    shutdown_pipeline_logging()
+    assert dropped_record_count() == 0
+
+
+def test_first_record_starts_console_logging_at_info(capsys, unconfigured_logging):
+    get_logger().debug(STATUS_GSHEET_UPDATE_SHEET, "hidden")
+    assert pipeline._state["listener"] is not None
+    get_logger().info(STATUS_GSHEET_UPDATE_SHEET, "shown")
+    shutdown_pipeline_logging()
+
+    assert capsys.readouterr().out == f"INFO  | {STATUS_GSHEET_UPDATE_SHEET} - shown\n"
+
+
+def test_implicit_start_keeps_the_application_level(capsys, unconfigured_logging):
+    unconfigured_logging.setLevel(logging.ERROR)
+
+    get_logger().info(STATUS_GSHEET_UPDATE_SHEET, "hidden")
+    get_logger().error(STATUS_GSHEET_UPDATE_SHEET, "shown")
+    shutdown_pipeline_logging()
+
+    assert unconfigured_logging.level == logging.ERROR
+    assert capsys.readouterr().out == f"ERROR | {STATUS_GSHEET_UPDATE_SHEET} - shown\n"
+
+
+def test_importing_does_not_touch_logging_levels():
+    code = "import logging, quati.logger.pipeline; print(logging.getLogger('quati').level)"
+
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout == "0\n"
@@ -0,0 +1,82 @@
+import datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from quati.data.processing import (
+    convert_magnitude_series,
+    convert_magnitude_string,
+    parse_timestamp_series,
+    transform_in_parallel,
+)
+
+
+def test_series_and_scalar_magnitudes_agree():
+    values = ["1.5", "1.9K", "550.1K", "10.3M", "-2.7", "2B"]
+
+    assert convert_magnitude_series(values).tolist() == [convert_magnitude_string(value) for value in values]
+
+
+def test_parallel_transform_matches_the_serial_one():
+    source_df = pd.DataFrame(
+        {"followers": ["1K", "550.1K", "10.3M", "", "987"] * 40, "created_at": ["2024-01-01 10:00:00"] * 200},
+        index=range(100, 300),
+    )
+    steps = [("followers", convert_magnitude_series), ("created_at", parse_timestamp_series)]
+
+    serial_df = transform_in_parallel(source_df, steps, max_workers=1)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        parallel_df = transform_in_parallel(source_df, steps, max_workers=2, chunk_rows=30, executor=pool)
+
+    pd.testing.assert_frame_equal(parallel_df, serial_df)
+    assert list(parallel_df.index) == list(range(100, 300))
+
+
+def test_executor_needs_max_workers():
+    with ProcessPoolExecutor(max_workers=1) as pool, pytest.raises(ValueError, match="max_workers"):
+        transform_in_parallel(pd.DataFrame({"a": [1]}), [], executor=pool)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("2024-01-31 10:00:00", "2024-01-31 10:00:00"),
+        ("2024-01-31T10:00:00.250", "2024-01-31 10:00:00.250"),
+        ("2024-01-31 10:00:00+02:00", "2024-01-31 08:00:00"),
+        ("2024-01-31T10:00:00Z", "2024-01-31 10:00:00"),
+        ("2024-01-31 10:00:00 UTC", "2024-01-31 10:00:00"),
+        ("31/01/2024", "2024-01-31 00:00:00"),
+        ("2024-01-31 10:00:00:5", "2024-01-31 10:00:00.500"),
+    ],
+)
+def test_timestamp_layouts_end_up_as_naive_utc(text, expected):
+    assert parse_timestamp_series([text]).tolist() == [pd.Timestamp(expected)]
+
+
+def test_timestamp_failures_stragglers_and_index():
+    stragglers = [" 2024-01-02 11:00:00", "2024-01-03T12:00:00+01:00", "", None, "soon"]
+    source = pd.Series(["2024-01-01 10:00:00"] * 6 + stragglers, index=range(10, 21))
+
+    parsed, failures = parse_timestamp_series(source, return_failures=True)
+
+    assert failures == 1
+    assert list(parsed.index) == list(range(10, 21))
+    assert parsed.iloc[6:8].tolist() == [pd.Timestamp("2024-01-02 11:00:00"), pd.Timestamp("2024-01-03 11:00:00")]
+    assert parsed.iloc[8:].isna().all()
+
+
+@pytest.mark.parametrize("values", [[f"2024-01-{day:02d} 10:00:00" for day in range(1, 29)], ["2024-01-01 10:00:00"] * 28])
+def test_timestamp_utc_option_with_and_without_deduplication(values):
+    parsed = parse_timestamp_series(values + ["nope"], utc=True)
+
+    assert str(parsed.dt.tz) == "UTC"
+    assert parsed.iloc[0] == pd.Timestamp("2024-01-01 10:00:00", tz="UTC") and pd.isna(parsed.iloc[-1])
+
+
+def test_timestamp_inputs_that_need_no_parsing():
+    already_parsed = pd.Series(pd.to_datetime(["2024-01-01"]))
+
+    assert parse_timestamp_series(already_parsed, return_failures=True)[0] is already_parsed
+    assert parse_timestamp_series([dt.datetime(2024, 1, 1, 10)]).tolist() == [pd.Timestamp("2024-01-01 10:00:00")]
+    assert parse_timestamp_series(["", None], return_failures=True)[1] == 0
@@ -0,0 +1,245 @@
+import threading
+import types
+
+import gspread
+import pandas as pd
+import pytest
+from fakes import FakeSpreadsheet, FakeWorksheet
+
+from quati.gooogle.spreadsheets import (
+    SheetReadCache,
+    build_dataframe_from_values,
+    fetch_records_with_resilience,
+    fetch_sheet_revision,
+    iter_sheet_payloads,
+    remove_gsheet_duplicates,
+    safe_worksheet_update,
+    upload_df_in_chunks,
+)
+from quati.system.concurrency import AdaptiveLimiter
+
+
+def test_grouped_thousands_are_parsed():
+    result_df = build_dataframe_from_values([["amount"], ["1,234"], ["-12,345.5"], ["7"], [""]])
+
+    assert str(result_df["amount"].dtype) == "Float64"
+    assert result_df["amount"].tolist()[:3] == [1234.0, -12345.5, 7.0]
+    assert result_df["amount"].isna().tolist() == [False, False, False, True]
+
+
+def test_commas_that_are_not_thousands_keep_the_column_as_text():
+    result_df = build_dataframe_from_values([["value"], ["3,5"], ["1,2,3"], ["1,234"]], category_ratio=0)
+
+    assert result_df["value"].tolist() == ["3,5", "1,2,3", "1,234"]
+    assert not pd.api.types.is_numeric_dtype(result_df["value"])
+
+
+def test_decimal_comma_with_dot_thousands():
+    result_df = build_dataframe_from_values([["price"], ["1.234,56"], ["3,5"], ["12"]], decimal=",", thousands=".")
+
+    assert result_df["price"].tolist() == [1234.56, 3.5, 12.0]
+
+
+def test_short_rows_zero_padding_and_categories():
+    matrix = [
+        ["id", "code", "city", "note", "extra"],
+        ["1", "007", "Rio"],
+        ["2", "012", "Rio", "x"],
+        ["3", "100", "SP", "", "", "ignored"],
+        ["4", "200", "SP"],
+    ]
+
+    result_df = build_dataframe_from_values(matrix)
+
+    assert list(result_df.columns) == ["id", "code", "city", "note", "extra"]
+    assert str(result_df["id"].dtype) == "Int64"
+    assert result_df["code"].tolist() == ["007", "012", "100", "200"]
+    assert str(result_df["city"].dtype) == "category"
+    assert result_df["note"].tolist() == ["", "x", "", ""]
+    assert result_df["extra"].tolist() == ["", "", "", ""]
+
+
+def test_numbers_python_accepts_but_sheets_do_not_stay_text():
+    matrix = [["a", "b", "c"], ["1_000", "\uff11\uff12", " 12 "], ["2", "3", "1e3"]]
+
+    result_df = build_dataframe_from_values(matrix, category_ratio=0)
+
+    assert result_df["a"].tolist() == ["1_000", "2"]
+    assert result_df["b"].tolist() == ["\uff11\uff12", "3"]
+    assert result_df["c"].tolist() == [12, 1000]
+
+
+def test_headerless_matrix_and_memory_report():
+    result_df, report = build_dataframe_from_values([["a", "1"], ["a", "2"], ["a"]], use_header=False, report_memory=True)
+
+    assert list(result_df.columns) == [0, 1]
+    assert result_df[1].tolist()[:2] == [1, 2]
+    assert report["object_frame_bytes"] == 6 * (8 + 49) + 5
+    assert report["saved_bytes"] == report["object_frame_bytes"] - report["optimized_frame_bytes"]
+    assert build_dataframe_from_values([]).empty
+
+
+class RecordingWorksheet:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, target_cell, values, value_input_option="RAW"):
+        self.updates.append((target_cell, len(values)))
+
+
+def test_payloads_start_at_the_first_cell_of_a_range():
+    source_df = pd.DataFrame({"a": range(3), "b": list("xyz")})
+
+    assert [cell for cell, _ in iter_sheet_payloads(source_df, "B12:C20")] == ["B12"]
+    assert [cell for cell, _ in iter_sheet_payloads(source_df, "'Daily stats'!$b$5")] == ["B5"]
+
+
+def test_range_anchor_in_safe_worksheet_update():
+    worksheet = RecordingWorksheet()
+
+    safe_worksheet_update(worksheet, "A12:C20", pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}), wait=0)
+
+    assert worksheet.updates == [("A12", 2)]
+
+
+def test_invalid_anchor_is_a_value_error():
+    with pytest.raises(ValueError, match="anchor cell"):
+        list(iter_sheet_payloads(pd.DataFrame({"a": [1]}), "row 5"))
+
+
+class FakeQuotaError(Exception):
+    """What gspread raises when the write quota is exhausted."""
+
+    def __init__(self):
+        super().__init__("APIError: [429]: Quota exceeded for quota metric 'Write requests'")
+        self.response = type("Response", (), {"status_code": 429})()
+
+
+class ThrottledWorksheet(RecordingWorksheet):
+    """Answers the first `throttled_calls` updates with a 429, then accepts them."""
+
+    def __init__(self, throttled_calls):
+        super().__init__()
+        self.throttled_calls = throttled_calls
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def update(self, target_cell, values, value_input_option="RAW"):
+        with self.lock:
+            self.calls += 1
+            if self.calls <= self.throttled_calls:
+                raise FakeQuotaError()
+        super().update(target_cell, values, value_input_option)
+
+
+def test_throttled_payloads_are_resent_with_a_lower_limit():
+    source_df = pd.DataFrame({"a": range(200), "b": ["x" * 50] * 200})
+    worksheet = ThrottledWorksheet(throttled_calls=3)
+    limiter = AdaptiveLimiter(initial=4, maximum=4)
+
+    sent = upload_df_in_chunks(worksheet, source_df, "A2", max_payload_bytes=2000, limiter=limiter, throttle_wait=0)
+
+    assert sent == len(worksheet.updates) > 3
+    assert sorted(int(cell[1:]) for cell, _ in worksheet.updates)[0] == 2
+    assert sum(rows for _, rows in worksheet.updates) == 200
+    assert any(reason == "throttled" for _, _, reason in limiter.history)
+
+
+def test_throttling_gives_up_after_the_retries():
+    worksheet = ThrottledWorksheet(throttled_calls=100)
+
+    with pytest.raises(FakeQuotaError):
+        upload_df_in_chunks(worksheet, pd.DataFrame({"a": [1]}), "A2", limiter=AdaptiveLimiter(), throttle_retries=2, throttle_wait=0)
+
+    assert worksheet.calls == 3
+
+
+
+def test_duplicates_are_matched_as_text_and_keep_their_values(monkeypatch):
+    # get_all_records numericises cells, so the same id may come back as 1 and "1"
+    worksheet = FakeWorksheet([["id", "name"], [1, "a"], ["1", "a"], [2.5, "b"], ["2.5", "c"]])
+    book = types.SimpleNamespace(worksheet=lambda title: worksheet)
+    monkeypatch.setattr(gspread, "authorize", lambda credentials: types.SimpleNamespace(open=lambda title: book))
+
+    last_df = remove_gsheet_duplicates("credentials", "id", "book", "tab", keep_strategy="last")
+    first_df = remove_gsheet_duplicates("credentials", ["id", "name"], "book", "tab")
+
+    assert last_df.to_dict("records") == [{"id": "1", "name": "a"}, {"id": "2.5", "name": "c"}]
+    assert first_df["id"].tolist() == [1, 2.5, "2.5"]
+    assert worksheet.updates[:2] == [(("A1:ZZ",), 0), ("A1", 2)]
+
+
+class CountingWorksheet(FakeWorksheet):
+    def __init__(self, values, spreadsheet=None):
+        super().__init__(values, spreadsheet)
+        self.downloads = 0
+
+    def get_all_values(self):
+        self.downloads += 1
+        return self.values
+
+
+def test_sheet_revision_is_read_from_drive_metadata():
+    spreadsheet = FakeSpreadsheet(revision="42")
+
+    assert fetch_sheet_revision(FakeWorksheet([], spreadsheet)) == "42:2024-01-01T00:00:00.000Z"
+
+    spreadsheet.request = lambda *args, **kwargs: (_ for _ in ()).throw(RuntimeError("insufficient scopes"))
+    assert fetch_sheet_revision(FakeWorksheet([], spreadsheet)) is None
+
+
+def test_cached_reads_until_the_revision_changes():
+    worksheet, cache = CountingWorksheet([["id"], ["1"], ["2"]]), SheetReadCache()
+
+    first = fetch_records_with_resilience(worksheet, cache=cache)
+    first.loc[0, "id"] = "changed"
+    second = fetch_records_with_resilience(worksheet, cache=cache)
+    raw = fetch_records_with_resilience(worksheet, use_header=False, cache=cache)
+    worksheet.spreadsheet.revision = "2"
+    third = fetch_records_with_resilience(worksheet, cache=cache)
+
+    assert second["id"].tolist() == ["1", "2"]  # callers get copies
+    assert len(raw.index) == 3 and third["id"].tolist() == ["1", "2"]
+    assert (worksheet.downloads, cache.hits, cache.misses) == (3, 1, 3)
+
+
+def test_unknown_revisions_are_never_cached():
+    worksheet, cache = CountingWorksheet([["id"], ["1"]]), SheetReadCache()
+    worksheet.spreadsheet.request = lambda *args, **kwargs: (_ for _ in ()).throw(RuntimeError("offline"))
+
+    for _ in range(2):
+        fetch_records_with_resilience(worksheet, cache=cache)
+
+    assert (worksheet.downloads, cache.hits, cache.misses) == (2, 0, 2)
+
+
+def test_disk_entries_are_shared_and_cleared(tmp_path):
+    worksheet = CountingWorksheet([["id"], ["1"]])
+    SheetReadCache(str(tmp_path)).get_or_load(worksheet, lambda: pd.DataFrame({"id": ["1"]}))
+
+    other_process = SheetReadCache(str(tmp_path))
+    assert other_process.get_or_load(worksheet, pytest.fail)["id"].tolist() == ["1"]
+
+    (entry,) = tmp_path.glob("*.pickle")
+    entry.write_bytes(b"half-written")
+    assert SheetReadCache(str(tmp_path)).get_or_load(worksheet, lambda: pd.DataFrame({"id": ["2"]}))["id"].tolist() == ["2"]
+
+    other_process.clear()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cache_counters_are_exact_under_concurrency():
+    worksheet, cache = FakeWorksheet([["id"], ["1"]]), SheetReadCache()
+    cache.get_or_load(worksheet, lambda: pd.DataFrame({"id": ["1"]}))
+
+    def read():
+        for _ in range(200):
+            cache.get_or_load(worksheet, pytest.fail)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert (cache.hits, cache.misses) == (1600, 1)
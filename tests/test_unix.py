@@ -0,0 +1,253 @@
+import os
+import sys
+import threading
+import types
+
+import pytest
+
+import quati.system.unix as unix
+from quati.system.unix import (
+    HostSampler,
+    _InotifyWatcher,
+    _PrefixIndex,
+    bulk_erase_files,
+    bulk_modify_file_names,
+    fetch_host_details,
+    get_host_sampler,
+    locate_and_verify_file,
+    wait_for_files,
+)
+
+
+def write_later(path, content, delay=0.2, rename_from=None):
+    def write():
+        if rename_from is not None:
+            os.rename(rename_from, path)
+        else:
+            with open(path, "w") as handle:
+                handle.write(content)
+
+    timer = threading.Timer(delay, write)
+    timer.start()
+    return timer
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def watch_mode(request, monkeypatch):
+    if request.param == "polling":
+        monkeypatch.setattr(unix.platform, "system", lambda: "Windows")
+    return request.param
+
+
+def test_wait_returns_files_written_while_waiting(tmp_path, watch_mode):
+    write_later(tmp_path / "sales_2024.csv", "id\n1\n").join()
+    timer = write_later(tmp_path / "stock_2024.csv", "id\n2\n")
+
+    found = wait_for_files(str(tmp_path), ["sales_", "stock_"], max_wait=5, stable_for=0.1, poll_interval=0.05)
+    timer.join()
+
+    assert found == {"sales_": str(tmp_path / "sales_2024.csv"), "stock_": str(tmp_path / "stock_2024.csv")}
+
+
+def test_partial_downloads_count_once_renamed(tmp_path, watch_mode):
+    partial = tmp_path / "report.csv.crdownload"
+    partial.write_text("half")
+    write_later(tmp_path / "report.csv", None, rename_from=partial)
+
+    found = wait_for_files(str(tmp_path), ["report", "report.csv.crdownload"], max_wait=0.1, stable_for=0)
+    assert found == {"report": None, "report.csv.crdownload": str(partial)}
+
+    found = wait_for_files(str(tmp_path), "report", max_wait=5, stable_for=0, poll_interval=0.05)
+    assert found == {"report": str(tmp_path / "report.csv")}
+
+
+def test_small_missing_and_subfolder_patterns(tmp_path, watch_mode):
+    (tmp_path / "exports").mkdir()
+    (tmp_path / "exports" / "orders.csv").write_text("id\n1\n")
+    (tmp_path / "empty.csv").write_text("")
+
+    found = wait_for_files(
+        str(tmp_path), ["exports/orders", "empty", "missing/x"], byte_threshold=1, max_wait=0.3, stable_for=0, poll_interval=0.05
+    )
+
+    assert found == {"exports/orders": str(tmp_path / "exports" / "orders.csv"), "empty": None, "missing/x": None}
+
+
+def test_growing_file_waits_until_stable(tmp_path):
+    growing = tmp_path / "dump.csv"
+    growing.write_text("a")
+    timers = [write_later(growing, "a" * size, delay) for size, delay in ((10, 0.1), (20, 0.2))]
+
+    found = wait_for_files(str(tmp_path), "dump", max_wait=5, stable_for=0.4, poll_interval=0.05)
+    for timer in timers:
+        timer.join()
+
+    assert found == {"dump": str(growing)}
+    assert growing.stat().st_size == 20
+
+
+def test_inotify_overflow_and_unavailable_fall_back_to_scans(tmp_path, monkeypatch):
+    (tmp_path / "ready.csv").write_text("x")
+    monkeypatch.setattr(_InotifyWatcher, "read", lambda self, timeout: None)
+    assert wait_for_files(str(tmp_path), "ready", max_wait=2, stable_for=0.1) == {"ready": str(tmp_path / "ready.csv")}
+
+    def unavailable(folders):
+        raise OSError(38, "inotify_init1 failed")
+
+    monkeypatch.setattr(unix, "_InotifyWatcher", unavailable)
+    assert wait_for_files(str(tmp_path), "ready", max_wait=2, stable_for=0.1) == {"ready": str(tmp_path / "ready.csv")}
+
+
+def test_inotify_watcher_reports_changed_entries(tmp_path):
+    with pytest.raises(OSError):
+        _InotifyWatcher([str(tmp_path / "missing")])
+
+    watcher = _InotifyWatcher([str(tmp_path)])
+    try:
+        assert watcher.read(0) == []
+        (tmp_path / "new.csv").write_text("x")
+        assert str(tmp_path / "new.csv") in watcher.read(1)
+    finally:
+        watcher.close()
+
+
+def test_locate_and_verify_file(tmp_path):
+    (tmp_path / "test.txt").write_text("x" * 100)
+
+    assert locate_and_verify_file(str(tmp_path), "test", 100, 1) is True
+    assert locate_and_verify_file(str(tmp_path), "test", 101, 0.2) is False
+
+
+def test_prefix_index_finds_first_match_and_tracks_changes(tmp_path):
+    for name in ("b.csv", "a_2.csv", "a_1.csv"):
+        (tmp_path / name).write_text("x")
+    (tmp_path / "a_folder").mkdir()
+    index = _PrefixIndex(str(tmp_path))
+
+    assert index.names == ["a_1.csv", "a_2.csv", "b.csv"]
+    assert index.first("a_") == "a_1.csv"
+    assert index.first("c") is None
+
+    index.discard("a_1.csv")
+    index.discard("a_1.csv")
+    index.add("b.csv")
+    index.add("0.csv")
+    assert index.names == ["0.csv", "a_2.csv", "b.csv"]
+
+
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_bulk_renames_resolve_in_order(tmp_path, max_workers):
+    for name in ("sales_2024.csv", "stock_2024.csv"):
+        (tmp_path / name).write_text(name)
+
+    results = bulk_modify_file_names(
+        str(tmp_path), [("sales_", "sales.csv"), ("missing_", "missing.csv"), ("stock_", "stock.csv")], max_workers=max_workers
+    )
+
+    assert [result["status"] for result in results] == ["done", "not_found", "done"]
+    assert sorted(os.listdir(tmp_path)) == ["sales.csv", "stock.csv"]
+    assert (tmp_path / "stock.csv").read_text() == "stock_2024.csv"
+
+
+@pytest.mark.parametrize(
+    "renames, expected",
+    [
+        # a renamed file renamed again by a later pair
+        ([("a", "b"), ("b", "c")], {"c": "a"}),
+        # a rename writing over the source of a later one
+        ([("a", "b"), ("b_old", "a")], {"b": "a", "a": "b_old"}),
+        ([("b_old", "c"), ("a", "b_old")], {"c": "b_old", "b_old": "a"}),
+        # two renames with the same target: the last one wins, as in sequence
+        ([("a", "t"), ("b_old", "t")], {"t": "b_old"}),
+    ],
+)
+def test_chained_renames_run_sequentially(tmp_path, monkeypatch, renames, expected):
+    for name in ("a", "b_old"):
+        (tmp_path / name).write_text(name)
+    monkeypatch.setattr(unix, "ThreadPoolExecutor", None)  # any parallel run would fail
+
+    results = bulk_modify_file_names(str(tmp_path), renames, max_workers=8)
+
+    assert all(result["status"] == "done" for result in results)
+    assert {name: (tmp_path / name).read_text() for name in expected} == expected
+
+
+def test_bulk_rename_dry_run_and_failures(tmp_path):
+    (tmp_path / "a.csv").write_text("x")
+
+    planned = bulk_modify_file_names(str(tmp_path), [("a", "b.csv")], dry_run=True)
+    failed = bulk_modify_file_names(str(tmp_path), [("a", "folder/b.csv")])
+
+    assert planned == [{"source": str(tmp_path / "a.csv"), "target": str(tmp_path / "b.csv"), "status": "planned", "error": None}]
+    assert failed[0]["status"] == "failed" and "FileNotFoundError" in failed[0]["error"]
+    assert os.listdir(tmp_path) == ["a.csv"]
+
+
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_bulk_erase_exact_and_prefix(tmp_path, max_workers):
+    for name in ("sales_1.csv", "sales_2.csv", "stock.csv"):
+        (tmp_path / name).write_text("x")
+
+    exact = bulk_erase_files(str(tmp_path), ["sales_", "stock.csv"], max_workers=max_workers)
+    prefix = bulk_erase_files(str(tmp_path), ["sales_", "sales_", "sales_"], match_prefix=True, max_workers=max_workers)
+
+    assert [result["status"] for result in exact] == ["not_found", "done"]
+    assert [result["status"] for result in prefix] == ["done", "done", "not_found"]
+    assert os.listdir(tmp_path) == []
+
+
+def fake_psutil(cpu_readings, read_bytes):
+    cpu, disk = iter(cpu_readings), iter(read_bytes)
+    memory = types.SimpleNamespace(percent=95.0, available=512 * 1048576)
+    process = types.SimpleNamespace(memory_info=lambda: types.SimpleNamespace(rss=64 * 1048576))
+    return types.SimpleNamespace(
+        Process=lambda: process,
+        cpu_percent=lambda interval=None: next(cpu),
+        virtual_memory=lambda: memory,
+        disk_io_counters=lambda: types.SimpleNamespace(read_bytes=next(disk), write_bytes=0),
+    )
+
+
+def test_host_sampler_averages_the_window(monkeypatch):
+    monkeypatch.setitem(sys.modules, "psutil", fake_psutil([0.0, 10.0, 30.0, 50.0], [0, 1000, 3000]))
+    times = iter([100.0, 101.0, 102.0])
+    monkeypatch.setattr(unix, "time", lambda: next(times))
+    sampler = HostSampler(window=2)
+
+    first, second, third = sampler.sample(), sampler.sample(), sampler.sample()
+    snapshot = sampler.snapshot()
+
+    assert first["disk_read_bytes_per_s"] is None and (second["disk_read_bytes_per_s"], third["disk_read_bytes_per_s"]) == (1000, 2000)
+    assert (snapshot["samples"], snapshot["cpu_percent"], snapshot["disk_read_bytes_per_s"]) == (2, 40.0, 1500.0)
+    assert (snapshot["memory_available_mb"], snapshot["process_rss_mb"]) == (512.0, 64.0)
+    assert sampler.is_under_pressure() and not sampler.is_under_pressure(memory_limit=99)
+
+
+def test_host_sampler_without_psutil_runs_in_the_background(monkeypatch):
+    monkeypatch.setitem(sys.modules, "psutil", None)
+
+    with HostSampler(interval=0.01, window=5) as sampler:
+        assert sampler.snapshot()["samples"] >= 1
+        while len(sampler.history) < 3:
+            threading.Event().wait(0.01)
+
+    snapshot = sampler.snapshot()
+    assert snapshot["cpu_percent"] is None and snapshot["open_fds"] > 0
+    assert not sampler.is_under_pressure(cpu_limit=0, memory_limit=0)
+    assert sampler._thread is None
+    assert HostSampler().snapshot()["samples"] == 1  # a reading is taken when none exists
+
+
+def test_shared_host_sampler_is_created_once(monkeypatch):
+    monkeypatch.setattr(unix, "_shared_sampler", {})
+    try:
+        assert get_host_sampler(interval=60) is get_host_sampler()
+    finally:
+        unix._shared_sampler["sampler"].stop()
+
+
+def test_fetch_host_details():
+    details = fetch_host_details()
+
+    assert details["hostname"] == os.uname().nodename
+    assert details["kernel_version"] == os.uname().release
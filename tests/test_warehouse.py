@@ -0,0 +1,547 @@
+import datetime as dt
+import json
+import queue
+import threading
+import types
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+from fakes import FakeBigQueryClient, FakeQueryJob, FakeQueryParameter, FakeSchemaField, FakeWorksheet, installed_fakes
+
+import quati.gooogle.warehouse as warehouse
+from quati.gooogle.warehouse import (
+    QUERY_HISTORY,
+    QueryHistory,
+    WatermarkStore,
+    apply_bq_schema,
+    build_bq_dedupe_sql,
+    build_bq_merge_sql,
+    build_query_parameters,
+    compact_parquet_dataset,
+    compile_bq_schema,
+    dedupe_bq_table,
+    execute_bq_fetch,
+    export_bq_to_gsheet,
+    extract_incremental,
+    merge_into_bq_table,
+    sync_dataframe_to_bq_schema,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_bq_client():
+    warehouse._bq_client.cache_clear()
+    yield
+    warehouse._bq_client.cache_clear()
+
+
+def convert(fields, values, **options):
+    return apply_bq_schema(pd.DataFrame(values), compile_bq_schema(fields, **options))
+
+
+def test_standard_sql_aliases_use_the_legacy_converters():
+    fields = [FakeSchemaField("flag", "BOOL"), FakeSchemaField("count", "INT64"), FakeSchemaField("ratio", "FLOAT64")]
+
+    result_df = convert(fields, {"flag": [True, False], "count": ["1", "2"], "ratio": ["0.5", "2"]})
+
+    assert result_df["flag"].tolist() == [True, False]
+    assert result_df["count"].tolist() == [1, 2]
+    assert result_df["ratio"].tolist() == [0.5, 2.0]
+
+
+@pytest.mark.parametrize(
+    "numeric_as, expected",
+    [("decimal", [Decimal("0.1"), Decimal("12.5"), None]), ("scaled", [100000000, 12500000000, pd.NA]), ("float", [0.1, 12.5, None])],
+)
+def test_numeric_modes(numeric_as, expected):
+    result_df = convert([FakeSchemaField("price", "DECIMAL")], {"price": [0.1, "12.5", None]}, numeric_as=numeric_as)
+
+    values = result_df["price"].tolist()
+    assert values[:2] == expected[:2]
+    assert pd.isna(values[2])
+
+
+def test_scaled_numeric_outside_int64_and_unknown_modes():
+    with pytest.raises(ValueError, match="does not fit in int64"):
+        convert([FakeSchemaField("total", "BIGNUMERIC")], {"total": ["1"]}, numeric_as="scaled")
+    with pytest.raises(ValueError, match="not supported"):
+        compile_bq_schema([], numeric_as="money")
+    with pytest.raises(ValueError, match="INTERVAL"):
+        compile_bq_schema([FakeSchemaField("span", "INTERVAL")])
+
+
+def test_dates_times_and_timestamps():
+    fields = [FakeSchemaField("day", "DATE"), FakeSchemaField("at", "TIMESTAMP"), FakeSchemaField("opens", "TIME")]
+
+    result_df = convert(
+        fields, {"day": ["2024-01-31", "31/01/2024"], "at": ["2024-01-31T10:00:00+02:00", "x"], "opens": ["08:30:00", dt.time(9, 15)]}
+    )
+
+    assert result_df["day"].tolist()[0] == pd.Timestamp("2024-01-31") and pd.isna(result_df["day"].tolist()[1])
+    assert result_df["at"].tolist()[0] == pd.Timestamp("2024-01-31 08:00:00") and pd.isna(result_df["at"].tolist()[1])
+    assert result_df["opens"].tolist() == [pd.Timedelta(hours=8, minutes=30), pd.Timedelta(hours=9, minutes=15)]
+
+
+def test_json_geography_and_bytes():
+    fields = [FakeSchemaField("payload", "JSON"), FakeSchemaField("area", "GEOGRAPHY"), FakeSchemaField("blob", "BYTES")]
+
+    result_df = convert(fields, {"payload": ['{"a": 1}', "not json"], "area": ["POINT(1 2)", None], "blob": ["aGk=", b"raw"]})
+
+    assert result_df["payload"].tolist() == [{"a": 1}, "not json"]
+    assert str(result_df["area"].dtype) == "string" and pd.isna(result_df["area"].tolist()[1])
+    assert result_df["blob"].tolist() == [b"hi", b"raw"]
+
+
+def test_repeated_and_record_fields():
+    fields = [
+        FakeSchemaField("tags", "STRING", mode="REPEATED"),
+        FakeSchemaField("owner", "STRUCT", fields=[FakeSchemaField("name", "STRING"), FakeSchemaField("since", "DATE")]),
+    ]
+
+    result_df = convert(fields, {"tags": ['["a", "b"]', None], "owner": [{"name": "Ana", "since": "2024-01-31"}, '{"name": "Bo"}']})
+
+    assert list(result_df["tags"].tolist()[0]) == ["a", "b"] and pd.isna(result_df["tags"].tolist()[1])
+    owners = [dict(owner) for owner in result_df["owner"].tolist()]
+    assert owners == [{"name": "Ana", "since": dt.date(2024, 1, 31)}, {"name": "Bo", "since": None}]
+
+
+def test_cast_ids_as_string_skips_dates_and_nested_columns():
+    fields = [
+        FakeSchemaField("user_id", "INTEGER"),
+        FakeSchemaField("order_id", "NUMERIC"),
+        FakeSchemaField("paid_on", "DATE"),
+        FakeSchemaField("ids", "INTEGER", mode="REPEATED"),
+        FakeSchemaField("amount", "INTEGER"),
+    ]
+
+    result_df = convert(
+        fields,
+        {"user_id": [7], "order_id": [Decimal("12")], "paid_on": ["2024-01-31"], "ids": [[1, 2]], "amount": ["3"]},
+        cast_ids_as_string=True,
+    )
+
+    assert result_df.loc[0, ["user_id", "order_id", "amount"]].tolist() == ["7", "12", 3]
+    assert result_df.loc[0, "paid_on"] == pd.Timestamp("2024-01-31")
+    assert list(result_df.loc[0, "ids"]) == [1, 2]
+
+
+def test_sync_dataframe_reads_the_table_schema():
+    schema = [FakeSchemaField("store_id", "INTEGER"), FakeSchemaField("units", "INTEGER")]
+
+    with installed_fakes(schema=schema):
+        result_df = sync_dataframe_to_bq_schema(
+            pd.DataFrame({"store_id": [1], "units": ["4"]}), "project", "dataset.table", "key.json", verbose=True, cast_ids_as_string=True
+        )
+
+    assert result_df.loc[0].tolist() == ["1", 4]
+
+
+def test_query_parameter_types_are_inferred():
+    values = {
+        "@flag": True,
+        "count": 3,
+        "ratio": 0.5,
+        "price": Decimal("1.25"),
+        "huge": Decimal("1e-20"),
+        "name": "Ana",
+        "raw": b"x",
+        "local": dt.datetime(2024, 1, 1),
+        "moment": dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc),
+        "day": dt.date(2024, 1, 1),
+        "opens": dt.time(8),
+        "nothing": None,
+        "stores": [1, 2],
+        "none_yet": [],
+    }
+
+    with installed_fakes():
+        named = build_query_parameters(values)
+        positional = build_query_parameters(("a", FakeQueryParameter("b", "STRING", "b")))
+
+    assert [(parameter.args[0], parameter.args[1]) for parameter in named] == [
+        ("flag", "BOOL"),
+        ("count", "INT64"),
+        ("ratio", "FLOAT64"),
+        ("price", "NUMERIC"),
+        ("huge", "BIGNUMERIC"),
+        ("name", "STRING"),
+        ("raw", "BYTES"),
+        ("local", "DATETIME"),
+        ("moment", "TIMESTAMP"),
+        ("day", "DATE"),
+        ("opens", "TIME"),
+        ("nothing", "STRING"),
+        ("stores", "INT64"),
+        ("none_yet", "STRING"),
+    ]
+    assert named[-2].args[2] == [1, 2]
+    assert positional[0].args == (None, "STRING", "a") and positional[1].args == ("b", "STRING", "b")
+    assert build_query_parameters(None) == []
+
+
+def test_query_parameters_of_unknown_types_are_refused():
+    with installed_fakes(), pytest.raises(TypeError, match="QueryParameter"):
+        build_query_parameters({"span": dt.timedelta(days=1)})
+
+
+def test_dry_run_reports_the_bytes_without_the_cache():
+    jobs = []
+    query = FakeBigQueryClient.query
+
+    def recording_query(self, sql_command, job_config=None, **kwargs):
+        jobs.append(query(self, sql_command, job_config))
+        return jobs[-1]
+
+    with installed_fakes(result_df=pd.DataFrame({"a": range(10)})), pytest.MonkeyPatch.context() as patch:
+        patch.setattr(FakeBigQueryClient, "query", recording_query)
+        estimate = execute_bq_fetch("SELECT a FROM t WHERE a > @a", "project", "key.json", params={"a": 1}, dry_run=True)
+
+    (job,) = jobs
+    assert estimate == job.total_bytes_processed > 0
+    assert (job.job_config.dry_run, job.job_config.use_query_cache) == (True, False)
+    assert job.job_config.query_parameters[0].args == ("a", "INT64", 1)
+
+
+def test_maximum_bytes_billed_fails_the_query():
+    query = FakeBigQueryClient.query
+
+    def guarded_query(self, sql_command, job_config=None, **kwargs):
+        if getattr(job_config, "maximum_bytes_billed", None) is not None and job_config.maximum_bytes_billed < 1000:
+            raise RuntimeError("Query exceeded limit for bytes billed: 10. 1000 or higher required.")
+        return query(self, sql_command, job_config)
+
+    with installed_fakes(result_df=pd.DataFrame({"a": [1]})), pytest.MonkeyPatch.context() as patch:
+        patch.setattr(FakeBigQueryClient, "query", guarded_query)
+        refused, record = execute_bq_fetch("SELECT a FROM t", "project", "key.json", maximum_bytes_billed=10, return_metrics=True)
+        allowed = execute_bq_fetch("SELECT a FROM t", "project", "key.json", maximum_bytes_billed=10**6)
+
+    assert refused is None and "bytes billed" in record["error"]
+    assert allowed["a"].tolist() == [1]
+
+
+def test_query_metrics_reach_the_sink():
+    records = []
+
+    with installed_fakes(result_df=pd.DataFrame({"a": range(5), "b": "x"})):
+        result_df, record = execute_bq_fetch("SELECT a, b FROM t", "project", "key.json", metrics_sink=records.append, return_metrics=True)
+
+    assert records == [record]
+    assert (record["rows"], record["columns"], record["job_id"], record["error"]) == (5, 2, "fake-job", None)
+    assert record["total_bytes_billed"] == FakeQueryJob(result_df).total_bytes_billed
+    assert record["download_seconds"] >= 0 and record["conversion_seconds"] >= 0 and record["wall_seconds"] >= 0
+
+
+def test_default_history_and_failing_sinks():
+    def broken_sink(record):
+        raise RuntimeError("monitoring is down")
+
+    QUERY_HISTORY.reset()
+    with installed_fakes(result_df=pd.DataFrame({"a": [1]})):
+        execute_bq_fetch("SELECT 1", "project", "key.json")
+        assert execute_bq_fetch("SELECT 2", "project", "key.json", metrics_sink=broken_sink)["a"].tolist() == [1]
+
+    (record,) = QUERY_HISTORY.records
+    assert record["sql"] == "SELECT 1"
+    QUERY_HISTORY.reset()
+
+
+def test_history_keeps_the_latest_records_and_ranks_them():
+    history = QueryHistory(max_records=3)
+    for position, slots in enumerate([5, None, 50, 20]):
+        history({"sql": position, "slot_millis": slots, "wall_seconds": position})
+
+    assert [record["sql"] for record in history.records] == [1, 2, 3]
+    assert [record["sql"] for record in history.slowest(2, key="slot_millis")] == [2, 3]
+    assert [record["sql"] for record in history.slowest()] == [3, 2, 1]
+    history.reset()
+    assert history.slowest() == []
+
+
+def test_job_metrics_split_queue_and_execution_time():
+    job = FakeQueryJob(pd.DataFrame({"a": [1]}))
+    job.created = dt.datetime(2024, 1, 1, 10, 0, 0)
+    job.started = dt.datetime(2024, 1, 1, 10, 0, 2)
+    job.ended = dt.datetime(2024, 1, 1, 10, 0, 7)
+
+    metrics = warehouse._job_metrics(job)
+
+    assert (metrics["queue_seconds"], metrics["execution_seconds"]) == (2, 5)
+    assert warehouse._job_metrics(object())["execution_seconds"] is None
+
+
+class FlakyWorksheet(FakeWorksheet):
+    """Worksheet whose `update` raises on the calls listed in `failing_calls` (1-based)."""
+
+    def __init__(self, failing_calls=()):
+        super().__init__([])
+        self.failing_calls = set(failing_calls)
+        self.calls = 0
+
+    def update(self, target_cell, values, value_input_option="RAW"):
+        self.calls += 1
+        if self.calls in self.failing_calls:
+            raise RuntimeError("APIError: [503]: The service is currently unavailable")
+        super().update(target_cell, values, value_input_option)
+
+
+def test_export_streams_pages_below_the_anchor():
+    worksheet = FakeWorksheet([])
+
+    with installed_fakes(result_df=pd.DataFrame({"id": range(25), "name": "x"})):
+        summary = export_bq_to_gsheet("SELECT * FROM t", "project", "key.json", worksheet, "B3", page_size=10, wait=0)
+
+    assert summary == {"job_id": "fake-job", "rows": 25, "pages": 3, "resumed_from": 0, "next_cell": "B29"}
+    assert worksheet.updates == [("B3", 1), ("B4", 10), ("B14", 10), ("B24", 5)]
+
+
+def test_interrupted_export_resumes_from_its_checkpoint(tmp_path):
+    checkpoint_path = tmp_path / "export.json"
+    options = {"page_size": 10, "wait": 0, "checkpoint_path": str(checkpoint_path)}
+
+    with installed_fakes(result_df=pd.DataFrame({"id": range(25)})):
+        broken = FlakyWorksheet(failing_calls={3, 4})
+        with pytest.raises(RuntimeError, match="503"):
+            export_bq_to_gsheet("SELECT id FROM t", "project", "key.json", broken, limit=2, **options)
+        checkpoint = json.loads(checkpoint_path.read_text())
+
+        worksheet = FakeWorksheet([])
+        summary = export_bq_to_gsheet("SELECT id FROM t", "project", "key.json", worksheet, **options)
+
+    assert broken.updates == [("A1", 1), ("A2", 10)]
+    assert (checkpoint["job_id"], checkpoint["rows_written"]) == ("fake-job", 10)
+    assert (summary["rows"], summary["resumed_from"], summary["next_cell"]) == (15, 10, "A27")
+    assert worksheet.updates == [("A12", 10), ("A22", 5)]  # no header, the rows already written are skipped
+    assert not checkpoint_path.exists()
+
+
+def test_checkpoints_of_another_export_are_ignored(tmp_path):
+    checkpoint_path = tmp_path / "export.json"
+    checkpoint_path.write_text(json.dumps({"fingerprint": "other", "job_id": "old", "location": "US", "rows_written": 5}))
+    worksheet = FlakyWorksheet(failing_calls={2})
+
+    with installed_fakes(result_df=pd.DataFrame({"id": range(3)})):
+        summary = export_bq_to_gsheet("SELECT id FROM t", "project", "key.json", worksheet, checkpoint_path=str(checkpoint_path), wait=0)
+
+    assert (summary["rows"], summary["resumed_from"]) == (3, 0)
+    assert worksheet.updates == [("A1", 1), ("A2", 3)]  # the failed attempt was retried
+
+
+def test_download_errors_reach_the_caller():
+    def broken_pages(self, *args, **kwargs):
+        yield self.result_df.iloc[:2]
+        raise ConnectionError("stream reset")
+
+    with installed_fakes(result_df=pd.DataFrame({"id": range(5)})), pytest.MonkeyPatch.context() as patch:
+        patch.setattr(FakeQueryJob, "to_dataframe_iterable", broken_pages)
+        worksheet = FakeWorksheet([])
+        with pytest.raises(ConnectionError, match="stream reset"):
+            export_bq_to_gsheet("SELECT id FROM t", "project", "key.json", worksheet, include_header=False)
+
+    assert worksheet.updates == [("A1", 2)]
+
+
+def test_prefetch_stops_when_the_consumer_is_gone():
+    pages, stop = queue.Queue(maxsize=1), threading.Event()
+    job = FakeQueryJob(pd.DataFrame({"id": range(30)})).result(page_size=10)
+    downloader = threading.Thread(target=warehouse._prefetch_pages, args=(job, pages, stop))
+    downloader.start()
+
+    assert len(pages.get(timeout=5).index) == 10
+    stop.set()
+    downloader.join(timeout=5)
+
+    assert not downloader.is_alive()
+
+
+@pytest.fixture
+def recorded_queries(monkeypatch):
+    queries = []
+    query = FakeBigQueryClient.query
+
+    def recording_query(self, sql_command, job_config=None, **kwargs):
+        queries.append((sql_command, {parameter.args[0]: parameter.args[2] for parameter in job_config.query_parameters}))
+        return query(self, sql_command, job_config)
+
+    monkeypatch.setattr(FakeBigQueryClient, "query", recording_query)
+    return queries
+
+
+def moments(*hours):
+    return pd.to_datetime([f"2024-06-01 {hour:02d}:00:00" for hour in hours], utc=True)
+
+
+def test_incremental_extraction_resumes_from_the_stored_watermark(tmp_path, recorded_queries):
+    dataset_dir = str(tmp_path / "orders")
+    arguments = ("project.sales.orders", "updated_at", "project", "key.json", dataset_dir)
+
+    with installed_fakes(result_df=pd.DataFrame({"id": [1, 2], "updated_at": moments(1, 2)})):
+        first = extract_incremental(*arguments)
+        FakeBigQueryClient.result_df = pd.DataFrame({"id": [2, 3], "updated_at": moments(3, 4)})
+        second = extract_incremental(*arguments, lookback=dt.timedelta(hours=1))
+
+    stored = WatermarkStore(f"{dataset_dir}/_watermarks.json").get("project.sales.orders")
+    assert recorded_queries == [
+        ("SELECT * FROM `project.sales.orders`", {}),
+        ("SELECT * FROM `project.sales.orders` WHERE `updated_at` > @watermark", {"watermark": first["watermark"] - dt.timedelta(hours=1)}),
+    ]
+    assert (first["rows"], first["previous_watermark"], second["previous_watermark"]) == (2, None, first["watermark"])
+    assert second["watermark"] == dt.datetime(2024, 6, 1, 4, tzinfo=dt.timezone.utc)
+    assert (stored["column"], stored["type"], stored["value"]) == ("updated_at", "TIMESTAMP", "2024-06-01T04:00:00+00:00")
+    assert sorted(pd.read_parquet(dataset_dir)["id"].tolist()) == [1, 2, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "previous, newest, advances",
+    [
+        (dt.datetime(2024, 6, 1, 2), moments(1, 3), True),  # naive mark, TIMESTAMP column
+        (dt.datetime(2024, 6, 1, 5), moments(1, 3), False),
+        (dt.datetime(2024, 6, 1, 4, tzinfo=dt.timezone(dt.timedelta(hours=2))), pd.to_datetime(["2024-06-01 03:00:00"]), True),
+    ],
+)
+def test_naive_and_aware_watermarks_are_compared_in_utc(tmp_path, previous, newest, advances):
+    store = WatermarkStore(str(tmp_path / "marks.json"))
+    store.set("orders", "updated_at", previous)
+
+    with installed_fakes(result_df=pd.DataFrame({"updated_at": newest})):
+        summary = extract_incremental("SELECT 1", "updated_at", "project", "key.json", str(tmp_path), store, "orders")
+
+    assert summary["error"] is None and (summary["watermark"] != summary["previous_watermark"]) is advances
+    assert store.get("orders")["value"] == summary["watermark"].isoformat()
+
+
+def test_watermark_store_round_trips_each_type(tmp_path):
+    store = WatermarkStore(str(tmp_path / "state" / "marks.json"))
+    values = {"count": 12, "price": Decimal("1.50"), "day": dt.date(2024, 6, 1), "at": pd.Timestamp("2024-06-01 10:00:00")}
+
+    for name, value in values.items():
+        store.set(name, "column", value)
+    store.reset("count")
+    store.reset("missing")
+
+    assert store.get("count") is None
+    assert {name: warehouse._decode_watermark(store.get(name)) for name in ("price", "day", "at")} == {
+        "price": Decimal("1.50"),
+        "day": dt.date(2024, 6, 1),
+        "at": dt.datetime(2024, 6, 1, 10),
+    }
+    assert warehouse._encode_watermark(pd.Series([7]).max()) == {"type": "INT64", "value": 7}
+
+
+def test_failed_queries_keep_the_watermark(tmp_path, monkeypatch):
+    store = WatermarkStore(str(tmp_path / "marks.json"))
+    store.set("orders", "id", 10)
+    monkeypatch.setattr(FakeBigQueryClient, "query", lambda *args, **kwargs: (_ for _ in ()).throw(RuntimeError("Not found: Table")))
+
+    with installed_fakes():
+        with pytest.raises(ValueError, match="reset it first"):
+            extract_incremental("SELECT 1", "updated_at", "project", "key.json", str(tmp_path), state_store=store, source_name="orders")
+        summary = extract_incremental("SELECT 1", "id", "project", "key.json", str(tmp_path), state_store=store, source_name="orders")
+
+    assert "Not found" in summary["error"] and (summary["rows"], summary["watermark"]) == (0, 10)
+    assert store.get("orders")["value"] == 10 and not list(tmp_path.glob("*.parquet"))
+
+
+def test_null_marks_are_kept_and_compaction_keeps_the_last_version(tmp_path):
+    options = {"key_columns": ["id"], "compact_after_files": 2, "initial_watermark": 0}
+
+    with installed_fakes(result_df=pd.DataFrame({"id": [1, 2], "version": [1.0, None]})):
+        for version in (1.0, 3.0, 2.0):
+            FakeBigQueryClient.result_df = pd.DataFrame({"id": [1, 2], "version": [version, None]})
+            summary = extract_incremental("SELECT 1", "version", "project", "key.json", str(tmp_path), **options)
+
+    assert summary["watermark"] == 3.0 and summary["compaction"]["files"] == 3
+    assert (summary["compaction"]["rows_in"], summary["compaction"]["rows_out"]) == (6, 2)
+    compacted_df = pd.read_parquet(summary["compaction"]["file"]).set_index("id")
+    assert compacted_df.loc[1, "version"] == 3.0 and pd.isna(compacted_df.loc[2, "version"])
+    assert compact_parquet_dataset(str(tmp_path)) == {"files": 1, "rows_in": None, "rows_out": None, "file": summary["compaction"]["file"]}
+
+
+@pytest.mark.parametrize(
+    "keep_strategy, order_by, clause",
+    [
+        ("first", "loaded_at", "QUALIFY ROW_NUMBER() OVER (PARTITION BY `id`, `day` ORDER BY `loaded_at` ASC) = 1"),
+        ("last", ["loaded_at", "seq"], "QUALIFY ROW_NUMBER() OVER (PARTITION BY `id`, `day` ORDER BY `loaded_at` DESC, `seq` DESC) = 1"),
+        ("first", None, "QUALIFY ROW_NUMBER() OVER (PARTITION BY `id`, `day`) = 1"),
+        (False, "loaded_at", "QUALIFY COUNT(*) OVER (PARTITION BY `id`, `day`) = 1"),
+    ],
+)
+def test_dedupe_sql_rewrites_the_table_in_place(keep_strategy, order_by, clause):
+    assert build_bq_dedupe_sql("project.sales.orders", ["id", "day"], keep_strategy, order_by).splitlines() == [
+        "MERGE `project.sales.orders` AS target",
+        f"USING (SELECT * FROM `project.sales.orders` WHERE TRUE {clause}) AS source",
+        "ON FALSE",
+        "WHEN NOT MATCHED BY SOURCE THEN DELETE",
+        "WHEN NOT MATCHED BY TARGET THEN INSERT ROW",
+    ]
+
+
+def test_merge_sql_updates_or_keeps_existing_keys():
+    last = build_bq_merge_sql("d.orders", "s.orders", "id", ["id", "total"], order_by="loaded_at").splitlines()
+    first = build_bq_merge_sql("d.orders", "s.orders", "id", ["id", "total"], keep_strategy="first").splitlines()
+    keys_only = build_bq_merge_sql("d.orders", "s.orders", ["id"], ["id"])
+
+    assert last == [
+        "MERGE `d.orders` AS target",
+        "USING (SELECT * FROM `s.orders` WHERE TRUE QUALIFY ROW_NUMBER() OVER (PARTITION BY `id` ORDER BY `loaded_at` DESC) = 1) AS source",
+        "ON target.`id` = source.`id`",
+        "WHEN MATCHED THEN UPDATE SET `total` = source.`total`",
+        "WHEN NOT MATCHED BY TARGET THEN INSERT (`id`, `total`) VALUES (source.`id`, source.`total`)",
+    ]
+    assert first[1] == "USING (SELECT * FROM `s.orders` WHERE TRUE QUALIFY ROW_NUMBER() OVER (PARTITION BY `id`) = 1) AS source"
+    assert first[2:] == [last[2], last[4]]  # existing keys are left alone
+    assert "UPDATE" not in keys_only
+
+
+@pytest.mark.parametrize(
+    "build, message",
+    [
+        (lambda: build_bq_dedupe_sql("d.orders", "id", keep_strategy="latest"), "not supported"),
+        (lambda: build_bq_dedupe_sql("d.orders`; DROP TABLE x; --", "id"), "invalid BigQuery identifier"),
+        (lambda: build_bq_merge_sql("d.orders", "s.orders", "id", ["id", " "]), "invalid BigQuery identifier"),
+        (lambda: build_bq_merge_sql("d.orders", "s.orders", "id", ["id"], keep_strategy=False), "not supported for merges"),
+    ],
+)
+def test_statements_refuse_bad_identifiers_and_strategies(build, message):
+    with pytest.raises(ValueError, match=message):
+        build()
+
+
+@pytest.fixture
+def dml_jobs(monkeypatch):
+    jobs = []
+    query = FakeBigQueryClient.query
+
+    def dml_query(self, sql_command, job_config=None, **kwargs):
+        job = query(self, sql_command, job_config)
+        job.total_bytes_processed = 4096
+        if not job_config.dry_run:
+            job.dml_stats = types.SimpleNamespace(inserted_row_count=90, updated_row_count=7, deleted_row_count=100)
+            job.num_dml_affected_rows = 197
+        jobs.append(job)
+        return job
+
+    monkeypatch.setattr(FakeBigQueryClient, "query", dml_query)
+    return jobs
+
+
+def test_dedupe_table_reports_the_removed_rows(dml_jobs):
+    with installed_fakes():
+        summary = dedupe_bq_table("project.sales.orders", "id", "project", "key.json", "last", order_by="loaded_at")
+        estimate = dedupe_bq_table("project.sales.orders", "id", "project", "key.json", dry_run=True)
+
+    assert (summary["rows_before"], summary["rows_after"], summary["removed"], summary["error"]) == (100, 90, 10, None)
+    assert "ORDER BY `loaded_at` DESC" in summary["sql"]
+    assert (estimate["total_bytes_processed"], estimate["removed"], estimate["dry_run"]) == (4096, None, True)
+    assert dml_jobs[1].job_config.dry_run and not hasattr(dml_jobs[1], "page_size")  # result() is not awaited
+
+
+def test_merge_reads_the_staging_columns_and_reports_errors(dml_jobs, monkeypatch):
+    with installed_fakes(schema=[FakeSchemaField("id", "INTEGER"), FakeSchemaField("total", "NUMERIC")]):
+        summary = merge_into_bq_table("d.orders", "s.orders", "id", "project", "key.json")
+        monkeypatch.setattr(FakeBigQueryClient, "query", lambda *args, **kwargs: (_ for _ in ()).throw(RuntimeError("Access Denied")))
+        failed = merge_into_bq_table("d.orders", "s.orders", "id", "project", "key.json", columns=["id"])
+
+    assert "INSERT (`id`, `total`)" in summary["sql"]
+    assert (summary["inserted"], summary["updated"], summary["affected"]) == (90, 7, 197)
+    assert "Access Denied" in failed["error"] and (failed["inserted"], failed["affected"]) == (None, None)